@@ -38,6 +38,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # outermost so it sees every query (sessions, auth, views) of the request
+    'malnad_hostel.instrumentation.QueryStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -52,7 +54,8 @@ ROOT_URLCONF = 'hostel_manager.urls'
 # Templates: include a project-level templates/ folder and app templates
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates + render timing for QueryStatsMiddleware
+        'BACKEND': 'malnad_hostel.instrumentation.InstrumentedTemplates',
         # Add a project-level templates directory so you can place shared templates there
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
@@ -83,6 +86,36 @@ DATABASES = {
 }
 
 
+# Caches: backend picked by HOSTEL_CACHE_BACKEND (locmem/file/db/redis/fakeredis),
+# see malnad_hostel/cache_config.py for the aliases and other variables.
+from malnad_hostel.cache_config import caches_from_env, shared_cache_from_env  # noqa: E402
+
+CACHES = caches_from_env(BASE_DIR)
+# True for file, db and redis. What signals invalidate is only kept long
+# when every worker sees the invalidation: table version tokens (export
+# reuse, page ETags; export_jobs.py), the mess menu version (mess.py) and
+# the dashboard summary (dashboard.py).
+SHARED_CACHE = shared_cache_from_env()
+SESSION_CACHE_ALIAS = 'sessions'  # used once SESSION_ENGINE is cache-backed
+
+
+# Password hashing: algorithm and cost for new hashes; existing users are
+# rehashed on their next login. See malnad_hostel/hashers.py.
+from malnad_hostel.hashers import password_hashers  # noqa: E402
+
+PASSWORD_HASHING = {
+    'algorithm': os.environ.get('HOSTEL_PASSWORD_HASHER', 'scrypt'),
+    'scrypt': {'work_factor': 2 ** 14, 'block_size': 8, 'parallelism': 1},
+    'argon2': {'time_cost': 2, 'memory_cost': 19456, 'parallelism': 1},
+    'workers': None,  # hashes running at once; None = CPU count
+}
+PASSWORD_HASHERS = password_hashers(PASSWORD_HASHING['algorithm'])
+
+# Threads for the management dashboard's independent list queries, each on
+# its own connection (malnad_hostel/dashboard.py). None = min(4, CPUs), 0 = in order.
+DASHBOARD_QUERY_WORKERS = None
+
+
 # Password validation (default)
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',},
@@ -117,5 +150,17 @@ LOGOUT_REDIRECT_URL = '/'      # where to go after logout
 LOGIN_URL = '/accounts/login/' # used by @login_required (Django's built-in auth URLs)
 
 
+# Per-view performance budgets checked by QueryStatsMiddleware (logged) and
+# by QueryBudgetMixin.assertWithinBudget in tests. An int is a query budget;
+# a dict may also set sql_ms, render_ms, total_ms and bytes.
+QUERY_BUDGETS = {
+    'malnad_hostel:management_dashboard': 6,
+    'malnad_hostel:student_dashboard': 6,
+    'malnad_hostel:fees': 4,
+    'malnad_hostel:mess_week': 4,
+    'malnad_hostel:room_detail': 4,
+}
+
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -19,9 +19,12 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.conf.urls import handler403
+from malnad_hostel import views as malnad_views
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('accounts/', include('django.contrib.auth.urls')),  # login/logout/password reset
+    # login hashes off the request thread, see malnad_hostel/hashers.py
+    path('accounts/login/', malnad_views.login_view, name='login'),
+    path('accounts/', include('django.contrib.auth.urls')),  # logout/password reset
     path('', include('malnad_hostel.urls', namespace='malnad_hostel')),
 ]
 
@@ -81,6 +81,34 @@ DATABASES = {
 }
 
 
+# Caches
+# Backend picked by HOSTEL_CACHE_BACKEND (locmem/file/db/redis), see
+# malnad_app/cache_config.py for the aliases and other variables.
+from malnad_app.cache_config import caches_from_env, session_engine_from_env, shared_cache_from_env  # noqa: E402
+
+CACHES = caches_from_env(BASE_DIR)
+# True for file, db and redis. The page ETags' table versions live in the
+# cache, so conditional GET (malnad_app/conditional.py) is only on when a
+# write in one worker is seen by all of them.
+SHARED_CACHE = shared_cache_from_env()
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Sessions are read from the cache and written through to the database only
+# when something changed (malnad_app/sessions.py), but only with a shared
+# cache (HOSTEL_CACHE_BACKEND=file, db or redis); with the per-process locmem
+# default they stay plain database sessions. Set
+# HOSTEL_SESSION_ENGINE=django.contrib.sessions.backends.signed_cookies to
+# keep them in the browser instead; nothing is stored server-side then.
+SESSION_ENGINE = session_engine_from_env()
+
+# Seconds the staff dashboard numbers are reused (malnad_app/dashboard.py).
+DASHBOARD_METRICS_TTL = int(os.environ.get('HOSTEL_DASHBOARD_TTL', 5))
+
+# Bookings that ended more than this many days ago are moved to the archive
+# table by `manage.py archive_bookings` (malnad_app/archive.py).
+BOOKING_RETENTION_DAYS = int(os.environ.get('HOSTEL_BOOKING_RETENTION_DAYS', 365))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
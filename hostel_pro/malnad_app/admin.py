@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Room, Student, Booking
+from .models import ArchivedBooking, Room, Student, Booking
 
 @admin.register(Room)
 class RoomAdmin(admin.ModelAdmin):
@@ -9,11 +9,32 @@ class RoomAdmin(admin.ModelAdmin):
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
     list_display = ('roll_no', 'name', 'room', 'phone')
+    list_select_related = ('room',)
     search_fields = ('roll_no', 'name')
     list_filter = ('room',)
+    show_full_result_count = False
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
     list_display = ('student', 'room', 'start_date', 'end_date')
+    list_select_related = ('student', 'room')
     list_filter = ('room', 'start_date')
+    show_full_result_count = False
     search_fields = ('student__name', 'student__roll_no', 'room__number')
+
+@admin.register(ArchivedBooking)
+class ArchivedBookingAdmin(admin.ModelAdmin):
+    list_display = ('student', 'room', 'start_date', 'end_date', 'archived_at')
+    list_select_related = ('student', 'room')
+    show_full_result_count = False
+    search_fields = ('student__roll_no', 'room__number')
+
+    # history: moved here by archive.py, not edited by hand
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,71 @@
+# malnad_app/allocation.py
+"""
+Room allocation service.
+
+Room.occupied is only changed here, with a conditional UPDATE
+(`occupied = occupied + 1 WHERE occupied < capacity`) inside a transaction,
+so two staff members filling the last bed at the same time can't both win.
+"""
+from django.db import transaction
+from django.db.models import F
+
+from .conditional import bump_table_version
+from .models import Booking, Room, Student
+
+
+class AllocationError(Exception):
+    pass
+
+
+class RoomFull(AllocationError):
+    pass
+
+
+def _rooms_changed():
+    # counters and Student.room move with update(), which sends no signals
+    bump_table_version(Room, Student)
+
+
+def _claim_bed(room):
+    if not Room.objects.filter(pk=room.pk, occupied__lt=F('capacity')).update(occupied=F('occupied') + 1):
+        raise RoomFull(f"Room {room.number} is full.")
+    transaction.on_commit(_rooms_changed)
+
+
+def _release_bed(room_id):
+    Room.objects.filter(pk=room_id, occupied__gt=0).update(occupied=F('occupied') - 1)
+    transaction.on_commit(_rooms_changed)
+
+
+def assign_room(student, room):
+    """Move an existing student into `room`, freeing their previous bed."""
+    old_room_id = student.room_id
+    if old_room_id == room.pk:
+        return
+    with transaction.atomic():
+        _claim_bed(room)
+        moved = Student.objects.filter(pk=student.pk, room_id=old_room_id).update(room=room)
+        if not moved:
+            raise AllocationError(f"{student.roll_no} was reassigned by someone else, please retry.")
+        if old_room_id:
+            _release_bed(old_room_id)
+    student.room = room
+    student._loaded_room_id = room.pk  # counters already moved, see signals.py
+
+
+def create_student(room=None, **fields):
+    """Create a student, taking a bed in `room` in the same transaction."""
+    with transaction.atomic():
+        if room is not None:
+            _claim_bed(room)
+        student = Student(room=room, **fields)
+        student._loaded_room_id = student.room_id  # bed claimed above, skip the recount
+        student.save(force_insert=True)
+        return student
+
+
+def create_booking(student, room, start_date, end_date=None):
+    """Create a booking and move the student into the booked room."""
+    with transaction.atomic():
+        assign_room(student, room)
+        return Booking.objects.create(student=student, room=room, start_date=start_date, end_date=end_date)
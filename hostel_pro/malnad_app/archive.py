@@ -0,0 +1,87 @@
+# malnad_app/archive.py
+"""
+Booking history archival.
+
+Bookings that ended more than settings.BOOKING_RETENTION_DAYS ago are moved
+from Booking to ArchivedBooking (same id, same database) by
+archive_bookings(), run from `manage.py archive_bookings`. The Booking
+table then holds open stays and recent history only, so the booking list,
+the student dashboard and availability.py read a table that stays the size
+of the hostel, not of its whole past. Archived stays ended before the
+cutoff, so availability windows from the cutoff on are unaffected.
+
+booking_rows() is the read API over both: hot rows by default, hot plus
+archived (one UNION query) when include_archive=True.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.utils import timezone
+
+from .conditional import bump_table_version
+from .models import ArchivedBooking, Booking
+
+BATCH_SIZE = 2000
+FIELDS = ('id', 'student_id', 'room_id', 'start_date', 'end_date')
+
+
+def cutoff(today=None):
+    """Bookings that ended before this date are archived."""
+    today = today or timezone.localdate()
+    return today - datetime.timedelta(days=getattr(settings, 'BOOKING_RETENTION_DAYS', 365))
+
+
+def _delete_bookings(ids):
+    # plain SQL rather than QuerySet.delete(): Booking has post_delete
+    # receivers (signals.py), so the collector would fetch every row and send
+    # the signal one row at a time. Nothing references a Booking, so there
+    # is nothing to cascade; the versions are bumped once per batch instead.
+    table = connection.ops.quote_name(Booking._meta.db_table)
+    pk = connection.ops.quote_name(Booking._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE {pk} IN ({', '.join(['%s'] * len(ids))})", ids)
+
+
+def archive_bookings(before=None, batch_size=BATCH_SIZE, dry_run=False):
+    """Move bookings with end_date < `before` (default cutoff()) to the archive; returns how many."""
+    before = before or cutoff()
+    closed = Booking.objects.filter(end_date__lt=before)
+    if dry_run:
+        return closed.count()
+    moved = 0
+    last_pk = 0
+    while True:
+        # one short transaction per batch; walking the pk index forward means
+        # each batch starts where the last one stopped instead of rescanning
+        with transaction.atomic():
+            rows = list(closed.filter(pk__gt=last_pk).order_by('pk').values(*FIELDS)[:batch_size])
+            if not rows:
+                break
+            ArchivedBooking.objects.bulk_create([ArchivedBooking(**row) for row in rows], ignore_conflicts=True)
+            _delete_bookings([row['id'] for row in rows])
+            transaction.on_commit(lambda: bump_table_version(Booking, ArchivedBooking))
+        moved += len(rows)
+        last_pk = rows[-1]['id']
+    return moved
+
+
+def _rows(model, filters, archived):
+    return model.objects.filter(**filters).values(
+        'id', 'start_date', 'end_date',
+        student_roll_no=F('student__roll_no'), student_name=F('student__name'),
+        room_number=F('room__number'), archived=Value(archived),
+    ).order_by()
+
+
+def booking_rows(include_archive=False, **filters):
+    """
+    Bookings matching `filters` (e.g. student=..., room=...) as dicts, newest
+    first: id, start_date, end_date, student_roll_no, student_name,
+    room_number and `archived`. The archive is only read when asked for.
+    """
+    rows = _rows(Booking, filters, False)
+    if include_archive:
+        rows = rows.union(_rows(ArchivedBooking, filters, True), all=True)
+    return rows.order_by('-start_date', '-id')
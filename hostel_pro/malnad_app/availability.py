@@ -0,0 +1,97 @@
+# malnad_app/availability.py
+"""
+Which rooms have a free bed between two dates.
+
+A booking holds one bed in its room from start_date to end_date, both
+inclusive; an empty end_date means the stay is still open. For a window
+[start, end] only the bookings overlapping it matter:
+
+    start_date <= end AND (end_date IS NULL OR end_date >= start)
+
+They are read as (room_id, start_date, end_date) tuples ordered by room and
+start date, which the booking_room_dates_idx index on exactly those
+columns serves without touching the table or sorting. peak_occupancy()
+then sweeps each room's bookings once: a heap holds the end dates of the
+stays still running, so its size when a stay begins is the number of beds
+taken that day and the largest size is the room's peak over the window.
+O(n log n) in the overlapping bookings, with no per-day or per-room query.
+
+Only the Booking table is read: archive.py moves out stays that ended
+before its retention cutoff, which cannot overlap a window from then on.
+
+Students placed with student_create have no booking; they are in
+Room.occupied, which is counted as a floor for windows that include today.
+"""
+import datetime
+import heapq
+from itertools import groupby
+from operator import itemgetter
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Booking, Room
+
+OPEN_END = datetime.date.max
+
+
+def overlapping(start, end):
+    """Bookings holding a bed on at least one day of [start, end]."""
+    return Booking.objects.filter(Q(end_date__isnull=True) | Q(end_date__gte=start), start_date__lte=end)
+
+
+def _peak(stays, start):
+    running = []  # end dates of the stays in progress, smallest first
+    peak = 0
+    for begins, ends in stays:
+        begins = max(begins, start)
+        while running and running[0] < begins:
+            heapq.heappop(running)
+        heapq.heappush(running, ends or OPEN_END)
+        peak = max(peak, len(running))
+    return peak
+
+
+def peak_occupancy(start, end, room_ids=None):
+    """{room_id: most beds booked on any single day of [start, end]}; rooms without bookings are left out."""
+    bookings = overlapping(start, end)
+    if room_ids is not None:
+        bookings = bookings.filter(room_id__in=room_ids)
+    rows = bookings.order_by('room_id', 'start_date').values_list('room_id', 'start_date', 'end_date')
+    peaks = {}
+    for room_id, stays in groupby(rows.iterator(chunk_size=5000), key=itemgetter(0)):
+        stays = [stay[1:] for stay in stays]
+        # most rooms hold a single overlapping stay; no sweep needed for those
+        peaks[room_id] = _peak(stays, start) if len(stays) > 1 else 1
+    return peaks
+
+
+class RoomAvailability:
+    __slots__ = ('number', 'capacity', 'peak', 'free')
+
+    def __init__(self, number, capacity, peak):
+        self.number = number
+        self.capacity = capacity
+        self.peak = peak
+        self.free = max(capacity - peak, 0)
+
+    def as_dict(self):
+        return {'room': self.number, 'capacity': self.capacity, 'peak': self.peak, 'free': self.free}
+
+
+def available_rooms(start, end, beds=1, rooms=None):
+    """RoomAvailability for every room (of `rooms`, default all) with `beds` free on each day of [start, end]."""
+    if end < start:
+        raise ValueError("The end date is before the start date.")
+    peaks = peak_occupancy(start, end, None if rooms is None else rooms.values('pk'))
+    rooms = (Room.objects.all() if rooms is None else rooms).order_by('number')
+    today_inside = start <= timezone.localdate() <= end
+    result = []
+    # plain tuples: a hostel-wide search would otherwise build every Room instance
+    for pk, number, capacity, occupied in rooms.values_list('pk', 'number', 'capacity', 'occupied'):
+        peak = peaks.get(pk, 0)
+        if today_inside:
+            peak = max(peak, occupied)
+        if capacity - peak >= beds:
+            result.append(RoomAvailability(number, capacity, peak))
+    return result
@@ -0,0 +1,93 @@
+# malnad_app/cache_config.py
+"""
+CACHES for hostel_pro/settings.py, chosen by environment variables:
+
+    HOSTEL_CACHE_BACKEND   locmem (default) | file | db | redis
+    HOSTEL_CACHE_LOCATION  directory (file), table name (db) or redis:// URL
+    HOSTEL_CACHE_VERSION   key version; bump it on deploy to orphan every old key
+    HOSTEL_CACHE_PREFIX    key prefix (default "hostel_pro")
+    HOSTEL_SESSION_ENGINE  overrides the session engine picked by session_engine_from_env()
+
+Aliases are the same as hostel_manager's: default (table versions for page
+ETags, only used when the cache is shared), sessions, fragments and exports. `db` needs
+`python manage.py createcachetable` once; `redis` needs redis-py. This module
+is imported by the settings file, so it must not import Django models.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+
+# alias -> default timeout in seconds (None = until deleted)
+ALIASES = {
+    'default': 300,
+    'sessions': 60 * 60 * 24 * 14,  # SESSION_COOKIE_AGE
+    'fragments': 60 * 60,
+    'exports': None,
+}
+
+# every web process sees the same entries; locmem is per process
+SHARED_BACKENDS = ('file', 'db', 'redis')
+
+CACHED_SESSION_ENGINE = 'malnad_app.sessions'
+DB_SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+
+DB_TABLE = 'hostel_pro_cache'
+REDIS_URL = 'redis://127.0.0.1:6379/1'
+
+
+def build_caches(backend='locmem', location=None, version=1, prefix='hostel_pro', base_dir='.'):
+    if backend not in BACKENDS:
+        raise ImproperlyConfigured(f"Unknown cache backend {backend!r}; choose from {', '.join(BACKENDS)}")
+    caches = {}
+    for alias, timeout in ALIASES.items():
+        if backend == 'locmem':
+            where = f"{prefix}-{alias}"
+        elif backend == 'file':
+            where = os.path.join(location or os.path.join(base_dir, 'cache'), alias)
+        elif backend == 'db':
+            where = location or DB_TABLE
+        else:
+            where = location or REDIS_URL
+        caches[alias] = {
+            'BACKEND': BACKENDS[backend],
+            'LOCATION': where,
+            'TIMEOUT': timeout,
+            'KEY_PREFIX': f"{prefix}:{alias}",
+            'VERSION': version,
+        }
+    return caches
+
+
+def caches_from_env(base_dir, environ=os.environ):
+    return build_caches(
+        backend=environ.get('HOSTEL_CACHE_BACKEND', 'locmem'),
+        location=environ.get('HOSTEL_CACHE_LOCATION') or None,
+        version=int(environ.get('HOSTEL_CACHE_VERSION', 1)),
+        prefix=environ.get('HOSTEL_CACHE_PREFIX', 'hostel_pro'),
+        base_dir=base_dir,
+    )
+
+
+def shared_cache_from_env(environ=os.environ):
+    """Whether every web process sees the same cache entries (settings.SHARED_CACHE)."""
+    return environ.get('HOSTEL_CACHE_BACKEND', 'locmem') in SHARED_BACKENDS
+
+
+def session_engine_from_env(environ=os.environ):
+    """
+    The cache-backed session engine only when the cache is shared: with a
+    per-process locmem cache a logout in one worker would leave the session
+    live in the others until it expired.
+    """
+    if environ.get('HOSTEL_SESSION_ENGINE'):
+        return environ['HOSTEL_SESSION_ENGINE']
+    if shared_cache_from_env(environ):
+        return CACHED_SESSION_ENGINE
+    return DB_SESSION_ENGINE
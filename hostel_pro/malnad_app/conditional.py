@@ -0,0 +1,64 @@
+# malnad_app/conditional.py
+"""
+Conditional GET for the staff list pages.
+
+Each table has a version token in the cache that signals.py (and
+allocation.py, which moves counters with update()) drop on every write.
+`conditional_page(state)` hashes what `state(request, ...)` returns, usually
+those tokens plus a MAX(id) that also catches bulk inserts, into an ETag
+and answers a matching If-None-Match with 304 before the view loads rows
+or renders a template.
+
+Only with settings.SHARED_CACHE: a bump lands in one process's locmem
+cache, and the other workers would keep answering 304 with no expiry.
+Without it the pages are served whole, without an ETag.
+"""
+import hashlib
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+
+# --- Table versions ---
+def _version_key(model):
+    return f'malnad_app:table_version:{model._meta.label_lower}'
+
+
+def table_version(*models):
+    """Opaque tokens that change whenever rows of `models` are written."""
+    return tuple(cache.get_or_set(_version_key(m), lambda: uuid.uuid4().hex, None) for m in models)
+
+
+def bump_table_version(*models):
+    cache.delete_many([_version_key(m) for m in models])
+
+
+# --- Views ---
+def make_etag(request, parts):
+    # the nav differs for staff and for signed-in students
+    raw = repr((request.user.pk, request.session.get('student_id'), parts))
+    return f'"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+
+def conditional_page(state):
+    def decorator(view):
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or not settings.SHARED_CACHE:
+                return view(request, *args, **kwargs)
+            etag = make_etag(request, state(request, *args, **kwargs))
+            response = None
+            if not get_messages(request):  # pending flash messages must be rendered
+                response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return inner
+    return decorator
@@ -0,0 +1,75 @@
+# malnad_app/dashboard.py
+"""
+Numbers for the staff dashboard.
+
+compute_metrics() gets all four in one statement: conditional aggregates
+over Room plus scalar COUNT subqueries for students and bookings.
+
+get_metrics() / aget_metrics() keep the result for
+settings.DASHBOARD_METRICS_TTL seconds (default 5). Once it is stale, the
+first request to take a short refresh lock recomputes it while concurrent
+ones keep serving the previous numbers, so a burst of staff refreshes costs
+one round trip.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, IntegerField, Q, Subquery
+
+from .models import Booking, Room, Student
+
+METRICS_CACHE_KEY = 'malnad_app:dashboard_metrics'
+REFRESH_LOCK_KEY = 'malnad_app:dashboard_metrics:refresh'
+STALE_GRACE = 60  # seconds stale numbers may still be shown while one request refreshes
+
+
+class SubqueryCount(Subquery):
+    """`(SELECT COUNT(*) FROM (<queryset>))` usable inside aggregate()."""
+    template = '(SELECT COUNT(*) FROM (%(subquery)s) _count)'
+    output_field = IntegerField()
+    # lets aggregate() accept it next to real aggregates; the subquery is a
+    # constant for the outer row so no GROUP BY is needed
+    contains_aggregate = True
+
+
+def _aggregates():
+    return {
+        'total_rooms': Count('pk'),
+        'available_rooms': Count('pk', filter=Q(capacity__gt=F('occupied'))),
+        'total_students': SubqueryCount(Student.objects.values('pk')),
+        'total_bookings': SubqueryCount(Booking.objects.values('pk')),
+    }
+
+
+def compute_metrics():
+    """Run the one-statement metrics query (no cache)."""
+    return Room.objects.aggregate(**_aggregates())
+
+
+def _ttl():
+    return getattr(settings, 'DASHBOARD_METRICS_TTL', 5)
+
+
+def _entry(metrics):
+    return (time.time() + _ttl(), metrics)
+
+
+def get_metrics():
+    entry = cache.get(METRICS_CACHE_KEY)
+    if entry is not None and (entry[0] > time.time() or not cache.add(REFRESH_LOCK_KEY, 1, _ttl() or 1)):
+        return entry[1]
+    metrics = compute_metrics()
+    cache.set(METRICS_CACHE_KEY, _entry(metrics), _ttl() + STALE_GRACE)
+    cache.delete(REFRESH_LOCK_KEY)
+    return metrics
+
+
+async def aget_metrics():
+    entry = await cache.aget(METRICS_CACHE_KEY)
+    if entry is not None and (entry[0] > time.time() or not await cache.aadd(REFRESH_LOCK_KEY, 1, _ttl() or 1)):
+        return entry[1]
+    metrics = await Room.objects.aaggregate(**_aggregates())
+    await cache.aset(METRICS_CACHE_KEY, _entry(metrics), _ttl() + STALE_GRACE)
+    await cache.adelete(REFRESH_LOCK_KEY)
+    return metrics
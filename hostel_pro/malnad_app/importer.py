@@ -0,0 +1,204 @@
+# malnad_app/importer.py
+"""
+Bulk import of rooms and students from CSV or TSV.
+
+    report = import_rows('students', text_stream)
+
+The file needs a header row; the delimiter (comma or tab) is taken from it.
+
+    rooms     number, capacity
+    students  roll_no, name, phone, email, room   (room = room number, optional)
+
+Rows are read CHUNK_SIZE at a time and checked against sets of the
+existing roll numbers / room numbers loaded once up front, so validation
+costs no query per row. Each chunk of good rows goes in with
+bulk_create(ignore_conflicts=True), so a row someone else inserted
+meanwhile is skipped instead of failing the import; the chunk's keys are
+looked up before and after the insert (two queries per chunk) so such rows
+are reported as errors, not counted as created. bulk_create skips
+save() and signals, so the search keys are filled in here, room occupancy is
+recounted once at the end with a single UPDATE, and the table versions
+are bumped on commit.
+
+Bad rows never stop the import. They are collected in the report as
+(line, key, message) and can be written out with ImportReport.write_errors().
+"""
+import csv
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from .conditional import bump_table_version
+from .models import Room, Student, normalize_code, normalize_name
+
+CHUNK_SIZE = 500
+KINDS = ('rooms', 'students')
+COLUMNS = {
+    'rooms': ('number', 'capacity'),
+    'students': ('roll_no', 'name', 'phone', 'email', 'room'),
+}
+REQUIRED = {'rooms': ('number',), 'students': ('roll_no', 'name')}
+
+
+class ImportFileError(Exception):
+    """The file as a whole can't be imported (missing header, unknown kind)."""
+
+
+class ImportReport:
+    def __init__(self, kind):
+        self.kind = kind
+        self.rows = 0
+        self.created = 0
+        self.errors = []  # (line, key, message)
+
+    def error(self, line, key, message):
+        self.errors.append((line, key, message))
+
+    def write_errors(self, fh):
+        writer = csv.writer(fh)
+        writer.writerow(['line', 'key', 'error'])
+        writer.writerows(self.errors)
+
+    def __str__(self):
+        return f"{self.kind}: {self.rows} rows, {self.created} created, {len(self.errors)} rejected"
+
+
+def _reader(stream):
+    header = stream.readline()
+    if not header.strip():
+        raise ImportFileError("The file is empty.")
+    delimiter = '\t' if header.count('\t') > header.count(',') else ','
+    columns = [c.strip().lower() for c in next(csv.reader([header], delimiter=delimiter))]
+    return columns, csv.reader(stream, delimiter=delimiter)
+
+
+def _max_length(model, field):
+    return model._meta.get_field(field).max_length
+
+
+# --- Row checks: build(row) returns (unsaved object, None) or (None, error) ---
+class _Rooms:
+    model = Room
+    key = 'number'
+
+    def __init__(self):
+        self.taken = set(Room.objects.values_list('number', flat=True))
+
+    def build(self, row):
+        number = row['number']
+        if len(number) > _max_length(Room, 'number'):
+            return None, f"number is longer than {_max_length(Room, 'number')} characters"
+        if number in self.taken:
+            return None, "room already exists"
+        try:
+            capacity = int(row.get('capacity') or 1)
+        except ValueError:
+            return None, f"capacity {row['capacity']!r} is not a number"
+        if capacity < 1:
+            return None, "capacity must be at least 1"
+        self.taken.add(number)  # later duplicates in the file are rejected
+        return Room(number=number, number_key=normalize_code(number), capacity=capacity, occupied=0), None
+
+    def finish(self):
+        pass
+
+
+class _Students:
+    model = Student
+    key = 'roll_no'
+
+    def __init__(self):
+        self.taken = set(Student.objects.values_list('roll_no', flat=True))
+        # number -> [pk, free beds]; rooms are few next to students
+        self.rooms = {number: [pk, capacity - occupied] for number, pk, capacity, occupied
+                      in Room.objects.values_list('number', 'pk', 'capacity', 'occupied')}
+        self.touched = set()
+
+    def build(self, row):
+        roll_no, name = row['roll_no'], row['name']
+        for field in ('roll_no', 'name', 'phone'):
+            if len(row.get(field, '')) > _max_length(Student, field):
+                return None, f"{field} is longer than {_max_length(Student, field)} characters"
+        if roll_no in self.taken:
+            return None, "student already exists"
+        email = row.get('email', '')
+        if email:
+            try:
+                validate_email(email)
+            except ValidationError:
+                return None, f"invalid email {email!r}"
+        room_id = None
+        if row.get('room'):
+            room = self.rooms.get(row['room'])
+            if room is None:
+                return None, f"no room numbered {row['room']}"
+            if room[1] <= 0:
+                return None, f"room {row['room']} is full"
+            room[1] -= 1
+            room_id = room[0]
+            self.touched.add(room_id)
+        self.taken.add(roll_no)
+        return Student(roll_no=roll_no, roll_key=normalize_code(roll_no), name=name, name_key=normalize_name(name),
+                       phone=row.get('phone', ''), email=email, room_id=room_id), None
+
+    def finish(self):
+        # one UPDATE from the real student counts, whatever raced with us
+        Room.objects.recount(*self.touched)
+
+
+def _insert(checker, pending, report):
+    """bulk_create one chunk and report the rows that weren't actually inserted."""
+    manager = checker.model.objects
+    lookup = {f'{checker.key}__in': [key for _, key, _ in pending]}
+    # added by someone else since the preload; ignore_conflicts would skip them silently
+    before = set(manager.filter(**lookup).values_list(checker.key, flat=True))
+    manager.bulk_create([obj for _, _, obj in pending], batch_size=len(pending), ignore_conflicts=True)
+    inserted = set(manager.filter(**lookup).values_list(checker.key, flat=True)) - before
+    for line, key, _ in pending:
+        if key in inserted:
+            report.created += 1
+        else:
+            report.error(line, key, f"{checker.model._meta.verbose_name} added by someone else during the import")
+
+
+def import_rows(kind, stream, chunk_size=CHUNK_SIZE):
+    """Import `kind` ('rooms' or 'students') from a text stream; returns an ImportReport."""
+    if kind not in KINDS:
+        raise ImportFileError(f"Unknown import {kind!r}; choose from {', '.join(KINDS)}")
+    columns, reader = _reader(stream)
+    missing = [c for c in REQUIRED[kind] if c not in columns]
+    if missing:
+        raise ImportFileError(f"Missing column(s): {', '.join(missing)}. Expected: {', '.join(COLUMNS[kind])}")
+
+    report = ImportReport(kind)
+    with transaction.atomic():
+        checker = _Rooms() if kind == 'rooms' else _Students()
+        line = 1
+        while True:
+            chunk = list(islice(reader, chunk_size))
+            if not chunk:
+                break
+            pending = []  # (line, key, obj)
+            for values in chunk:
+                line += 1
+                if not any(v.strip() for v in values):
+                    continue  # blank line
+                report.rows += 1
+                row = {c: v.strip() for c, v in zip(columns, values)}
+                key = row.get(REQUIRED[kind][0], '')
+                empty = [c for c in REQUIRED[kind] if not row.get(c)]
+                if empty:
+                    report.error(line, key, f"missing {', '.join(empty)}")
+                    continue
+                obj, message = checker.build(row)
+                if message:
+                    report.error(line, key, message)
+                else:
+                    pending.append((line, key, obj))
+            if pending:
+                _insert(checker, pending, report)
+        checker.finish()
+        transaction.on_commit(lambda: bump_table_version(Room, Student))
+    return report
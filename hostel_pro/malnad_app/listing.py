@@ -0,0 +1,97 @@
+# malnad_app/listing.py
+"""
+Shared machinery for the staff list pages.
+
+A Listing describes one page: the base queryset, its keyset ordering, the
+columns fetched with only(), the GET filters it accepts and what `q`
+searches (see starts_with()). Listing.context(request) applies them and returns what the
+template needs: the KeysetPage, the current filter values and the URL of
+the next page (`after=<cursor>`, other parameters kept). Filters and search
+map onto indexed columns, so page 1000 costs the same index seek as page 1.
+"""
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+
+from .pagination import PAGE_SIZE, keyset_page
+
+
+# --- Filter value parsers (None = ignore the parameter) ---
+def as_int(value):
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def as_date(value):
+    try:
+        return parse_date(value)
+    except ValueError:  # well-formed but impossible, e.g. 2024-02-30
+        return None
+
+
+def as_flag(value):
+    return True if value in ('1', 'on', 'true', 'yes') else None
+
+
+def filter_on(lookup, parse=str):
+    """Filter building `Q(lookup=parse(value))`."""
+    def build(value):
+        parsed = parse(value)
+        return None if parsed is None else Q(**{lookup: parsed})
+    return build
+
+
+# U+10FFFF sorts after every other character, so `prefix <= value < prefix + PREFIX_END`
+# is every value starting with `prefix`.
+PREFIX_END = '\U0010ffff'
+
+
+def starts_with(field, prefix):
+    """
+    `field` starts with `prefix`, as a range an index can seek. __startswith
+    compiles to LIKE, which SQLite matches case-insensitively and so can't
+    answer from a plain (BINARY) index; callers search a key column stored
+    in one case (e.g. Student.roll_key) with the prefix normalised to match.
+    """
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': prefix + PREFIX_END})
+
+
+class Listing:
+    def __init__(self, queryset, ordering, only=(), filters=None, search=None, size=PAGE_SIZE):
+        self.queryset = queryset
+        self.ordering = ordering
+        self.only = only
+        self.filters = filters or {}  # GET name -> build(value) returning a Q or None
+        self.search = search          # build(term) -> Q, applied for `q`
+        self.size = size
+
+    def filtered(self, params):
+        qs = self.queryset.only(*self.only) if self.only else self.queryset
+        for name, build in self.filters.items():
+            value = params.get(name, '').strip()
+            condition = build(value) if value else None
+            if condition is not None:
+                qs = qs.filter(condition)
+        term = params.get('q', '').strip()
+        if term and self.search:
+            qs = qs.filter(self.search(term))
+        return qs
+
+    def context(self, request):
+        params = request.GET
+        page = keyset_page(self.filtered(params), self.ordering, params.get('after'), self.size)
+        query = params.copy()
+        query.pop('after', None)
+        first_url = f"?{query.urlencode()}"
+        next_url = None
+        if page.has_next:
+            query['after'] = page.next_cursor
+            next_url = f"?{query.urlencode()}"
+        return {
+            'page': page,
+            'filters': {name: params.get(name, '') for name in [*self.filters, 'q']},
+            'is_first_page': not params.get('after'),
+            'first_url': first_url,
+            'next_url': next_url,
+        }
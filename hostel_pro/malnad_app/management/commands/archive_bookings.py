@@ -0,0 +1,33 @@
+"""
+Move bookings that ended before the retention window to the archive table.
+
+    python manage.py archive_bookings [--days 365] [--batch-size 2000] [--dry-run]
+
+--days defaults to settings.BOOKING_RETENTION_DAYS. Safe to run from cron;
+each batch is its own transaction, so an interrupted run just leaves the
+rest for the next one.
+"""
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from malnad_app import archive
+
+
+class Command(BaseCommand):
+    help = "Archive bookings that ended more than the retention window ago."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Retention in days (default: BOOKING_RETENTION_DAYS).")
+        parser.add_argument('--batch-size', type=int, default=archive.BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Count what would be archived.")
+
+    def handle(self, *args, **opts):
+        if opts['days'] is None:
+            before = archive.cutoff()
+        else:
+            before = timezone.localdate() - datetime.timedelta(days=opts['days'])
+        count = archive.archive_bookings(before, batch_size=opts['batch_size'], dry_run=opts['dry_run'])
+        verb = "would be archived" if opts['dry_run'] else "archived"
+        self.stdout.write(self.style.SUCCESS(f"{count} booking(s) ended before {before} {verb}."))
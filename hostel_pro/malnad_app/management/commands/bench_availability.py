@@ -0,0 +1,129 @@
+"""
+Time free-bed searches over date ranges at a million bookings.
+
+    python manage.py bench_availability [--students 250000 --bookings 4] [--repeat 5] [--output avail.json]
+
+Seeds a throw-away database (see bench_sessions); the defaults give about
+1M bookings. For windows of increasing length it times, in milliseconds
+(median of --repeat runs):
+  sweep     availability.available_rooms(), the whole hostel
+  one_room  availability.peak_occupancy() for a single room
+  per_day   the naive way: one grouped COUNT of the overlapping bookings per
+            day of the window, for comparison (skipped past --per-day-max days)
+  api       the JSON endpoint through the test client
+and prints the query plan the sweep's query runs with.
+"""
+import datetime
+import json
+import os
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from malnad_app import availability, seeding
+from malnad_app.models import Room
+
+from .bench_sessions import Command as BenchSessionsCommand
+
+WINDOWS = (1, 7, 30, 180)  # days
+OFFSETS = (0, 90)  # window starts this many days from today
+
+
+def _median_ms(call, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        times.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(times), 2)
+
+
+def per_day_peaks(start, end):
+    """Baseline: count the bookings of every room separately for each day."""
+    peaks = {}
+    day = start
+    while day <= end:
+        for row in availability.overlapping(day, day).values('room_id').annotate(n=Count('pk')).order_by():
+            peaks[row['room_id']] = max(peaks.get(row['room_id'], 0), row['n'])
+        day += datetime.timedelta(days=1)
+    return peaks
+
+
+class Command(BenchSessionsCommand):
+    help = "Benchmark the interval-sweep availability search against per-day counting."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=90000)
+        parser.add_argument('--students', type=int, default=250000)
+        parser.add_argument('--bookings', type=int, default=4, help="Bookings per student.")
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--per-day-max', type=int, default=30,
+                            help="Longest window to run the per-day baseline on.")
+        parser.add_argument('--output', help="Write JSON results to this file.")
+
+    def handle(self, *args, **opts):
+        old_name, tmp_path = self.setup_database()
+        try:
+            started = time.perf_counter()
+            counts = seeding.seed(rooms=opts['rooms'], students=opts['students'],
+                                  bookings_per_student=opts['bookings'], prefix='BENCH')
+            self.stdout.write(f"seeded {counts} in {time.perf_counter() - started:.1f}s")
+            if connection.vendor in ('sqlite', 'postgresql'):
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')  # fresh statistics, as on a live database
+            plan = self.query_plan()
+            staff = User.objects.create_user(username='bench-staff', is_staff=True)
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(staff)
+            room_id = Room.objects.order_by('pk').values_list('pk', flat=True).first()
+            results = []
+            today = timezone.localdate()
+            for offset in OFFSETS:
+                for days in WINDOWS:
+                    start = today + datetime.timedelta(days=offset)
+                    end = start + datetime.timedelta(days=days - 1)
+                    results.append(self.run_window(start, end, days, room_id, client, opts))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.stdout.write("query plan:\n  " + "\n  ".join(plan))
+        self.stdout.write(f"{'start':<11} {'days':>5} {'free rooms':>10} {'sweep ms':>9} {'one_room ms':>11} "
+                          f"{'per_day ms':>10} {'api ms':>8}")
+        for r in results:
+            self.stdout.write(f"{r['start']:<11} {r['days']:>5} {r['free_rooms']:>10} {r['sweep_ms']:>9} "
+                              f"{r['one_room_ms']:>11} {r['per_day_ms'] or '-':>10} {r['api_ms']:>8}")
+        if opts['output']:
+            with open(opts['output'], 'w') as fh:
+                json.dump({'seeded': counts, 'plan': plan, 'results': results}, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {opts['output']}"))
+
+    def query_plan(self):
+        today = timezone.localdate()
+        rows = (availability.overlapping(today, today).order_by('room_id', 'start_date')
+                .values_list('room_id', 'start_date', 'end_date'))
+        return rows.explain().splitlines()
+
+    def run_window(self, start, end, days, room_id, client, opts):
+        repeat = opts['repeat']
+        url = reverse('malnad_app:availability_api')
+        params = {'start': start.isoformat(), 'end': end.isoformat()}
+        per_day_ms = None
+        if days <= opts['per_day_max']:
+            per_day_ms = _median_ms(lambda: per_day_peaks(start, end), max(1, repeat // 2))
+        return {
+            'start': start.isoformat(),
+            'days': days,
+            'free_rooms': len(availability.available_rooms(start, end)),
+            'sweep_ms': _median_ms(lambda: availability.available_rooms(start, end), repeat),
+            'one_room_ms': _median_ms(lambda: availability.peak_occupancy(start, end, [room_id]), repeat),
+            'per_day_ms': per_day_ms,
+            'api_ms': _median_ms(lambda: client.get(url, params), repeat),
+        }
@@ -0,0 +1,103 @@
+"""
+Show that list pages cost the same at any depth.
+
+    python manage.py bench_lists --students 50000 --bookings 4 [--repeat 20] [--output lists.json]
+
+Seeds a throw-away database (see bench_sessions), then for the student,
+room and booking lists times the page at several depths three ways:
+  keyset  the list view's own query (Listing + keyset_page from a cursor)
+  offset  the same rows fetched with OFFSET, for comparison
+  view    the whole request through the test client (keyset)
+Reported numbers are medians over --repeat runs, in milliseconds.
+"""
+import json
+import os
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, RequestFactory
+from django.urls import reverse
+
+from malnad_app import seeding, views
+from malnad_app.pagination import encode_cursor, keyset_page
+
+from .bench_sessions import Command as BenchSessionsCommand
+
+LISTS = [
+    ('students', views.STUDENT_LISTING, 'malnad_app:student_list'),
+    ('rooms', views.ROOM_LISTING, 'malnad_app:room_list'),
+    ('bookings', views.BOOKING_LISTING, 'malnad_app:booking_list'),
+]
+DEPTHS = (1, 10, 100, 1000, 5000)  # page numbers
+
+
+def _median_ms(call, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        times.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(times), 3)
+
+
+class Command(BenchSessionsCommand):
+    help = "Time keyset-paginated list pages against OFFSET at increasing depth."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=2000)
+        parser.add_argument('--students', type=int, default=20000)
+        parser.add_argument('--bookings', type=int, default=4, help="Bookings per student.")
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--output', help="Write JSON results to this file.")
+
+    def handle(self, *args, **opts):
+        old_name, tmp_path = self.setup_database()
+        try:
+            started = time.perf_counter()
+            counts = seeding.seed(rooms=opts['rooms'], students=opts['students'],
+                                  bookings_per_student=opts['bookings'], prefix='BENCH')
+            self.stdout.write(f"seeded {counts} in {time.perf_counter() - started:.1f}s")
+            staff = User.objects.create_user(username='bench-staff', is_staff=True)
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(staff)
+            results = [row for name, listing, url_name in LISTS
+                       for row in self.run_list(name, listing, reverse(url_name), client, opts['repeat'])]
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.stdout.write(f"{'list':<10} {'page':>6} {'keyset ms':>10} {'offset ms':>10} {'view ms':>9}")
+        for r in results:
+            self.stdout.write(f"{r['list']:<10} {r['page']:>6} {r['keyset_ms']:>10} {r['offset_ms']:>10} "
+                              f"{r['view_ms']:>9}")
+        if opts['output']:
+            with open(opts['output'], 'w') as fh:
+                json.dump({'seeded': counts, 'results': results}, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {opts['output']}"))
+
+    def run_list(self, name, listing, url, client, repeat):
+        qs = listing.filtered(RequestFactory().get(url).GET)
+        field = listing.ordering.lstrip('-')
+        ordered = qs.order_by(listing.ordering, '-pk' if listing.ordering.startswith('-') else 'pk')
+        total = qs.count()
+        rows = []
+        for page in DEPTHS:
+            offset = (page - 1) * listing.size
+            if offset >= total:
+                break
+            cursor = None
+            if offset:
+                # the cursor a user would hold after walking to this page
+                value, pk = ordered.values_list(field, 'pk')[offset - 1]
+                cursor = encode_cursor(value, pk)
+            rows.append({
+                'list': name,
+                'page': page,
+                'keyset_ms': _median_ms(lambda: keyset_page(qs, listing.ordering, cursor, listing.size), repeat),
+                'offset_ms': _median_ms(lambda: list(ordered[offset:offset + listing.size]), repeat),
+                'view_ms': _median_ms(lambda: client.get(url, {'after': cursor} if cursor else {}), repeat),
+            })
+        return rows
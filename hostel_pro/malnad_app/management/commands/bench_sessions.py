@@ -0,0 +1,125 @@
+"""
+Measure per-request session overhead for each session engine.
+
+    python manage.py bench_sessions --requests 500 [--engine ...] [--output sessions.json]
+
+Runs against a throw-away database (a temporary SQLite file, or the usual
+test database on other backends) and throw-away local-memory caches. For
+every engine a student signs in once, then the student dashboard is
+requested --requests times and the student signs in again --requests times
+(a no-op write). Reported per request:
+latency, all queries, queries on django_session and session writes.
+"""
+import json
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from malnad_app import seeding
+from malnad_app.models import Student
+
+ENGINES = [
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'malnad_app.sessions',
+    'django.contrib.sessions.backends.signed_cookies',
+]
+
+
+def bench_caches():
+    """A separate, empty local-memory cache for every configured alias."""
+    return {alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'bench-{alias}'}
+            for alias in settings.CACHES}
+
+
+def _is_session_write(sql):
+    sql = sql.lstrip().upper()
+    return 'DJANGO_SESSION' in sql and sql.startswith(('INSERT', 'UPDATE', 'DELETE'))
+
+
+class Command(BaseCommand):
+    help = "Compare session engines: queries, writes and latency per student request."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300, help="Requests per scenario and engine.")
+        parser.add_argument('--engine', action='append', choices=ENGINES, help="Only these engines (repeatable).")
+        parser.add_argument('--output', help="Write JSON results to this file.")
+
+    def handle(self, *args, **opts):
+        old_name, tmp_path = self.setup_database()
+        try:
+            seeding.seed(rooms=20, students=50, bookings_per_student=2, prefix='BENCH')
+            student = Student.objects.order_by('pk').first()
+            results = []
+            for engine in opts['engine'] or ENGINES:
+                with override_settings(SESSION_ENGINE=engine):
+                    results.extend(self.run_engine(engine, student, opts['requests']))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.stdout.write(f"{'engine':<48} {'scenario':<10} {'avg ms':>8} {'queries':>8} "
+                          f"{'session q':>9} {'writes':>7}")
+        for r in results:
+            self.stdout.write(f"{r['engine']:<48} {r['scenario']:<10} {r['avg_ms']:>8} {r['queries']:>8} "
+                              f"{r['session_queries']:>9} {r['session_writes']:>7}")
+        if opts['output']:
+            with open(opts['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {opts['output']}"))
+
+    def setup_database(self):
+        tmp_path = None
+        if connection.vendor == 'sqlite':
+            fd, tmp_path = tempfile.mkstemp(prefix='bench_sessions_', suffix='.sqlite3')
+            os.close(fd)
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = tmp_path
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        # fresh per-process caches under the configured aliases, so clearing
+        # them between engines never touches the deployment's real ones
+        override_settings(CACHES=bench_caches()).enable()
+        return old_name, tmp_path
+
+    def run_engine(self, engine, student, total):
+        for cache in caches.all():
+            cache.clear()
+        client = Client(HTTP_HOST='localhost')
+        login = {'student_login': '1', 'usn': student.roll_no, 'name': student.name}
+        client.post(reverse('landing'), login)
+        dashboard = reverse('malnad_app:student_dashboard')
+        scenarios = [
+            ('dashboard', lambda: client.get(dashboard)),
+            ('relogin', lambda: client.post(reverse('landing'), login)),
+        ]
+        results = []
+        for name, call in scenarios:
+            elapsed = queries = session_queries = writes = 0
+            for _ in range(total):
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    call()
+                    elapsed += time.perf_counter() - start
+                sqls = [q['sql'] for q in ctx.captured_queries]
+                queries += len(sqls)
+                session_queries += sum(1 for sql in sqls if 'django_session' in sql)
+                writes += sum(1 for sql in sqls if _is_session_write(sql))
+            results.append({
+                'engine': engine,
+                'scenario': name,
+                'requests': total,
+                'avg_ms': round(elapsed / total * 1000, 3),
+                'queries': round(queries / total, 2),
+                'session_queries': round(session_queries / total, 2),
+                'session_writes': round(writes / total, 2),
+            })
+        return results
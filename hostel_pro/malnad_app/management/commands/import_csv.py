@@ -0,0 +1,40 @@
+"""
+Bulk-import rooms or students from a CSV/TSV file.
+
+    python manage.py import_csv rooms rooms.csv
+    python manage.py import_csv students intake.tsv [--errors rejected.csv] [--chunk-size 500]
+
+Columns and rules are described in malnad_app/importer.py. Rejected rows
+are listed (or written to --errors) with their line number and reason;
+the rest are imported.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from malnad_app import importer
+
+
+class Command(BaseCommand):
+    help = "Import rooms or students in bulk from a CSV or TSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=importer.KINDS)
+        parser.add_argument('path', help="CSV or TSV file with a header row.")
+        parser.add_argument('--errors', help="Write rejected rows to this CSV instead of listing them.")
+        parser.add_argument('--chunk-size', type=int, default=importer.CHUNK_SIZE)
+
+    def handle(self, *args, **opts):
+        try:
+            with open(opts['path'], encoding='utf-8-sig', newline='') as fh:
+                report = importer.import_rows(opts['kind'], fh, opts['chunk_size'])
+        except (OSError, UnicodeDecodeError, importer.ImportFileError) as exc:
+            raise CommandError(str(exc))
+
+        if opts['errors'] and report.errors:
+            with open(opts['errors'], 'w', newline='') as fh:
+                report.write_errors(fh)
+            self.stdout.write(f"Rejected rows written to {opts['errors']}")
+        else:
+            for line, key, message in report.errors:
+                self.stdout.write(f"line {line} ({key}): {message}")
+        style = self.style.WARNING if report.errors else self.style.SUCCESS
+        self.stdout.write(style(str(report)))
@@ -0,0 +1,26 @@
+"""
+Recompute Room.occupied from the students actually assigned to each room.
+
+    python manage.py reconcile_occupancy [--dry-run]
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from malnad_app.models import Room
+
+
+class Command(BaseCommand):
+    help = "Fix drift between Room.occupied and the students assigned to each room."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without fixing it.")
+
+    def handle(self, *args, **opts):
+        with transaction.atomic():
+            fixes = Room.objects.reconcile(dry_run=opts['dry_run'])
+
+        for room, old, new in fixes:
+            flag = '  OVER CAPACITY' if new > room.capacity else ''
+            self.stdout.write(f"Room {room.number}: {old} -> {new}{flag}")
+        verb = "would fix" if opts['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"{len(fixes)} room(s) {verb}."))
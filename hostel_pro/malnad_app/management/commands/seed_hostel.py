@@ -0,0 +1,41 @@
+"""
+Fill the database with deterministic synthetic rooms, students and bookings.
+
+    python manage.py seed_hostel --rooms 2000 --students 6000 --bookings 4
+
+Use a new --prefix for each additional batch on the same database.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from malnad_app import seeding
+from malnad_app.models import Room
+
+
+class Command(BaseCommand):
+    help = "Bulk-insert synthetic rooms, students and booking history."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=500)
+        parser.add_argument('--students', type=int, default=1500)
+        parser.add_argument('--bookings', type=int, default=3, help="Bookings per student (history + current).")
+        parser.add_argument('--prefix', default='SEED', help="Namespace for roll numbers and room numbers.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed.")
+        parser.add_argument('--batch-size', type=int, default=seeding.BATCH_SIZE)
+
+    def handle(self, *args, **opts):
+        prefix = opts['prefix']
+        if Room.objects.filter(number__startswith=f"{prefix}-").exists():
+            raise CommandError(f"Data with prefix {prefix!r} already exists; pick another --prefix.")
+
+        started = time.perf_counter()
+        counts = seeding.seed(rooms=opts['rooms'], students=opts['students'],
+                              bookings_per_student=opts['bookings'], prefix=prefix,
+                              random_seed=opts['seed'], batch_size=opts['batch_size'])
+        elapsed = time.perf_counter() - started
+
+        total = sum(counts.values())
+        for model, n in counts.items():
+            self.stdout.write(f"{model:>10}: {n}")
+        self.stdout.write(self.style.SUCCESS(f"{total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)."))
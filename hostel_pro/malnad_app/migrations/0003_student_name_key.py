@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:40
+
+from django.db import migrations, models
+
+
+def fill_name_key(apps, schema_editor):
+    # same as models.normalize_name; historical models have no save() override
+    Student = apps.get_model('malnad_app', 'Student')
+    students = list(Student.objects.only('pk', 'name'))
+    for student in students:
+        student.name_key = ' '.join(student.name.split()).casefold()
+    Student.objects.bulk_update(students, ['name_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('malnad_app', '0002_alter_room_number_alter_student_name_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='name_key',
+            field=models.CharField(default='', editable=False, max_length=120),
+        ),
+        migrations.RunPython(fill_name_key, migrations.RunPython.noop),
+    ]
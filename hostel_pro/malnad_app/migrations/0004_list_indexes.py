@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('malnad_app', '0003_student_name_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='name_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=120),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['start_date', 'id'], name='booking_start_id_idx'),
+        ),
+    ]
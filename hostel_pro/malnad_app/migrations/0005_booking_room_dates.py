@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('malnad_app', '0004_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='room',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='malnad_app.room'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['room', 'start_date', 'end_date'], name='booking_room_dates_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('malnad_app', '0005_booking_room_dates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedBooking',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to='malnad_app.room')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to='malnad_app.student')),
+            ],
+            options={
+                'ordering': ['-start_date'],
+                'indexes': [models.Index(fields=['start_date', 'id'], name='archived_start_id_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:25
+
+from django.db import migrations, models
+
+
+def fill_code_keys(apps, schema_editor):
+    # same as models.normalize_code; historical models have no save() override
+    Room = apps.get_model('malnad_app', 'Room')
+    rooms = list(Room.objects.only('pk', 'number'))
+    for room in rooms:
+        room.number_key = room.number.upper()
+    Room.objects.bulk_update(rooms, ['number_key'], batch_size=500)
+    Student = apps.get_model('malnad_app', 'Student')
+    students = list(Student.objects.only('pk', 'roll_no'))
+    for student in students:
+        student.roll_key = student.roll_no.upper()
+    Student.objects.bulk_update(students, ['roll_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('malnad_app', '0006_archived_booking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='number_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='roll_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=30),
+        ),
+        migrations.RunPython(fill_code_keys, migrations.RunPython.noop),
+    ]
@@ -1,29 +1,100 @@
 # hoste_pro/malnad_app/models.py
 from django.db import models
 from django.core.validators import MinValueValidator
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+class RoomManager(models.Manager):
+    """
+    Keeps Room.occupied equal to the number of students whose `room` points
+    at it (booking_create moves the student, so this also covers bookings).
+    """
+
+    def _student_counts(self):
+        return Student.objects.filter(room__isnull=False).values('room').annotate(n=Count('pk'))
+
+    def recount(self, *room_ids):
+        """Recompute `occupied` for the given rooms in one UPDATE."""
+        ids = [pk for pk in room_ids if pk]
+        if not ids:
+            return 0
+        live = self._student_counts().filter(room=OuterRef('pk')).values('n')
+        return self.filter(pk__in=ids).update(occupied=Coalesce(Subquery(live), 0))
+
+    def reconcile(self, dry_run=False):
+        """Fix every drifted counter from one grouped COUNT. Returns [(room, old, new)]."""
+        actual = {row['room']: row['n'] for row in self._student_counts()}
+        fixes = []
+        for room in self.only('pk', 'number', 'capacity', 'occupied').iterator():
+            count = actual.get(room.pk, 0)
+            if room.occupied != count:
+                fixes.append((room, room.occupied, count))
+                room.occupied = count
+        if fixes and not dry_run:
+            self.bulk_update([room for room, _, _ in fixes], ['occupied'], batch_size=500)
+        return fixes
+
+def normalize_code(code):
+    """Form room numbers and USNs are searched by: typed in any case."""
+    return code.upper()
+
+def _with_key(kwargs, source, key):
+    # a save() limited to `source` must write its key along with it
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and source in update_fields:
+        kwargs['update_fields'] = {*update_fields, key}
+
 class Room(models.Model):
     number = models.CharField(max_length=20, unique=True)
+    number_key = models.CharField(max_length=20, editable=False, default='', db_index=True)  # normalize_code(number), set in save()
     capacity = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)])
     occupied = models.PositiveIntegerField(default=0)
 
+    objects = RoomManager()
+
+    def save(self, *args, **kwargs):
+        self.number_key = normalize_code(self.number)
+        _with_key(kwargs, 'number', 'number_key')
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.number}"
 
+def normalize_name(name):
+    """Form used to match the name typed at student login."""
+    return ' '.join(name.split()).casefold()
+
 class Student(models.Model):
     roll_no = models.CharField(max_length=30, unique=True)   # USN
+    roll_key = models.CharField(max_length=30, editable=False, default='', db_index=True)  # normalize_code(roll_no), set in save()
     name = models.CharField(max_length=120)
+    name_key = models.CharField(max_length=120, editable=False, default='', db_index=True)  # normalize_name(name), set in save()
     phone = models.CharField(max_length=20, blank=True)
     email = models.EmailField(blank=True)
     room = models.ForeignKey(Room, on_delete=models.SET_NULL, null=True, blank=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembered so the occupancy signal can tell when the room changed
+        instance._loaded_room_id = instance.__dict__.get('room_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.name_key = normalize_name(self.name)
+        self.roll_key = normalize_code(self.roll_no)
+        _with_key(kwargs, 'name', 'name_key')
+        _with_key(kwargs, 'roll_no', 'roll_key')
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.roll_no} - {self.name}"
 
 class Booking(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
-    room = models.ForeignKey(Room, on_delete=models.CASCADE)
+    # indexed by booking_room_dates_idx, whose leading column it is
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, db_index=False)
     start_date = models.DateField(default=timezone.now)
     end_date = models.DateField(null=True, blank=True)
 
@@ -32,3 +103,28 @@ class Booking(models.Model):
 
     class Meta:
         ordering = ['-start_date']
+        indexes = [
+            # keyset pages of booking_list walk (start_date, id) backwards
+            models.Index(fields=['start_date', 'id'], name='booking_start_id_idx'),
+            # availability.py reads (room, start_date, end_date) straight from it
+            models.Index(fields=['room', 'start_date', 'end_date'], name='booking_room_dates_idx'),
+        ]
+
+class ArchivedBooking(models.Model):
+    """A closed Booking moved out of the hot table by archive.py; keeps its id."""
+    id = models.BigIntegerField(primary_key=True)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='archived_bookings')
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='archived_bookings')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.student} -> {self.room} ({self.start_date}, archived)"
+
+    class Meta:
+        ordering = ['-start_date']
+        indexes = [
+            # keyset pages of booking_list?archived=1, like booking_start_id_idx
+            models.Index(fields=['start_date', 'id'], name='archived_start_id_idx'),
+        ]
@@ -0,0 +1,103 @@
+# malnad_app/pagination.py
+"""
+Keyset (seek) pagination.
+
+Instead of OFFSET, each page remembers the sort value + pk of its last row and
+the next page asks for rows strictly after it, so deep pages cost the same as
+the first one. The sort field needs an index that ends in the pk.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+
+PAGE_SIZE = 20
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+def encode_cursor(value, pk):
+    raw = json.dumps([str(value), pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, field=None):
+    """
+    Return (value, pk) or None for a missing / tampered cursor. With a model
+    `field` the value is converted by it, and one it rejects counts as tampered.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if field is not None:
+            value = field.to_python(value)
+        return value, int(pk)
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def _rows_after(qs, field, op, value, pk, limit):
+    """Up to `limit` rows strictly after (value, pk) in the page order."""
+    model_field = qs.model._meta.get_field(field)
+    connection = connections[qs.db]
+    if connection.vendor == 'postgresql':
+        # `(field, id) > (value, pk)` is a single seek on an index over (field, id)
+        quote = connection.ops.quote_name
+        table = quote(qs.model._meta.db_table)
+        sql = (f"({table}.{quote(model_field.column)}, {table}.{quote(qs.model._meta.pk.column)}) "
+               f"{'<' if op == 'lt' else '>'} (%s, %s)")
+        return list(qs.filter(RawSQL(sql, [value, pk], output_field=BooleanField()))[:limit])
+    # Elsewhere `value < x OR (value = x AND pk < y)` is only bounded on
+    # `value`, so every row tied with the cursor's value would be scanned
+    # (SQLite can't seek a row value that ends in the rowid). Two seeks
+    # instead: the rest of the tie group, then the rows past it.
+    rows = list(qs.filter(**{field: value, f'pk__{op}': pk})[:limit])
+    if len(rows) < limit:
+        rows += qs.filter(**{f'{field}__{op}': value})[:limit - len(rows)]
+    return rows
+
+
+def keyset_page(queryset, ordering, cursor=None, size=PAGE_SIZE):
+    """
+    Return one KeysetPage of `queryset` sorted by `ordering` ('number',
+    '-created_at', ...). Ties are broken on pk so the order is total.
+    """
+    descending = ordering.startswith('-')
+    field = ordering.lstrip('-')
+    op = 'lt' if descending else 'gt'
+    pk_order = '-pk' if descending else 'pk'
+
+    qs = queryset.order_by(ordering, pk_order)
+    position = decode_cursor(cursor, queryset.model._meta.get_field(field))
+    if position:
+        rows = _rows_after(qs, field, op, *position, size + 1)
+    else:
+        rows = list(qs[:size + 1])
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return KeysetPage(rows, next_cursor)
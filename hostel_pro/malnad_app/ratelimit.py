@@ -0,0 +1,53 @@
+# malnad_app/ratelimit.py
+"""
+In-memory token buckets for throttling login attempts.
+
+Each key (an IP address, a USN) gets a bucket of `burst` tokens that refills
+at `rate` tokens per second; an attempt takes one token and is refused when
+the bucket is empty. State lives in the process, so with N workers the
+effective limit is N times higher. That is fine here: the point is to shed a
+login storm before it reaches the database, not to enforce an exact quota.
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate, burst, max_keys=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = {}  # key -> (tokens, last refill time)
+        self._lock = threading.Lock()
+
+    def allow(self, key, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return allowed
+
+    def refund(self, key):
+        """Give back the token an allowed attempt took."""
+        with self._lock:
+            if key in self._buckets:
+                tokens, last = self._buckets[key]
+                self._buckets[key] = (min(self.burst, tokens + 1), last)
+
+    def configure(self, rate, burst):
+        """Change the limits; existing buckets keep their tokens (capped at the new burst on refill)."""
+        with self._lock:
+            self.rate, self.burst = rate, burst
+
+    def _prune(self, now):
+        # buckets that have refilled completely carry no state worth keeping
+        full_after = self.burst / self.rate
+        self._buckets = {k: v for k, v in self._buckets.items() if now - v[1] < full_after}
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
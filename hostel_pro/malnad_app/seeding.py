@@ -0,0 +1,77 @@
+# malnad_app/seeding.py
+"""
+Deterministic synthetic data for benchmarks and large-scale testing.
+
+Rows go in with bulk_create in batches inside one transaction. Every student
+gets a history of closed bookings plus, if a bed is free, a current booking
+for the room they live in.
+"""
+import datetime
+import random
+
+from django.db import transaction
+from django.utils import timezone
+
+from .conditional import bump_table_version
+from .models import Booking, Room, Student, normalize_code, normalize_name
+
+BATCH_SIZE = 2000
+
+FIRST_NAMES = ['Asha', 'Bhavya', 'Chetan', 'Divya', 'Ganesh', 'Kavya', 'Manoj', 'Nisha', 'Pooja', 'Rahul',
+               'Sneha', 'Tejas', 'Usha', 'Varun', 'Yash']
+LAST_NAMES = ['Rao', 'Shetty', 'Gowda', 'Hegde', 'Naik', 'Bhat', 'Kamath', 'Patil']
+
+
+def seed(rooms=100, students=300, bookings_per_student=3, prefix='SEED', random_seed=0, batch_size=BATCH_SIZE):
+    """Insert synthetic rooms, students and bookings; returns row counts per model."""
+    rng = random.Random(random_seed)
+    today = timezone.localdate()
+    counts = {}
+
+    with transaction.atomic():
+        room_objs = Room.objects.bulk_create(
+            [Room(number=f"{prefix}-{i:05d}", number_key=normalize_code(f"{prefix}-{i:05d}"),
+                  capacity=rng.choice((2, 3, 4))) for i in range(rooms)],
+            batch_size=batch_size,
+        )
+        counts['rooms'] = len(room_objs)
+
+        beds = [room for room in room_objs for _ in range(room.capacity)]
+        student_objs = []
+        for i in range(students):
+            room = beds[i] if i < len(beds) else None
+            if room is not None:
+                room.occupied += 1
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            student_objs.append(Student(
+                roll_no=f"{prefix}{i:07d}",
+                roll_key=normalize_code(f"{prefix}{i:07d}"),
+                name=name,
+                name_key=normalize_name(name),  # bulk_create skips save()
+                phone=f"9{rng.randint(10**8, 10**9 - 1)}",
+                room=room,
+            ))
+        # signals would recount rooms one by one; bulk_create skips them and
+        # the counters were filled in above
+        student_objs = Student.objects.bulk_create(student_objs, batch_size=batch_size)
+        Room.objects.bulk_update(room_objs, ['occupied'], batch_size=batch_size)
+        counts['students'] = len(student_objs)
+
+        bookings = []
+        for student in student_objs:
+            # closed stays, oldest first, one per past semester
+            start = today - datetime.timedelta(days=182 * (bookings_per_student + 1))
+            past = bookings_per_student - (1 if student.room_id else 0) if room_objs else 0
+            for _ in range(past):
+                length = rng.randint(90, 170)
+                bookings.append(Booking(student=student, room=rng.choice(room_objs),
+                                        start_date=start, end_date=start + datetime.timedelta(days=length)))
+                start += datetime.timedelta(days=182)
+            if student.room_id:
+                bookings.append(Booking(student=student, room_id=student.room_id,
+                                        start_date=today - datetime.timedelta(days=rng.randint(0, 150))))
+        counts['bookings'] = len(Booking.objects.bulk_create(bookings, batch_size=batch_size))
+        # bulk_create sends no signals
+        transaction.on_commit(lambda: bump_table_version(Room, Student, Booking))
+
+    return counts
@@ -0,0 +1,23 @@
+# malnad_app/sessions.py
+"""
+Session engine for hostel_pro: cached_db that skips no-op writes.
+
+Reads come from the "sessions" cache (SESSION_CACHE_ALIAS) and only fall
+back to the django_session table on a cache miss, so student_required costs
+no query per page. Assigning a value a key already holds (e.g. signing in
+again as the same student) no longer marks the session modified, so
+SessionMiddleware doesn't rewrite the row; pop() of an absent key already
+behaves that way in Django.
+
+    SESSION_ENGINE = 'malnad_app.sessions'
+"""
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+_MISSING = object()
+
+
+class SessionStore(CachedDBStore):
+    def __setitem__(self, key, value):
+        if self._session.get(key, _MISSING) == value:
+            return
+        super().__setitem__(key, value)
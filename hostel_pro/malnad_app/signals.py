@@ -0,0 +1,40 @@
+# malnad_app/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import student_auth
+from .conditional import bump_table_version
+from .models import ArchivedBooking, Booking, Room, Student
+
+
+# --- Table versions (page ETags) ---
+@receiver([post_save, post_delete], sender=Room)
+@receiver([post_save, post_delete], sender=Student)
+@receiver([post_save, post_delete], sender=Booking)
+@receiver([post_save, post_delete], sender=ArchivedBooking)  # e.g. deleted along with their student
+def table_changed(sender, **kwargs):
+    bump_table_version(sender)
+
+
+# --- Occupancy counters ---
+# Saves that change Student.room outside allocation.py (admin edits, shell,
+# deletes) recount the affected rooms from the Student table.
+@receiver(post_save, sender=Student)
+def student_room_saved(sender, instance, created, **kwargs):
+    old_room_id = getattr(instance, '_loaded_room_id', None)
+    if old_room_id != instance.room_id:
+        if Room.objects.recount(old_room_id, instance.room_id):
+            bump_table_version(Room)
+    instance._loaded_room_id = instance.room_id
+
+
+@receiver(post_delete, sender=Student)
+def student_deleted(sender, instance, **kwargs):
+    if instance.room_id and Room.objects.recount(instance.room_id):
+        bump_table_version(Room)
+
+
+# --- Sign-in identity cache ---
+@receiver([post_save, post_delete], sender=Student)
+def student_identity_changed(sender, instance, **kwargs):
+    student_auth.forget_identity(instance.roll_no)
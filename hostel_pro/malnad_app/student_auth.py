@@ -0,0 +1,76 @@
+# malnad_app/student_auth.py
+"""
+Student sign-in by USN and name.
+
+verify_student() matches the USN and the normalised name (Student.name_key)
+in one query on the unique roll_no index. Verified identities are kept in
+the default cache for IDENTITY_TTL seconds, so a student refreshing the sign-in
+page during a fee-deadline rush doesn't reach the database; Student writes
+drop the entry (signals.py).
+
+allow_attempt() applies per-IP and per-USN token buckets before any of
+that; the USN is only charged once the IP has passed, so a flood from one
+address can't lock a student out without its attempts being checked.
+signed_in() gives the IP its token back, so many students behind one NAT
+are only limited by their failed attempts. Limits come from
+settings.STUDENT_LOGIN_RATE_LIMITS, as {'ip': (tokens per second, burst),
+'usn': (...)}, read on every attempt.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Student, normalize_name
+from .ratelimit import TokenBucket
+
+IDENTITY_TTL = 60  # seconds
+
+DEFAULT_RATE_LIMITS = {
+    'ip': (0.5, 20),      # a hostel NAT can carry many students
+    'usn': (1 / 30, 5),   # five quick tries, then one every 30s
+}
+
+ip_bucket = TokenBucket(*DEFAULT_RATE_LIMITS['ip'])
+usn_bucket = TokenBucket(*DEFAULT_RATE_LIMITS['usn'])
+
+
+def rate_limits():
+    return {**DEFAULT_RATE_LIMITS, **getattr(settings, 'STUDENT_LOGIN_RATE_LIMITS', {})}
+
+
+def allow_attempt(ip, usn):
+    limits = rate_limits()
+    ip_bucket.configure(*limits['ip'])
+    usn_bucket.configure(*limits['usn'])
+    if not ip_bucket.allow(ip):
+        return False
+    # charged only now; a refused USN still costs the IP its token, so
+    # hammering one USN also drains the address
+    return usn_bucket.allow(usn.casefold())
+
+
+def signed_in(ip):
+    """A verified sign-in doesn't count against its IP."""
+    ip_bucket.refund(ip)
+
+
+def _identity_key(usn):
+    return 'malnad_app:identity:' + hashlib.sha1(usn.encode()).hexdigest()
+
+
+def verify_student(usn, name):
+    """Return (student_id, student_name) if USN and name match, else None."""
+    name_key = normalize_name(name)
+    cached = cache.get(_identity_key(usn))
+    if cached is not None and cached[0] == name_key:
+        return cached[1:]
+    row = Student.objects.filter(roll_no=usn, name_key=name_key).values_list('pk', 'name').first()
+    if row is None:
+        return None
+    cache.set(_identity_key(usn), (name_key, *row), IDENTITY_TTL)
+    return row
+
+
+def forget_identity(usn):
+    cache.delete(_identity_key(usn))
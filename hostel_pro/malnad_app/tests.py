@@ -1,3 +1,525 @@
-from django.test import TestCase
+import datetime
+import io
+import os
+import random
+import tempfile
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import allocation, archive, availability, cache_config, dashboard, importer, ratelimit, seeding, student_auth, views
+from .models import ArchivedBooking, Booking, Room, Student
+from .pagination import encode_cursor
+
+
+class AllocationTests(TestCase):
+    def setUp(self):
+        self.room = Room.objects.create(number='A1', capacity=1)
+        self.other = Room.objects.create(number='A2', capacity=2)
+
+    def test_create_student_takes_bed(self):
+        allocation.create_student(roll_no='USN1', name='Asha', room=self.room)
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.occupied, 1)
+        with self.assertRaises(allocation.RoomFull):
+            allocation.create_student(roll_no='USN2', name='Bala', room=self.room)
+        self.assertFalse(Student.objects.filter(roll_no='USN2').exists())
+
+    def test_booking_moves_student(self):
+        student = allocation.create_student(roll_no='USN3', name='Chitra', room=self.room)
+        allocation.create_booking(student, self.other, '2025-01-01')
+        self.room.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.room.occupied, self.other.occupied), (0, 1))
+        self.assertEqual(Booking.objects.filter(student=student).count(), 1)
+
+    def test_booking_full_room_creates_nothing(self):
+        allocation.create_student(roll_no='USN4', name='Deepa', room=self.room)
+        student = allocation.create_student(roll_no='USN5', name='Esha')
+        with self.assertRaises(allocation.RoomFull):
+            allocation.create_booking(student, self.room, '2025-01-01')
+        self.assertFalse(Booking.objects.exists())
+
+
+class OccupancyCounterTests(TestCase):
+    def test_direct_edits_recount_and_reconcile_fixes_drift(self):
+        room = Room.objects.create(number='B1', capacity=2)
+        student = Student.objects.create(roll_no='USN9', name='Gauri', room=room)
+        room.refresh_from_db()
+        self.assertEqual(room.occupied, 1)
+
+        Room.objects.filter(pk=room.pk).update(occupied=2)
+        self.assertEqual(Room.objects.reconcile(), [(room, 2, 1)])
+        room.refresh_from_db()
+        self.assertEqual(room.occupied, 1)
+
+        student.delete()
+        room.refresh_from_db()
+        self.assertEqual(room.occupied, 0)
+
+
+class AdminQueryCountTests(TestCase):
+    def setUp(self):
+        User.objects.create_superuser(username='admin', password='pass12345')
+        self.client.login(username='admin', password='pass12345')
+
+    def add_rows(self, n, offset):
+        for i in range(offset, offset + n):
+            room = Room.objects.create(number=f"R{i}", capacity=2)
+            student = Student.objects.create(roll_no=f"USN{i}", name=f"S{i}", room=room)
+            Booking.objects.create(student=student, room=room)
+
+    def changelist_queries(self, model):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse(f'admin:malnad_app_{model}_changelist'))
+        return len(ctx.captured_queries)
+
+    def test_changelists_do_not_grow_with_rows(self):
+        self.add_rows(2, 0)
+        small = [self.changelist_queries(m) for m in ('student', 'booking')]
+        self.add_rows(20, 2)
+        large = [self.changelist_queries(m) for m in ('student', 'booking')]
+        self.assertEqual(small, large)
+
+
+# one process, so locmem is shared enough
+@override_settings(SESSION_ENGINE=cache_config.CACHED_SESSION_ENGINE, SHARED_CACHE=True)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.client.login(username='staff', password='pass12345')
+        self.room = Room.objects.create(number='A1', capacity=2)
+        self.student = allocation.create_student(roll_no='USN1', name='Asha')
+
+    def test_room_list_304_until_changed(self):
+        url = reverse('malnad_app:room_list')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(2):  # user, aggregate (session comes from the cache)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            allocation.assign_room(self.student, self.room)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_booking_list_etag_follows_bookings(self):
+        url = reverse('malnad_app:booking_list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        booking = Booking.objects.create(student=self.student, room=self.room)
+        etag = self.client.get(url, HTTP_IF_NONE_MATCH=etag)['ETag']
+        booking.end_date = booking.start_date
+        booking.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_no_etag_without_shared_cache(self):
+        url = reverse('malnad_app:room_list')
+        etag = self.client.get(url)['ETag']
+        with override_settings(SHARED_CACHE=False):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class StaffDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Room.objects.create(number='A1', capacity=2)
+        Room.objects.create(number='A2', capacity=1, occupied=1)
+        Student.objects.create(roll_no='USN1', name='Asha')
+
+    def test_metrics_are_one_statement(self):
+        with self.assertNumQueries(1):
+            metrics = dashboard.get_metrics()
+        self.assertEqual(metrics, {'total_rooms': 2, 'available_rooms': 1, 'total_students': 1, 'total_bookings': 0})
+        with self.assertNumQueries(0):
+            dashboard.get_metrics()
+
+    @override_settings(DASHBOARD_METRICS_TTL=0)
+    def test_stale_numbers_served_while_refreshing(self):
+        dashboard.get_metrics()
+        Student.objects.create(roll_no='USN2', name='Bala')
+        cache.add(dashboard.REFRESH_LOCK_KEY, 1)  # another request is recomputing
+        with self.assertNumQueries(0):
+            self.assertEqual(dashboard.get_metrics()['total_students'], 1)
+        cache.delete(dashboard.REFRESH_LOCK_KEY)
+        self.assertEqual(dashboard.get_metrics()['total_students'], 2)
+
+    async def test_async_view(self):
+        staff = await User.objects.acreate(username='staff', is_staff=True)
+        await self.async_client.aforce_login(staff)
+        response = await self.async_client.get(reverse('malnad_app:staff_dashboard'))
+        self.assertContains(response, 'Total Rooms: 2')
+        self.assertContains(response, 'Available Rooms: 1')
+        self.assertContains(response, 'Total Students: 1')
+
+
+class ListViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seeding.seed(rooms=5, students=45, bookings_per_student=2, prefix='L')
+        User.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.client.login(username='staff', password='pass12345')
+
+    def walk(self, url):
+        rows, next_url = [], url
+        while next_url:
+            response = self.client.get(next_url)
+            rows += list(response.context['page'])
+            next_url = response.context['next_url'] and url + response.context['next_url']
+        return rows
+
+    def test_pages_cover_every_row_once(self):
+        url = reverse('malnad_app:student_list')
+        self.assertEqual([s.roll_no for s in self.walk(url)],
+                         list(Student.objects.order_by('roll_no').values_list('roll_no', flat=True)))
+        bookings = self.walk(reverse('malnad_app:booking_list'))
+        self.assertEqual(len(bookings), Booking.objects.count())
+        self.assertEqual([b.start_date for b in bookings], sorted((b.start_date for b in bookings), reverse=True))
+
+    def test_deep_page_costs_the_same(self):
+        url = reverse('malnad_app:booking_list')
+        first = self.client.get(url)
+        with CaptureQueriesContext(connection) as page1:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as page2:
+            self.client.get(url + first.context['next_url'])
+        self.assertLessEqual(len(page2), len(page1) + 1)  # + the rest of a tie group on some backends
+        self.assertIn('email', first.context['page'].items[0].student.get_deferred_fields())
+
+    def test_tampered_cursor_shows_first_page(self):
+        url = reverse('malnad_app:booking_list')
+        first = self.client.get(url).context['page']
+        response = self.client.get(url, {'after': encode_cursor('garbage', 1)})  # well-formed, not a date
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['page']), list(first))
+
+    def test_filters_and_search(self):
+        student = Student.objects.order_by('pk').last()
+        response = self.client.get(reverse('malnad_app:student_list'), {'q': student.name.upper()})
+        self.assertIn(student, list(response.context['page']))
+        self.assertTrue(all(s.name == student.name for s in response.context['page']))
+        response = self.client.get(reverse('malnad_app:booking_list'), {'student': student.pk, 'from': '2024-02-30'})
+        self.assertEqual(len(response.context['page']), Booking.objects.filter(student=student).count())
+        response = self.client.get(reverse('malnad_app:room_list'), {'available': '1'})
+        self.assertTrue(all(r.capacity > r.occupied for r in response.context['page']))
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.client.login(username='staff', password='pass12345')
+        self.free = Room.objects.create(number='A1', capacity=2)
+        Room.objects.create(number='A2', capacity=1, occupied=1)
+        self.student = Student.objects.create(roll_no='4MC21CS001', name='Asha Rao')
+
+    def results(self, name, q):
+        return self.client.get(reverse(f'malnad_app:{name}_autocomplete'), {'q': q}).json()['results']
+
+    def test_prefix_search(self):
+        self.assertEqual([r['value'] for r in self.results('student', '4mc21')], ['4MC21CS001'])
+        self.assertEqual([r['value'] for r in self.results('student', 'asha')], ['4MC21CS001'])
+        self.assertEqual(self.results('student', 'rao'), [])
+        self.assertEqual([r['value'] for r in self.results('room', 'a')], ['A1'])  # A2 is full
+
+    def test_codes_stored_in_lower_case_are_found(self):
+        room = Room.objects.create(number='b12', capacity=2)
+        student = Student.objects.create(roll_no='mc23is060', name='Kiran', room=room)
+        Booking.objects.create(student=student, room=room)
+        importer.import_rows('students', io.StringIO("roll_no,name\nmc23is061,Latha\n"))
+        self.assertEqual([r['value'] for r in self.results('student', 'MC23is')], ['mc23is060', 'mc23is061'])
+        self.assertEqual([r['value'] for r in self.results('room', 'B1')], ['b12'])
+        response = self.client.get(reverse('malnad_app:student_list'), {'q': 'mc23is06'})
+        self.assertEqual(len(response.context['page']), 2)
+        response = self.client.get(reverse('malnad_app:booking_list'), {'q': 'MC23'})
+        self.assertEqual([b.student.roll_no for b in response.context['page']], ['mc23is060'])
+
+    @skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite specific")
+    def test_prefix_search_seeks_the_index(self):
+        for qs in (Student.objects.filter(views.student_search('4mc')),
+                   Room.objects.filter(views.room_search('a')),
+                   views.BOOKING_LISTING.filtered({'q': '4mc'})):
+            plan = qs.explain()
+            self.assertRegex(plan, r'SEARCH \w+ USING (COVERING )?INDEX', plan)
+            self.assertNotRegex(plan, r'SCAN malnad_app_(student|room)\b', plan)
+
+    def test_forms_render_without_loading_rows(self):
+        for name in ('booking_create', 'student_create'):
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(reverse(f'malnad_app:{name}'))
+            self.assertFalse([q for q in ctx.captured_queries if 'malnad_app_' in q['sql']], name)
+
+    def test_booking_by_usn_and_room_number(self):
+        data = {'student': '4MC21CS001', 'room': 'A1', 'start_date': '2025-06-01'}
+        response = self.client.post(reverse('malnad_app:booking_create'), data)
+        self.assertRedirects(response, reverse('malnad_app:booking_list'))
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.room, self.free)
+        response = self.client.post(reverse('malnad_app:booking_create'), {**data, 'room': 'Z9'})
+        self.assertContains(response, 'value="4MC21CS001"')  # what was typed is kept
+
+
+class ImportTests(TestCase):
+    def setUp(self):
+        Room.objects.create(number='A1', capacity=2)
+        Student.objects.create(roll_no='4MC21CS001', name='Asha Rao')
+
+    def test_students_tsv_with_bad_rows(self):
+        data = ("roll_no\tname\temail\troom\n"
+                "4MC21CS002\t  Bharath  K \t\tA1\n"
+                "4MC21CS001\tAsha Rao\t\t\n"          # already in the database
+                "4MC21CS003\tChitra\tnot-an-email\t\n"
+                "4MC21CS004\tDeepa\t\tA1\n"
+                "4MC21CS005\tEshwar\t\tA1\n"          # A1 now full
+                "\n"
+                "4MC21CS004\tDeepa again\t\t\n"       # duplicate within the file
+                "4MC21CS006\t\t\t\n")
+        with CaptureQueriesContext(connection) as ctx:
+            report = importer.import_rows('students', io.StringIO(data), chunk_size=2)
+        self.assertEqual((report.rows, report.created), (7, 2))
+        self.assertEqual([(line, key) for line, key, _ in report.errors],
+                         [(3, '4MC21CS001'), (4, '4MC21CS003'), (6, '4MC21CS005'), (8, '4MC21CS004'), (9, '4MC21CS006')])
+        # two preloads, lookup + insert + lookup per chunk with rows to insert, one recount; nothing per row
+        self.assertLessEqual(len([q for q in ctx.captured_queries if 'malnad_app_' in q['sql']]), 9)
+        self.assertEqual(Room.objects.get(number='A1').occupied, 2)
+        self.assertEqual(Student.objects.get(roll_no='4MC21CS002').name_key, 'bharath k')
+
+    def test_row_inserted_meanwhile_is_reported_not_counted(self):
+        insert = importer._insert
+
+        def racing_insert(checker, pending, report):
+            Student.objects.create(roll_no='4MC21CS002', name='Someone else')  # lands after the preload
+            return insert(checker, pending, report)
+
+        data = "roll_no,name\n4MC21CS002,Bharath\n4MC21CS003,Chitra\n"
+        with mock.patch.object(importer, '_insert', racing_insert):
+            report = importer.import_rows('students', io.StringIO(data))
+        self.assertEqual(report.created, 1)
+        self.assertEqual([(line, key) for line, key, _ in report.errors], [(2, '4MC21CS002')])
+        self.assertEqual(Student.objects.get(roll_no='4MC21CS002').name, 'Someone else')
+
+    def test_view_and_command(self):
+        User.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.client.login(username='staff', password='pass12345')
+        upload = SimpleUploadedFile('rooms.csv', b'\xef\xbb\xbfnumber,capacity\nB1,3\nA1,2\nB2,x\n')
+        response = self.client.post(reverse('malnad_app:room_import'), {'file': upload})
+        self.assertContains(response, 'capacity &#x27;x&#x27; is not a number')
+        self.assertTrue(Room.objects.filter(number='B1', capacity=3).exists())
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path, errors = os.path.join(tmp, 'intake.csv'), os.path.join(tmp, 'errors.csv')
+            with open(path, 'w') as fh:
+                fh.write('roll_no,name,room\n4MC21CS010,Farah,B1\n4MC21CS011,Ganesh,Z9\n')
+            call_command('import_csv', 'students', path, errors=errors, stdout=io.StringIO())
+            with open(errors) as fh:
+                self.assertEqual(fh.read().splitlines(), ['line,key,error', '3,4MC21CS011,no room numbered Z9'])
+        self.assertEqual(Room.objects.get(number='B1').occupied, 1)
+
+
+def _day(n):
+    return datetime.date(2030, 6, 1) + datetime.timedelta(days=n)
+
+
+class AvailabilityTests(TestCase):
+    def setUp(self):
+        self.a1 = Room.objects.create(number='A1', capacity=2)
+        self.a2 = Room.objects.create(number='A2', capacity=1)
+        student = Student.objects.create(roll_no='4MC21CS001', name='Asha Rao')
+        for room, start, end in [(self.a1, 0, 9), (self.a1, 4, None), (self.a1, 10, 19), (self.a2, 30, 30)]:
+            Booking.objects.create(student=student, room=room, start_date=_day(start),
+                                   end_date=None if end is None else _day(end))
+
+    def free(self, start, end):
+        return {r.number: r.free for r in availability.available_rooms(_day(start), _day(end))}
+
+    def test_peak_over_window(self):
+        self.assertEqual(self.free(0, 3), {'A1': 1, 'A2': 1})
+        self.assertEqual(self.free(0, 4), {'A2': 1})      # both A1 beds taken on day 4
+        self.assertEqual(self.free(9, 10), {'A2': 1})     # day 9 ends one stay, day 10 starts the next
+        self.assertEqual(self.free(20, 29), {'A1': 1, 'A2': 1})
+        self.assertEqual(self.free(25, 40), {'A1': 1})
+
+    def test_sweep_matches_day_by_day_count(self):
+        rng = random.Random(1)
+        student = Student.objects.get()
+        Booking.objects.bulk_create([
+            Booking(student=student, room=rng.choice((self.a1, self.a2)), start_date=_day(s),
+                    end_date=rng.choice((None, _day(s + rng.randint(0, 20)))))
+            for s in (rng.randint(-30, 60) for _ in range(200))
+        ])
+        stays = list(Booking.objects.values_list('room_id', 'start_date', 'end_date'))
+        start, end = _day(5), _day(25)
+        with self.assertNumQueries(1):
+            peaks = availability.peak_occupancy(start, end)
+        for room in (self.a1, self.a2):
+            expected = max(sum(1 for r, s, e in stays if r == room.pk and s <= day and (e is None or e >= day))
+                           for day in (start + datetime.timedelta(days=n) for n in range(21)))
+            self.assertEqual(peaks.get(room.pk, 0), expected)
+
+    def test_api_and_view(self):
+        User.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.client.login(username='staff', password='pass12345')
+        url = reverse('malnad_app:availability_api')
+        data = self.client.get(url, {'start': '2030-06-01', 'end': '2030-06-04', 'q': 'a1'}).json()
+        self.assertEqual(data['results'], [{'room': 'A1', 'capacity': 2, 'peak': 1, 'free': 1}])
+        self.assertEqual(self.client.get(url, {'start': '2030-06-05', 'end': '2030-06-01'}).status_code, 400)
+        response = self.client.get(reverse('malnad_app:room_availability'), {'start': '2030-06-05', 'beds': '2'})
+        self.assertContains(response, '0 rooms free')
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        room = Room.objects.create(number='A1', capacity=2)
+        self.student = Student.objects.create(roll_no='4MC21CS001', name='Asha Rao', room=room)
+        today = datetime.date.today()
+        for start, end in [(900, 800), (700, 600), (300, 200), (100, None)]:
+            Booking.objects.create(student=self.student, room=room, start_date=today - datetime.timedelta(days=start),
+                                   end_date=None if end is None else today - datetime.timedelta(days=end))
+
+    @override_settings(BOOKING_RETENTION_DAYS=365)
+    def test_old_stays_move_and_stay_readable(self):
+        self.assertEqual(archive.archive_bookings(dry_run=True), 2)
+        call_command('archive_bookings', batch_size=1, stdout=io.StringIO())
+        self.assertEqual(Booking.objects.count(), 2)
+        self.assertEqual(ArchivedBooking.objects.count(), 2)
+        self.assertEqual(archive.archive_bookings(), 0)
+
+        hot = list(archive.booking_rows(student=self.student))
+        every = list(archive.booking_rows(include_archive=True, student=self.student))
+        self.assertEqual([r['archived'] for r in hot], [False, False])
+        self.assertEqual([r['archived'] for r in every], [False, False, True, True])
+        self.assertEqual(every[-1]['room_number'], 'A1')
+        self.assertEqual(len({r['id'] for r in every}), 4)  # ids kept
+
+    @override_settings(BOOKING_RETENTION_DAYS=365)
+    def test_pages_read_archive_only_when_asked(self):
+        archive.archive_bookings()
+        session = self.client.session
+        session['student_id'] = self.student.pk
+        session.save()
+        url = reverse('malnad_app:student_dashboard')
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertContains(self.client.get(url), 'Room A1', count=2)
+        self.assertFalse([q for q in ctx.captured_queries if 'archivedbooking' in q['sql']])
+        self.assertContains(self.client.get(url, {'history': '1'}), 'Room A1', count=4)
+
+        User.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.client.login(username='staff', password='pass12345')
+        response = self.client.get(reverse('malnad_app:booking_list'), {'archived': '1'})
+        self.assertEqual(len(response.context['page']), 2)
+
+    @override_settings(BOOKING_RETENTION_DAYS=365, SHARED_CACHE=True)
+    def test_archive_changes_refresh_booking_list_etag(self):
+        archive.archive_bookings()
+        User.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.client.login(username='staff', password='pass12345')
+        url = reverse('malnad_app:booking_list')
+        etag = self.client.get(url, {'archived': '1'})['ETag']
+        ArchivedBooking.objects.order_by('pk').first().delete()
+        response = self.client.get(url, {'archived': '1'}, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page']), 1)
+
+
+@override_settings(SESSION_ENGINE=cache_config.CACHED_SESSION_ENGINE)  # one process, so locmem is fine
+class SessionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        student_auth.ip_bucket.reset()
+        student_auth.usn_bucket.reset()
+        self.student = Student.objects.create(roll_no='USN1', name='Asha')
+        self.login = {'student_login': '1', 'usn': 'USN1', 'name': 'asha'}
+        self.client.post(reverse('landing'), self.login)
+
+    def session_queries(self, call):
+        with CaptureQueriesContext(connection) as ctx:
+            call()
+        return [q['sql'] for q in ctx.captured_queries if 'django_session' in q['sql']]
+
+    def test_student_pages_read_session_from_cache(self):
+        url = reverse('malnad_app:student_dashboard')
+        self.assertEqual(self.session_queries(lambda: self.client.get(url)), [])
+
+    def test_same_login_again_skips_save(self):
+        self.assertEqual(self.session_queries(lambda: self.client.post(reverse('landing'), self.login)), [])
+
+    def test_logout_still_clears_student(self):
+        self.client.get(reverse('malnad_app:student_logout'))
+        self.assertNotIn('student_id', self.client.session)
+
+    def test_cached_engine_only_with_shared_cache(self):
+        engine = cache_config.session_engine_from_env
+        self.assertEqual(engine({}), cache_config.DB_SESSION_ENGINE)
+        self.assertEqual(engine({'HOSTEL_CACHE_BACKEND': 'locmem'}), cache_config.DB_SESSION_ENGINE)
+        self.assertEqual(engine({'HOSTEL_CACHE_BACKEND': 'redis'}), cache_config.CACHED_SESSION_ENGINE)
+        self.assertEqual(engine({'HOSTEL_SESSION_ENGINE': 'x.y'}), 'x.y')
+
+
+class StudentLoginTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        student_auth.ip_bucket.reset()
+        student_auth.usn_bucket.reset()
+        self.student = Student.objects.create(roll_no='USN7', name='Kavya  Rao')
+
+    def test_match_is_one_query_then_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(student_auth.verify_student('USN7', ' kavya rao '), (self.student.pk, 'Kavya  Rao'))
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(student_auth.verify_student('USN7', 'KAVYA RAO'))
+        self.assertIsNone(student_auth.verify_student('USN7', 'Someone Else'))
+
+    def test_rename_drops_cached_identity(self):
+        student_auth.verify_student('USN7', 'Kavya Rao')
+        self.student.name = 'Kavya Shetty'
+        self.student.save(update_fields=['name'])
+        self.assertIsNone(student_auth.verify_student('USN7', 'Kavya Rao'))
+        self.assertIsNotNone(student_auth.verify_student('USN7', 'kavya shetty'))
+
+    def test_usn_bucket_sheds_before_db(self):
+        login = {'student_login': '1', 'usn': 'USN7', 'name': 'wrong'}
+        burst = student_auth.usn_bucket.burst
+        for _ in range(burst):
+            self.assertEqual(self.client.post(reverse('landing'), login).status_code, 302)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse('landing'), login)
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse([q for q in ctx.captured_queries if 'malnad_app_student' in q['sql']])
+
+    @override_settings(STUDENT_LOGIN_RATE_LIMITS={'ip': (0.001, 3)})
+    def test_ip_bucket_only_counts_failures(self):
+        for i in range(6):
+            Student.objects.create(roll_no=f'NAT{i}', name='Same Name')
+            response = self.client.post(reverse('landing'), {'student_login': '1', 'usn': f'NAT{i}', 'name': 'same name'})
+            self.assertRedirects(response, reverse('malnad_app:student_dashboard'), fetch_redirect_response=False)
+        wrong = {'student_login': '1', 'usn': 'NAT0', 'name': 'wrong'}
+        self.assertEqual([self.client.post(reverse('landing'), wrong).status_code for _ in range(4)], [302, 302, 302, 429])
+
+    @override_settings(STUDENT_LOGIN_RATE_LIMITS={'ip': (0.001, 1)})
+    def test_refused_ip_does_not_lock_out_the_usn(self):
+        wrong = {'student_login': '1', 'usn': 'USN7', 'name': 'wrong'}
+        for _ in range(student_auth.usn_bucket.burst * 2):
+            self.client.post(reverse('landing'), wrong, REMOTE_ADDR='10.0.0.1')
+        response = self.client.post(reverse('landing'), {**wrong, 'name': 'Kavya Rao'}, REMOTE_ADDR='10.0.0.2')
+        self.assertRedirects(response, reverse('malnad_app:student_dashboard'), fetch_redirect_response=False)
+
+    def test_token_bucket_refills(self):
+        bucket = ratelimit.TokenBucket(rate=1, burst=2)
+        self.assertEqual([bucket.allow('k', now=0) for _ in range(3)], [True, True, False])
+        self.assertTrue(bucket.allow('k', now=1.0))
+
+
+class SeedingTests(TestCase):
+    def test_seed_is_consistent(self):
+        counts = seeding.seed(rooms=4, students=15, bookings_per_student=3, prefix='T')
+        self.assertEqual(counts['students'], 15)
+        self.assertEqual(Booking.objects.count(), counts['bookings'])
+        self.assertEqual(Room.objects.reconcile(dry_run=True), [])
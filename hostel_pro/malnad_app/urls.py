@@ -16,11 +16,21 @@ urlpatterns = [
     # CRUD (staff)
     path('students/', views.student_list, name='student_list'),
     path('students/add/', views.student_create, name='student_create'),
+    path('students/import/', views.import_data, {'kind': 'students'}, name='student_import'),
     path('rooms/', views.room_list, name='room_list'),
     path('rooms/add/', views.room_create, name='room_create'),
+    path('rooms/import/', views.import_data, {'kind': 'rooms'}, name='room_import'),
+    path('rooms/available/', views.room_availability, name='room_availability'),
     path('bookings/', views.booking_list, name='booking_list'),
     path('bookings/add/', views.booking_create, name='booking_create'),
 
+    # Autocomplete for the create forms (JSON)
+    path('autocomplete/students/', views.student_autocomplete, name='student_autocomplete'),
+    path('autocomplete/rooms/', views.room_autocomplete, name='room_autocomplete'),
+
+    # Free beds over a date range (JSON)
+    path('api/availability/', views.availability_api, name='availability_api'),
+
     # optional direct logout for staff
     path('logout/', views.logout_view, name='logout_view'),
 ]
@@ -1,14 +1,21 @@
 # hoste_pro/malnad_app/views.py
 # malnad_app/views.py
+import io
+
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import authenticate, login as auth_login, logout as auth_logout
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth import logout
-from .models import Student, Room, Booking
+from .models import ArchivedBooking, Student, Room, Booking, normalize_code, normalize_name
+from . import allocation, archive, availability, dashboard, importer, student_auth
+from .conditional import conditional_page, table_version
+from .listing import Listing, as_date, as_flag, as_int, filter_on, starts_with
 from functools import wraps
-from django.db import models
+from django.db.models import F, Max, Q
+from django.utils import timezone
 
 # --- helper decorator for student session auth ---
 def student_required(view_func):
@@ -34,18 +41,21 @@ def landing(request):
             if not usn or not name:
                 messages.error(request, "Please enter both USN and name.")
                 return redirect('landing')
-            try:
-                student = Student.objects.get(roll_no=usn)
-                if student.name.strip().lower() != name.lower():
-                    messages.error(request, "USN and name do not match.")
-                    return redirect('landing')
-                request.session['student_id'] = student.id
-                request.session['student_name'] = student.name
-                messages.success(request, f"Welcome, {student.name}!")
-                return redirect('malnad_app:student_dashboard')
-            except Student.DoesNotExist:
-                messages.error(request, "Student not found. Please check USN.")
+            ip = request.META.get('REMOTE_ADDR', '')
+            if not student_auth.allow_attempt(ip, usn):
+                messages.error(request, "Too many sign-in attempts. Please wait a minute and try again.")
+                return render(request, 'landing.html', {"staff_form": AuthenticationForm()}, status=429)
+            identity = student_auth.verify_student(usn, name)
+            if identity is None:
+                # one message for both cases, so USNs can't be probed
+                messages.error(request, "USN and name do not match any student.")
                 return redirect('landing')
+            student_auth.signed_in(ip)
+            student_id, student_name = identity
+            request.session['student_id'] = student_id
+            request.session['student_name'] = student_name
+            messages.success(request, f"Welcome, {student_name}!")
+            return redirect('malnad_app:student_dashboard')
 
         # Staff login
         if request.POST.get("staff_login") is not None:
@@ -83,9 +93,11 @@ def logout_view(request):
 @student_required
 def student_dashboard(request):
     student_id = request.session.get('student_id')
-    student = get_object_or_404(Student, id=student_id)
-    bookings = Booking.objects.filter(student=student)
-    return render(request, 'student_dashboard.html', {'student': student, 'bookings': bookings})
+    student = get_object_or_404(Student.objects.select_related('room'), id=student_id)
+    # current and recent stays; ?history=1 adds the archived ones (archive.py)
+    history = bool(as_flag(request.GET.get('history', '')))
+    bookings = archive.booking_rows(include_archive=history, student=student)
+    return render(request, 'student_dashboard.html', {'student': student, 'bookings': bookings, 'history': history})
 
 def student_logout(request):
     request.session.pop('student_id', None)
@@ -95,25 +107,38 @@ def student_logout(request):
 
 # --- Staff dashboard (Django auth required) ---
 @login_required
-def staff_dashboard(request):
-    # Staff-only stats
-    total_students = Student.objects.count()
-    total_rooms = Room.objects.count()
-    total_bookings = Booking.objects.count()
-    available_rooms = Room.objects.filter(capacity__gt=models.F('occupied')).count()
-    stats = {
-        "total_students": total_students,
-        "total_rooms": total_rooms,
-        "total_bookings": total_bookings,
-        "available_rooms": available_rooms,
-    }
+async def staff_dashboard(request):
+    # Staff-only stats: one statement, cached for a few seconds (see dashboard.py)
+    request.user = await request.auser()  # base.html reads it; no sync lookup in async views
+    stats = await dashboard.aget_metrics()
     return render(request, 'staff_dashboard.html', {"stats": stats})
 
 # --- Students CRUD (staff) ---
+# Prefix searches shared by the list pages and the autocomplete endpoints;
+# each side of the OR is an index range scan over a key column stored in
+# normalised form (see models), so the term is normalised the same way.
+def student_search(term):
+    return starts_with('roll_key', normalize_code(term)) | starts_with('name_key', normalize_name(term))
+
+def room_search(term):
+    return starts_with('number_key', normalize_code(term))
+
+def booking_search(term):
+    return starts_with('student__roll_key', normalize_code(term))
+
+STUDENT_LISTING = Listing(
+    Student.objects.select_related('room'), 'roll_no',
+    only=('roll_no', 'name', 'phone', 'room__number'),
+    filters={
+        'room': filter_on('room_id', as_int),
+        'unassigned': filter_on('room__isnull', as_flag),
+    },
+    search=student_search,
+)
+
 @login_required
 def student_list(request):
-    students = Student.objects.select_related('room').all().order_by('roll_no')
-    return render(request, 'students/list.html', {"students": students})
+    return render(request, 'students/list.html', STUDENT_LISTING.context(request))
 
 @login_required
 def student_create(request):
@@ -122,28 +147,44 @@ def student_create(request):
         name = request.POST.get('name').strip()
         phone = request.POST.get('phone').strip()
         email = request.POST.get('email').strip()
-        room_id = request.POST.get('room') or None
-        room = Room.objects.filter(id=room_id).first() if room_id else None
+        room_number = request.POST.get('room', '').strip()
+        room = Room.objects.filter(number=room_number).first() if room_number else None
+        if room_number and room is None:
+            messages.error(request, f"No room numbered {room_number}.")
+            return render(request, 'students/create.html', {"values": request.POST})
 
         if Student.objects.filter(roll_no=roll_no).exists():
             messages.error(request, "Student with this USN already exists.")
             return redirect('malnad_app:student_list')
 
-        student = Student.objects.create(roll_no=roll_no, name=name, phone=phone, email=email, room=room)
-        if room:
-            room.occupied += 1
-            room.save(update_fields=['occupied'])
+        try:
+            student = allocation.create_student(roll_no=roll_no, name=name, phone=phone, email=email, room=room)
+        except allocation.AllocationError as exc:
+            messages.error(request, str(exc))
+            return redirect('malnad_app:student_list')
         messages.success(request, f"Student {student.name} added.")
         return redirect('malnad_app:student_list')
 
-    rooms = Room.objects.all()
-    return render(request, 'students/create.html', {"rooms": rooms})
+    # rooms are picked by number with the autocomplete endpoint, not a full <select>
+    return render(request, 'students/create.html')
 
 # --- Rooms CRUD (staff) ---
+# MAX(id) is one index lookup at any table size and catches bulk_create,
+# which sends no signals; every other write bumps the table versions.
+def _room_list_state(request):
+    return Room.objects.aggregate(last_id=Max('pk')), table_version(Room)
+
+ROOM_LISTING = Listing(
+    Room.objects.all(), 'number',
+    only=('number', 'capacity', 'occupied'),
+    filters={'available': lambda value: Q(capacity__gt=F('occupied')) if as_flag(value) else None},
+    search=room_search,
+)
+
 @login_required
+@conditional_page(_room_list_state)
 def room_list(request):
-    rooms = Room.objects.all().order_by('number')
-    return render(request, 'rooms/list.html', {"rooms": rooms})
+    return render(request, 'rooms/list.html', ROOM_LISTING.context(request))
 
 @login_required
 def room_create(request):
@@ -158,63 +199,185 @@ def room_create(request):
         return redirect('malnad_app:room_list')
     return render(request, 'rooms/create.html')
 
+# --- Availability over a date range (staff) ---
+def _availability_query(params):
+    """(start, end, beds) from GET, or raise ValueError with a message for the user."""
+    start = as_date(params.get('start', '').strip())
+    end = as_date(params.get('end', '').strip()) or start
+    beds = as_int(params.get('beds', '').strip() or '1')
+    if start is None:
+        raise ValueError("Give a start date (YYYY-MM-DD).")
+    if beds is None or beds < 1:
+        raise ValueError("Beds must be a whole number of at least 1.")
+    if end < start:
+        raise ValueError("The end date is before the start date.")
+    return start, end, beds
+
+def _availability(params):
+    start, end, beds = _availability_query(params)
+    term = params.get('q', '').strip()
+    rooms = Room.objects.filter(room_search(term)) if term else None
+    return start, end, availability.available_rooms(start, end, beds, rooms)
+
+@login_required
+def room_availability(request):
+    """Rooms with a free bed on every day of ?start=&end= (optional beds=, q= number prefix)."""
+    if not request.GET.get('start'):
+        return render(request, 'rooms/availability.html', {"filters": request.GET})
+    try:
+        start, end, rooms = _availability(request.GET)
+    except ValueError as exc:
+        messages.error(request, str(exc))
+        return render(request, 'rooms/availability.html', {"filters": request.GET})
+    return render(request, 'rooms/availability.html', {
+        "filters": request.GET, "start": start, "end": end, "rooms": rooms,
+    })
+
+@login_required
+def availability_api(request):
+    try:
+        start, end, rooms = _availability(request.GET)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return JsonResponse({
+        "start": start.isoformat(), "end": end.isoformat(),
+        "results": [r.as_dict() for r in rooms],
+    })
+
+# --- Bulk import (staff) ---
+IMPORT_ERRORS_SHOWN = 200
+
+@login_required
+def import_data(request, kind):
+    """Upload a CSV/TSV of rooms or students; see importer.py for the columns."""
+    context = {"kind": kind, "columns": importer.COLUMNS[kind]}
+    if request.method == "POST":
+        upload = request.FILES.get('file')
+        if upload is None:
+            messages.error(request, "Choose a file to import.")
+            return render(request, 'import.html', context)
+        # read straight off the upload in chunks, never the whole file into memory
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            report = importer.import_rows(kind, stream)
+        except (importer.ImportFileError, UnicodeDecodeError) as exc:
+            messages.error(request, f"Could not import {upload.name}: {exc}")
+            return render(request, 'import.html', context)
+        if request.POST.get('errors_csv') and report.errors:
+            response = HttpResponse(content_type='text/csv')
+            response['Content-Disposition'] = f'attachment; filename="{kind}-import-errors.csv"'
+            report.write_errors(response)
+            return response
+        messages.success(request, f"Imported {report.created} of {report.rows} {kind}.")
+        context.update({"report": report, "errors": report.errors[:IMPORT_ERRORS_SHOWN]})
+    return render(request, 'import.html', context)
+
 # --- Bookings (staff) ---
+def _booking_list_state(request):
+    return Booking.objects.aggregate(last_id=Max('pk')), table_version(Booking, ArchivedBooking, Student, Room)
+
+def _current_bookings(value):
+    if not as_flag(value):
+        return None
+    return Q(end_date__isnull=True) | Q(end_date__gte=timezone.localdate())
+
+def _booking_filters(**extra):
+    return {
+        'room': filter_on('room_id', as_int),
+        'student': filter_on('student_id', as_int),
+        'from': filter_on('start_date__gte', as_date),
+        'to': filter_on('start_date__lte', as_date),
+        'archived': lambda value: None,  # picks the listing in booking_list
+        **extra,
+    }
+
+_BOOKING_ONLY = ('start_date', 'end_date', 'student__roll_no', 'student__name', 'room__number')
+
+BOOKING_LISTING = Listing(
+    Booking.objects.select_related('student', 'room'), '-start_date',
+    only=_BOOKING_ONLY,
+    filters=_booking_filters(current=_current_bookings),
+    search=booking_search,
+)
+
+# stays moved out by archive.py; only read when ?archived=1
+ARCHIVED_BOOKING_LISTING = Listing(
+    ArchivedBooking.objects.select_related('student', 'room'), '-start_date',
+    only=_BOOKING_ONLY,
+    filters=_booking_filters(),
+    search=booking_search,
+)
+
 @login_required
+@conditional_page(_booking_list_state)
 def booking_list(request):
-    bookings = Booking.objects.select_related('student', 'room').all()
-    return render(request, 'bookings/list.html', {"bookings": bookings})
+    listing = ARCHIVED_BOOKING_LISTING if as_flag(request.GET.get('archived', '')) else BOOKING_LISTING
+    return render(request, 'bookings/list.html', listing.context(request))
 
 @login_required
 def booking_create(request):
     """
-    GET: render booking form with students and rooms.
+    GET: render the booking form; student (USN) and room (number) are typed,
+    helped by the autocomplete endpoints.
     POST: validate and create booking, update room occupancy and student's room.
     Always returns an HttpResponse.
     """
     if request.method == "POST":
-        student_id = request.POST.get('student')
-        room_id = request.POST.get('room')
+        roll_no = request.POST.get('student', '').strip()
+        room_number = request.POST.get('room', '').strip()
         start_date = request.POST.get('start_date')
         end_date = request.POST.get('end_date') or None
 
         # Basic validation
-        if not student_id or not room_id or not start_date:
+        if not roll_no or not room_number or not start_date:
             messages.error(request, "Please select a student, a room and a start date.")
-            # re-render form with current selections
-            students = Student.objects.all()
-            rooms = Room.objects.all()
-            return render(request, 'bookings/create.html', {"students": students, "rooms": rooms})
+            return _booking_form(request)
 
-        # Ensure objects exist
-        try:
-            student = Student.objects.get(id=student_id)
-            room = Room.objects.get(id=room_id)
-        except (Student.DoesNotExist, Room.DoesNotExist):
+        # Ensure objects exist (both are unique, indexed lookups)
+        student = Student.objects.filter(roll_no=roll_no).first()
+        room = Room.objects.filter(number=room_number).first()
+        if student is None or room is None:
             messages.error(request, "Selected student or room not found.")
-            students = Student.objects.all()
-            rooms = Room.objects.all()
-            return render(request, 'bookings/create.html', {"students": students, "rooms": rooms})
-
-        # Capacity check
-        if room.occupied >= room.capacity:
-            messages.error(request, f"Room {room.number} is full.")
-            students = Student.objects.all()
-            rooms = Room.objects.all()
-            return render(request, 'bookings/create.html', {"students": students, "rooms": rooms})
-
-        # Create booking and update occupancy
-        Booking.objects.create(student=student, room=room, start_date=start_date, end_date=end_date)
-        room.occupied += 1
-        room.save(update_fields=['occupied'])
-
-        # Assign room to student (if you want to)
-        student.room = room
-        student.save(update_fields=['room'])
+            return _booking_form(request)
+
+        # Capacity check + booking + occupancy update happen atomically
+        try:
+            allocation.create_booking(student, room, start_date, end_date)
+        except allocation.AllocationError as exc:
+            messages.error(request, str(exc))
+            return _booking_form(request)
 
         messages.success(request, "Booking created.")
         return redirect('malnad_app:booking_list')
 
     # GET request -> show form
-    students = Student.objects.all()
-    rooms = Room.objects.all()
-    return render(request, 'bookings/create.html', {"students": students, "rooms": rooms})
\ No newline at end of file
+    return _booking_form(request)
+
+def _booking_form(request):
+    # re-rendered with what was typed, so a failed POST keeps the selections;
+    # on GET the free-beds page can prefill room and dates
+    return render(request, 'bookings/create.html', {"values": request.POST or request.GET})
+
+# --- Autocomplete (staff) ---
+AUTOCOMPLETE_LIMIT = 10
+
+@login_required
+def student_autocomplete(request):
+    term = request.GET.get('q', '').strip()
+    rows = []
+    if term:
+        rows = (Student.objects.filter(student_search(term))
+                .order_by('roll_no').values_list('roll_no', 'name')[:AUTOCOMPLETE_LIMIT])
+    return JsonResponse({"results": [{"value": roll_no, "label": f"{roll_no} - {name}"} for roll_no, name in rows]})
+
+@login_required
+def room_autocomplete(request):
+    # only rooms with a free bed can take a new student or booking
+    term = request.GET.get('q', '').strip()
+    rows = []
+    if term:
+        rows = (Room.objects.filter(room_search(term), capacity__gt=F('occupied'))
+                .order_by('number').values_list('number', 'occupied', 'capacity')[:AUTOCOMPLETE_LIMIT])
+    return JsonResponse({"results": [
+        {"value": number, "label": f"{number} ({occupied}/{capacity})"} for number, occupied, capacity in rows
+    ]})
@@ -0,0 +1,29 @@
+// Fills the <datalist> of every <input data-autocomplete="url" list="id">
+// from the JSON endpoint as the user types: {"results": [{"value", "label"}]}.
+(function () {
+  function attach(input) {
+    var list = document.getElementById(input.getAttribute('list'));
+    var timer = null;
+    var last = null;
+    input.addEventListener('input', function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () {
+        var term = input.value.trim();
+        if (!term || term === last) return;
+        last = term;
+        fetch(input.dataset.autocomplete + '?q=' + encodeURIComponent(term), {credentials: 'same-origin'})
+          .then(function (response) { return response.ok ? response.json() : {results: []}; })
+          .then(function (data) {
+            list.innerHTML = '';
+            data.results.forEach(function (item) {
+              var option = document.createElement('option');
+              option.value = item.value;
+              option.label = item.label;
+              list.appendChild(option);
+            });
+          });
+      }, 150);
+    });
+  }
+  document.querySelectorAll('input[data-autocomplete]').forEach(attach);
+})();
@@ -1,27 +1,98 @@
 from django.contrib import admin
-from .models import Student, Room, Fee, Complaint, MessMenu, RoomRequest, ComplaintComment
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connection
+from django.db.models import BooleanField, ExpressionWrapper, F, Q
+from django.utils.functional import cached_property
+
+from .models import Student, Room, Fee, Complaint, MessMenu, RoomRequest, ComplaintComment, ExportJob
+
+ESTIMATE_THRESHOLD = 10000  # below this an exact COUNT(*) is cheap enough
+
+
+def estimated_row_count(model):
+    """Planner statistics row estimate for `model`'s table, or None if unknown."""
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+                row = cursor.fetchone()
+                return row[0] if row and row[0] >= 0 else None
+            if connection.vendor == 'sqlite':
+                # only present after ANALYZE. The first number of `stat` counts
+                # the rows in that index, which for a partial index is only the
+                # rows it covers; take the table's own row (no idx) or a full index.
+                cursor.execute(
+                    "SELECT MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 WHERE tbl = %s AND (idx IS NULL"
+                    " OR idx IN (SELECT name FROM pragma_index_list(%s) WHERE NOT partial))",
+                    [table, table],
+                )
+                row = cursor.fetchone()
+                return row[0] if row and row[0] is not None else None
+    except DatabaseError:
+        return None
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Uses the planner's row estimate for unfiltered changelists of big tables."""
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if not qs.query.where:
+            estimate = estimated_row_count(qs.model)
+            if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class FastChangeListAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False  # skip the extra unfiltered COUNT(*) on filtered pages
+
 
 @admin.register(Student)
-class StudentAdmin(admin.ModelAdmin):
+class StudentAdmin(FastChangeListAdmin):
     list_display = ('user', 'roll_no', 'room')
+    list_select_related = ('user', 'room')
 
 @admin.register(Room)
-class RoomAdmin(admin.ModelAdmin):
+class RoomAdmin(FastChangeListAdmin):
     list_display = ('number', 'capacity', 'occupied', 'is_available')
     readonly_fields = ('is_available',)
 
+    def get_queryset(self, request):
+        # availability computed by the database instead of a method call per row
+        return super().get_queryset(request).annotate(
+            available=ExpressionWrapper(Q(occupied__lt=F('capacity')), output_field=BooleanField())
+        )
+
+    @admin.display(boolean=True, ordering='available', description='Is available')
+    def is_available(self, obj):
+        return getattr(obj, 'available', obj.is_available())
+
 @admin.register(Fee)
-class FeeAdmin(admin.ModelAdmin):
+class FeeAdmin(FastChangeListAdmin):
     list_display = ('student', 'amount', 'paid', 'timestamp')
     list_filter = ('paid',)
+    list_select_related = ('student__user',)
 
 @admin.register(Complaint)
-class ComplaintAdmin(admin.ModelAdmin):
+class ComplaintAdmin(FastChangeListAdmin):
     list_display = ('title', 'student', 'resolved', 'created_at')
     list_filter = ('resolved',)
+    list_select_related = ('student__user',)
 
 @admin.register(MessMenu)
 class MessMenuAdmin(admin.ModelAdmin):
     list_display = ('date',)
-admin.site.register(RoomRequest)
-admin.site.register(ComplaintComment)
\ No newline at end of file
+
+@admin.register(RoomRequest)
+class RoomRequestAdmin(FastChangeListAdmin):
+    list_display = ('__str__', 'preferred_room', 'status', 'created_at')
+    list_filter = ('status',)
+    list_select_related = ('student__user', 'preferred_room')
+
+admin.site.register(ComplaintComment)
+admin.site.register(ExportJob)
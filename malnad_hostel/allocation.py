@@ -0,0 +1,234 @@
+# malnad_hostel/allocation.py
+"""
+Room allocation service.
+
+Every change to Student.room goes through here so that Room.occupied can
+never exceed capacity, even with several wardens clicking at once. A bed is
+claimed with one conditional UPDATE (`... SET occupied = occupied + 1 WHERE
+id = %s AND occupied < capacity`); the database serialises those, so the
+capacity check and the increment can't be split by another request.
+"""
+import heapq
+from collections import Counter
+
+from functools import partial
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from . import student_cache
+from .dashboard import invalidate_summary
+from .export_jobs import bump_table_version
+from .models import Room, RoomRequest, Student
+
+
+class AllocationError(Exception):
+    pass
+
+
+class RoomFull(AllocationError):
+    pass
+
+
+def _rooms_changed(*user_ids):
+    # counters are moved with update(), which sends no model signals
+    invalidate_summary()
+    bump_table_version(Room, Student)
+    student_cache.invalidate_students(*user_ids)
+
+
+def _claim_bed(room_id):
+    return Room.objects.filter(pk=room_id, occupied__lt=F('capacity')).update(occupied=F('occupied') + 1) == 1
+
+
+def _release_bed(room_id):
+    Room.objects.filter(pk=room_id, occupied__gt=0).update(occupied=F('occupied') - 1)
+
+
+def _move_student(student, old_room_id, new_room_id):
+    # only succeeds if nobody moved the student since we loaded it
+    moved = Student.objects.filter(pk=student.pk, room_id=old_room_id).update(room_id=new_room_id)
+    if not moved:
+        raise AllocationError(f"{student.roll_no} was reassigned by someone else, please retry")
+    student.room_id = new_room_id
+    student._loaded_room_id = new_room_id  # counters already moved, see signals.py
+
+
+def allocate(student, room):
+    """
+    Put `student` in `room`, releasing any bed they held before.
+    Raises RoomFull if the room has no free bed.
+    """
+    old_room_id = student.room_id
+    if old_room_id == room.pk:
+        return room
+    with transaction.atomic():
+        if not _claim_bed(room.pk):
+            raise RoomFull(f"Room {room.number} is full")
+        _move_student(student, old_room_id, room.pk)
+        student.room = room
+        if old_room_id:
+            _release_bed(old_room_id)
+        transaction.on_commit(partial(_rooms_changed, student.user_id))
+    room.refresh_from_db(fields=['occupied'])
+    return room
+
+
+def release(student):
+    """Remove `student` from their room. Returns the room they left (or None)."""
+    room = student.room
+    if room is None:
+        return None
+    with transaction.atomic():
+        _move_student(student, room.pk, None)
+        _release_bed(room.pk)
+        transaction.on_commit(partial(_rooms_changed, student.user_id))
+    room.refresh_from_db(fields=['occupied'])
+    return room
+
+
+def allocate_any(student, preferred=None):
+    """
+    Allocate the preferred room if it has space, otherwise the first room
+    with a free bed. Returns the room, or None if the hostel is full.
+    """
+    if preferred is not None:
+        try:
+            return allocate(student, preferred)
+        except RoomFull:
+            pass
+    # rooms can fill up between the SELECT and our claim; just try the next one
+    for room in Room.objects.filter(occupied__lt=F('capacity')).order_by('number'):
+        try:
+            return allocate(student, room)
+        except RoomFull:
+            continue
+    return None
+
+
+# --- Batch approval ---
+class BatchResult:
+    def __init__(self):
+        self.approved = []      # (RoomRequest, Room)
+        self.preferred = 0      # how many got their preferred room
+        self.unplaced = []      # RoomRequests left pending (no bed left)
+
+    def __str__(self):
+        return (f"{len(self.approved)} approved ({self.preferred} in preferred room), "
+                f"{len(self.unplaced)} left pending")
+
+
+def plan_batch(requests, rooms):
+    """
+    Decide a room for each request without touching the database.
+
+    `requests` are processed oldest first. A request gets its preferred room
+    while that room has a free bed; everyone else is packed best-fit, i.e.
+    into the open room with the fewest free beds, using a heap so each
+    placement is O(log rooms). Best-fit tops up half-empty rooms before
+    opening fresh ones, which keeps whole rooms free for later groups.
+    Beds vacated by students who move are not re-offered in the same batch.
+    """
+    free = {room.pk: room.capacity - room.occupied for room in rooms}
+    by_pk = {room.pk: room for room in rooms}
+    result = BatchResult()
+    leftovers = []
+    seen_students = set()
+
+    for rr in requests:
+        if rr.student_id in seen_students:
+            continue  # duplicate request; the first one wins
+        seen_students.add(rr.student_id)
+        if rr.preferred_room_id and rr.student.room_id == rr.preferred_room_id:
+            # already living there, nothing to allocate
+            result.approved.append((rr, rr.student.room))
+            result.preferred += 1
+        elif rr.preferred_room_id and free.get(rr.preferred_room_id, 0) > 0:
+            free[rr.preferred_room_id] -= 1
+            result.approved.append((rr, by_pk[rr.preferred_room_id]))
+            result.preferred += 1
+        else:
+            leftovers.append(rr)
+
+    heap = [(n, by_pk[pk].number, pk) for pk, n in free.items() if n > 0]
+    heapq.heapify(heap)
+    for rr in leftovers:
+        if not heap:
+            result.unplaced.append(rr)
+            continue
+        n, number, pk = heapq.heappop(heap)
+        result.approved.append((rr, by_pk[pk]))
+        if n > 1:
+            heapq.heappush(heap, (n - 1, number, pk))
+    return result
+
+
+def _lock_for_batch():
+    """
+    Stop other writers until the batch transaction ends.
+
+    SELECT ... FOR UPDATE locks the rows read on PostgreSQL, but SQLite
+    ignores it and its deferred transactions only take the write lock at
+    the first write. An UPDATE, even one matching no row, takes it up
+    front, so no allocate() can land between reading the counters and
+    writing them back.
+    """
+    if connection.vendor == 'sqlite':
+        Room.objects.filter(pk__lt=0).update(occupied=F('occupied'))
+
+
+def approve_pending_requests(processed_by=None, dry_run=False):
+    """
+    Approve every pending RoomRequest in one go.
+
+    Loads pending requests and open rooms once, plans with plan_batch() and
+    writes students, room counters and requests back with bulk_update in a
+    single transaction. The requests, their students and the rooms are
+    locked before they are read (see _lock_for_batch), so the plan can't go
+    stale before it is written. Should a counter still end up over
+    capacity, AllocationError rolls the whole batch back.
+    """
+    with transaction.atomic():
+        if not dry_run:
+            _lock_for_batch()
+        requests = list(
+            RoomRequest.objects.filter(status='pending')
+            .select_related('student__room').select_for_update(of=('self', 'student'))
+            .order_by('created_at', 'pk')
+        )
+        rooms = list(Room.objects.select_for_update().filter(occupied__lt=F('capacity')))
+        result = plan_batch(requests, rooms)
+        if dry_run or not result.approved:
+            return result
+
+        now = timezone.now()
+        delta = Counter()
+        students = []
+        for rr, room in result.approved:
+            student = rr.student
+            if student.room_id == room.pk:
+                delta[room.pk] -= 1  # already there, don't count them twice
+            elif student.room_id:
+                delta[student.room_id] -= 1
+            delta[room.pk] += 1
+            student.room_id = room.pk
+            students.append(student)
+            rr.status = 'approved'
+            rr.processed_by = processed_by
+            rr.processed_at = now
+
+        counters = []
+        for pk, n in delta.items():
+            if n:
+                counters.append(Room(pk=pk, occupied=Greatest(F('occupied') + n, 0)))
+        Student.objects.bulk_update(students, ['room'], batch_size=500)
+        Room.objects.bulk_update(counters, ['occupied'], batch_size=500)
+        RoomRequest.objects.bulk_update(
+            [rr for rr, _ in result.approved], ['status', 'processed_by', 'processed_at'], batch_size=500
+        )
+        if Room.objects.filter(pk__in=delta, occupied__gt=F('capacity')).exists():
+            raise AllocationError("Rooms filled up while the batch was written, please retry")
+        transaction.on_commit(partial(_rooms_changed, *(s.user_id for s in students)))
+    return result
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class MalnadHostelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'malnad_hostel'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects receivers)
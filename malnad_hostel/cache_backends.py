@@ -0,0 +1,207 @@
+# malnad_hostel/cache_backends.py
+"""
+Cache backends selected by cache_config.build_caches().
+
+They are Django's own backends plus hit/miss counting for the `cache_stats`
+command. Counts are buffered per process and merged into a stats key held by
+the cache itself every FLUSH_EVERY lookups, so shared backends (file, db,
+redis) report traffic from every worker; locmem only ever sees its own
+process.
+
+FakeRedisCache runs Django's RedisCache client code against an in-process
+dict instead of a server, for tests and for machines without Redis.
+"""
+import threading
+import time
+
+from django.core.cache.backends.db import DatabaseCache as _DatabaseCache
+from django.core.cache.backends.filebased import FileBasedCache as _FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache as _LocMemCache
+from django.core.cache.backends.redis import RedisCache as _RedisCache, RedisCacheClient, RedisSerializer
+
+STATS_KEY = '__cache_stats__'
+FLUSH_EVERY = 50
+
+_MISS = object()
+
+
+# --- Hit/miss counting ---
+class CacheStatsMixin:
+    _nested = False  # set while inside a counted call, so backends that build
+                     # get() on get_many() (or the reverse) aren't counted twice
+
+    def _record(self, hits, misses):
+        pending = self.__dict__.setdefault('_pending_stats', {'hits': 0, 'misses': 0})
+        pending['hits'] += hits
+        pending['misses'] += misses
+        if pending['hits'] + pending['misses'] >= FLUSH_EVERY:
+            self.flush_stats()
+
+    def _uncounted(self, fn, *args):
+        outer, self._nested = self._nested, True
+        try:
+            return fn(*args)
+        finally:
+            self._nested = outer
+
+    def get(self, key, default=None, version=None):
+        if self._nested:
+            return super().get(key, default, version)
+        value = self._uncounted(super().get, key, _MISS, version)
+        self._record(int(value is not _MISS), int(value is _MISS))
+        return default if value is _MISS else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if self._nested:
+            return super().get_many(keys, version)
+        found = self._uncounted(super().get_many, keys, version)
+        self._record(len(found), len(keys) - len(found))
+        return found
+
+    def flush_stats(self):
+        pending = self.__dict__.pop('_pending_stats', None)
+        if not pending:
+            return
+        # read-modify-write: concurrent flushes can drop a batch, fine for a ratio
+        stored = self._uncounted(super().get, STATS_KEY, None, None) or {'hits': 0, 'misses': 0}
+        stored = {k: stored[k] + pending[k] for k in ('hits', 'misses')}
+        self._uncounted(super().set, STATS_KEY, stored, None, None)
+
+    def stats(self):
+        self.flush_stats()
+        stored = self._uncounted(super().get, STATS_KEY, None, None) or {'hits': 0, 'misses': 0}
+        total = stored['hits'] + stored['misses']
+        return {**stored, 'ratio': round(stored['hits'] / total, 4) if total else None}
+
+    def reset_stats(self):
+        self.__dict__.pop('_pending_stats', None)
+        self._uncounted(super().delete, STATS_KEY, None)
+
+
+class LocMemCache(CacheStatsMixin, _LocMemCache):
+    pass
+
+
+class FileBasedCache(CacheStatsMixin, _FileBasedCache):
+    pass
+
+
+class DatabaseCache(CacheStatsMixin, _DatabaseCache):
+    pass
+
+
+class RedisCache(CacheStatsMixin, _RedisCache):
+    pass
+
+
+# --- In-process Redis stand-in ---
+class _FakeRedisServer:
+    """The subset of redis.Redis that RedisCacheClient uses."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+            return None if entry is None else entry[0]
+
+    def mget(self, keys):
+        with self._lock:
+            return [None if (e := self._live(k)) is None else e[0] for k in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        with self._lock:
+            if nx and self._live(key) is not None:
+                return None
+            self._data[key] = (value, None if ex is None else time.monotonic() + ex)
+            return True
+
+    def mset(self, mapping):
+        for key, value in mapping.items():
+            self.set(key, value)
+        return True
+
+    def delete(self, *keys):
+        with self._lock:
+            removed = [k for k in keys if self._live(k) is not None]
+            for key in removed:
+                del self._data[key]
+            return len(removed)
+
+    def exists(self, key):
+        with self._lock:
+            return int(self._live(key) is not None)
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            entry = self._live(key)
+            value = (int(entry[0]) if entry else 0) + amount
+            self._data[key] = (value, entry[1] if entry else None)
+            return value
+
+    def expire(self, key, seconds):
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                return False
+            self._data[key] = (entry[0], time.monotonic() + seconds)
+            return True
+
+    def persist(self, key):
+        with self._lock:
+            entry = self._live(key)
+            if entry is None or entry[1] is None:
+                return False
+            self._data[key] = (entry[0], None)
+            return True
+
+    def flushdb(self):
+        with self._lock:
+            self._data.clear()
+            return True
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, server):
+        self._server = server
+        self._calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self._calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self._server, name)(*args, **kwargs) for name, args, kwargs in self._calls]
+
+
+_fake_servers = {}
+_fake_servers_lock = threading.Lock()
+
+
+class FakeRedisCacheClient(RedisCacheClient):
+    def __init__(self, servers, serializer=None, **options):
+        # no `import redis`: every "connection" is the shared in-process server
+        self._serializer = serializer() if callable(serializer) else serializer or RedisSerializer()
+        with _fake_servers_lock:
+            self._server = _fake_servers.setdefault(servers[0], _FakeRedisServer())
+
+    def get_client(self, key=None, *, write=False):
+        return self._server
+
+
+class FakeRedisCache(RedisCache):
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        self._class = FakeRedisCacheClient
@@ -0,0 +1,83 @@
+# malnad_hostel/cache_config.py
+"""
+CACHES for hostel_manager/settings.py, chosen by environment variables:
+
+    HOSTEL_CACHE_BACKEND   locmem (default) | file | db | redis | fakeredis
+    HOSTEL_CACHE_LOCATION  directory (file), table name (db) or redis:// URL
+    HOSTEL_CACHE_VERSION   key version; bump it on deploy to orphan every old key
+    HOSTEL_CACHE_PREFIX    key prefix, when several sites share one server
+
+Aliases:
+    default    dashboard summary, query stats
+    sessions   session data (see SESSION_CACHE_ALIAS)
+    fragments  student dashboards, weekly mess menu
+    exports    table version tokens (export job high-water marks, page ETags),
+               only kept when the cache is shared
+
+locmem is per process and only right for a single worker; `db` needs
+`python manage.py createcachetable` once. This module is imported by the
+settings file, so it must not import Django models.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+BACKENDS = {
+    'locmem': 'malnad_hostel.cache_backends.LocMemCache',
+    'file': 'malnad_hostel.cache_backends.FileBasedCache',
+    'db': 'malnad_hostel.cache_backends.DatabaseCache',
+    'redis': 'malnad_hostel.cache_backends.RedisCache',
+    'fakeredis': 'malnad_hostel.cache_backends.FakeRedisCache',
+}
+
+# alias -> default timeout in seconds (None = until deleted)
+ALIASES = {
+    'default': 300,
+    'sessions': 60 * 60 * 24 * 14,  # SESSION_COOKIE_AGE
+    'fragments': 60 * 60,
+    'exports': None,
+}
+
+# every web process sees the same entries; locmem and fakeredis are per process
+SHARED_BACKENDS = ('file', 'db', 'redis')
+
+DB_TABLE = 'hostel_cache'
+REDIS_URL = 'redis://127.0.0.1:6379/0'
+
+
+def build_caches(backend='locmem', location=None, version=1, prefix='hostel', base_dir='.'):
+    if backend not in BACKENDS:
+        raise ImproperlyConfigured(f"Unknown cache backend {backend!r}; choose from {', '.join(BACKENDS)}")
+    caches = {}
+    for alias, timeout in ALIASES.items():
+        if backend == 'locmem':
+            where = f"{prefix}-{alias}"
+        elif backend == 'file':
+            where = os.path.join(location or os.path.join(base_dir, 'cache'), alias)
+        elif backend == 'db':
+            where = location or DB_TABLE  # one table, aliases kept apart by KEY_PREFIX
+        else:
+            where = location or REDIS_URL
+        caches[alias] = {
+            'BACKEND': BACKENDS[backend],
+            'LOCATION': where,
+            'TIMEOUT': timeout,
+            'KEY_PREFIX': f"{prefix}:{alias}",
+            'VERSION': version,
+        }
+    return caches
+
+
+def caches_from_env(base_dir, environ=os.environ):
+    return build_caches(
+        backend=environ.get('HOSTEL_CACHE_BACKEND', 'locmem'),
+        location=environ.get('HOSTEL_CACHE_LOCATION') or None,
+        version=int(environ.get('HOSTEL_CACHE_VERSION', 1)),
+        prefix=environ.get('HOSTEL_CACHE_PREFIX', 'hostel'),
+        base_dir=base_dir,
+    )
+
+
+def shared_cache_from_env(environ=os.environ):
+    """Whether every web process sees the same cache entries (settings.SHARED_CACHE)."""
+    return environ.get('HOSTEL_CACHE_BACKEND', 'locmem') in SHARED_BACKENDS
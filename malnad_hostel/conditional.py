@@ -0,0 +1,81 @@
+# malnad_hostel/conditional.py
+"""
+Conditional GET for read-mostly pages.
+
+`conditional_page(state)` wraps a view. `state(request, *args, **kwargs)`
+does something cheap (an aggregate query, a few cache lookups) and returns
+`(parts, last_modified)`; the ETag is a hash of `parts` plus the user, since
+every page carries per-user navigation. When the client's If-None-Match /
+If-Modified-Since still match, a 304 goes out before the view loads any rows
+or renders a template.
+
+Pass `last_modified=None` unless the rows carry a real modification time:
+Fee.timestamp, for instance, does not move when a fee is marked paid.
+
+Async views get an async wrapper; their `state` may be a coroutine function
+too (a sync one is run with sync_to_async).
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def make_etag(request, parts):
+    raw = repr((request.user.pk, request.user.is_staff, parts))
+    return f'"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+
+def _check(request, etag, last_modified):
+    if get_messages(request):  # pending flash messages must be rendered
+        return None
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def _finish(response, etag, last_modified):
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        # browsers may keep the page but must ask before reusing it
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _timestamp(last_modified):
+    return int(last_modified.timestamp()) if last_modified else None
+
+
+def conditional_page(state):
+    def decorator(view):
+        if iscoroutinefunction(view):
+            astate = state if iscoroutinefunction(state) else sync_to_async(state)
+
+            @wraps(view)
+            async def ainner(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view(request, *args, **kwargs)
+                request.user = await request.auser()  # make_etag must not hit the ORM synchronously
+                parts, last_modified = await astate(request, *args, **kwargs)
+                etag, last_modified = make_etag(request, parts), _timestamp(last_modified)
+                response = _check(request, etag, last_modified)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _finish(response, etag, last_modified)
+            return ainner
+
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            parts, last_modified = state(request, *args, **kwargs)
+            etag, last_modified = make_etag(request, parts), _timestamp(last_modified)
+            response = _check(request, etag, last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return _finish(response, etag, last_modified)
+        return inner
+    return decorator
@@ -0,0 +1,165 @@
+# malnad_hostel/dashboard.py
+"""
+Summary numbers for the management dashboard.
+
+All cards are computed by a single SQL statement (conditional aggregates on
+Room plus scalar COUNT subqueries for the other tables) and the result is
+cached until one of the underlying tables changes (see signals.py). That
+invalidation only reaches the workers sharing the cache: without
+settings.SHARED_CACHE the summary is kept for UNSHARED_SUMMARY_TIMEOUT
+seconds, and the other workers' cards may be that stale after a write.
+
+The row lists next to the cards can't share a statement, so
+run_concurrently() fetches them at once, each on its own connection. The
+pool's threads keep their connections between requests, so a dashboard
+view doesn't pay a connect per list; shutdown() closes them.
+"""
+import atexit
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import Count, F, IntegerField, Q, Subquery
+
+from . import instrumentation
+
+from .models import Complaint, Fee, Room, RoomRequest, Student
+
+SUMMARY_CACHE_KEY = 'malnad_hostel:dashboard_summary'
+SUMMARY_CACHE_TIMEOUT = 300  # seconds; signals invalidate earlier on writes
+UNSHARED_SUMMARY_TIMEOUT = 10  # per-process cache: other workers miss the invalidation
+
+OPEN_COMPLAINT_STATUSES = ('pending', 'in_progress')
+
+
+class SubqueryCount(Subquery):
+    """`(SELECT COUNT(*) FROM (<queryset>))` usable inside aggregate()."""
+    template = '(SELECT COUNT(*) FROM (%(subquery)s) _count)'
+    output_field = IntegerField()
+    # lets aggregate() accept it next to real aggregates; the subquery is a
+    # constant for the outer row so no GROUP BY is needed
+    contains_aggregate = True
+
+
+def open_complaints():
+    return Complaint.objects.filter(status__in=OPEN_COMPLAINT_STATUSES)
+
+
+def pending_fees():
+    return Fee.objects.filter(paid=False)
+
+
+def compute_summary():
+    """Run the one-statement summary query (no cache)."""
+    return Room.objects.aggregate(
+        room_count=Count('pk'),
+        available_rooms=Count('pk', filter=Q(occupied__lt=F('capacity'))),
+        student_count=SubqueryCount(Student.objects.values('pk')),
+        pending_requests=SubqueryCount(RoomRequest.objects.filter(status='pending').values('pk')),
+        pending_fees_count=SubqueryCount(pending_fees().values('pk')),
+        open_complaints=SubqueryCount(open_complaints().values('pk')),
+    )
+
+
+def get_summary():
+    summary = cache.get(SUMMARY_CACHE_KEY)
+    if summary is None:
+        summary = compute_summary()
+        timeout = SUMMARY_CACHE_TIMEOUT if settings.SHARED_CACHE else UNSHARED_SUMMARY_TIMEOUT
+        cache.set(SUMMARY_CACHE_KEY, summary, timeout)
+    return summary
+
+
+def invalidate_summary():
+    cache.delete(SUMMARY_CACHE_KEY)
+
+
+# --- Independent queries ---
+CONNECTION_MAX_AGE = 300  # seconds a pool thread keeps its connection
+
+_executor = None
+_local = threading.local()
+_connections = []  # every pool thread's connection, for shutdown()
+_connections_lock = threading.Lock()
+
+
+def _pool():
+    global _executor
+    workers = getattr(settings, 'DASHBOARD_QUERY_WORKERS', None)
+    if workers == 0:
+        return None
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 1),
+                                       thread_name_prefix='dashboard')
+        atexit.register(shutdown)
+    return _executor
+
+
+def shutdown():
+    """Stop the pool and close its threads' connections."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+    with _connections_lock:
+        opened = _connections[:]
+        _connections.clear()
+    for conn in opened:
+        conn.inc_thread_sharing()  # its thread has exited; let this one close it
+        try:
+            conn.close()
+        finally:
+            conn.dec_thread_sharing()
+
+
+def _ready_connection():
+    # not close_old_connections(): with CONN_MAX_AGE = 0 it would close the
+    # connection after every job, and each dashboard would connect N times
+    conn = connections[DEFAULT_DB_ALIAS]
+    if conn.connection is not None:
+        expired = time.monotonic() - _local.opened > CONNECTION_MAX_AGE
+        if expired or (conn.errors_occurred and not conn.is_usable()):
+            conn.close()
+    if conn.connection is None:
+        conn.ensure_connection()
+        _local.opened = time.monotonic()
+        with _connections_lock:
+            if conn not in _connections:
+                _connections.append(conn)
+
+
+def _on_own_connection(call, counted):
+    _ready_connection()
+    if not counted:
+        return call(), None
+    # counted here and added to the request's stats on its own thread, so
+    # the workers never share a counter
+    stats = instrumentation.RequestStats()
+    with connection.execute_wrapper(stats):
+        return call(), stats
+
+
+def run_concurrently(*calls):
+    """
+    Return [call() for call in calls], running them in parallel on separate
+    connections. Inside a transaction they run in order instead: other
+    connections could not see its uncommitted rows.
+    """
+    pool = _pool()
+    if pool is None or len(calls) < 2 or connection.in_atomic_block:
+        return [call() for call in calls]
+    request_stats = instrumentation.current_stats()  # still count these queries against the request
+    futures = [pool.submit(contextvars.copy_context().run, _on_own_connection, call, request_stats is not None)
+               for call in calls]
+    results = []
+    for future in futures:
+        result, stats = future.result()
+        if stats is not None:
+            request_stats.add(stats)
+        results.append(result)
+    return results
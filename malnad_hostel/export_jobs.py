@@ -0,0 +1,139 @@
+# malnad_hostel/export_jobs.py
+"""
+Background CSV export jobs.
+
+A request creates an ExportJob row and hands it to a small thread pool; the
+worker writes the CSV under MEDIA_ROOT/exports/ and the client polls the
+job status until it can download the file.
+
+Finished files are named after a high-water mark of the exported table
+(row count, max id) and a version token, bumped on every write, of each
+table the export reads (Export.tables for the joined ones), so asking
+again for an export of unchanged data is answered from disk without
+touching the worker. The version tokens live in the "exports" cache and
+are only kept when settings.SHARED_CACHE says every web process sees it: a
+bump in one worker's locmem would never reach the others, which would keep
+reusing old files and answering 304 with stale pages. Otherwise every call
+gets a fresh token, so nothing is reused rather than something stale.
+"""
+import hashlib
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .exports import EXPORTS, gzip_chunks, iter_csv
+from .models import ExportJob
+
+CACHE_ALIAS = 'exports'
+EXPORT_DIR = 'exports'
+
+_executor = None
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'EXPORT_JOB_WORKERS', 2),
+            thread_name_prefix='export-job',
+        )
+    return _executor
+
+
+# --- Table high-water marks ---
+def _version_key(model):
+    return f'malnad_hostel:table_version:{model._meta.label_lower}'
+
+
+def table_version(model):
+    """Opaque token that changes whenever rows of `model` are written."""
+    if not settings.SHARED_CACHE:
+        return uuid.uuid4().hex
+    return caches[CACHE_ALIAS].get_or_set(_version_key(model), lambda: uuid.uuid4().hex, None)
+
+
+async def atable_version(model):
+    if not settings.SHARED_CACHE:
+        return uuid.uuid4().hex
+    return await caches[CACHE_ALIAS].aget_or_set(_version_key(model), lambda: uuid.uuid4().hex, None)
+
+
+def bump_table_version(*models):
+    # deleting is enough: the next reader mints a fresh token, and an evicted
+    # token just costs one extra export rather than serving stale data
+    caches[CACHE_ALIAS].delete_many([_version_key(m) for m in models])
+
+
+def high_water_mark(export):
+    qs = export.queryset()
+    stats = qs.aggregate(rows=Count('pk'), max_id=Max('pk'))
+    # a renamed user or room changes the file as much as a new row does
+    versions = [table_version(model) for model in (qs.model, *export.tables)]
+    return {'rows': stats['rows'], 'max_id': stats['max_id'], 'versions': versions}
+
+
+def cache_key_for(name, params):
+    mark = high_water_mark(EXPORTS[name])
+    raw = json.dumps({'name': name, 'params': params, 'mark': mark}, sort_keys=True)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def relative_path(name, key, params):
+    ext = '.csv.gz' if params.get('compress') == 'gzip' else '.csv'
+    return os.path.join(EXPORT_DIR, f"{name}-{key[:16]}{ext}")
+
+
+# --- Jobs ---
+def enqueue(name, params, user=None):
+    """
+    Create a job for export `name`. If an identical export of the same data
+    already exists on disk the job is returned already done.
+    """
+    key = cache_key_for(name, params)
+    path = relative_path(name, key, params)
+    job = ExportJob(name=name, params=params, cache_key=key, file=path, requested_by=user)
+    if os.path.exists(os.path.join(settings.MEDIA_ROOT, path)):
+        job.status = 'done'
+        job.cached = True
+        job.finished_at = timezone.now()
+        job.save()
+        return job
+
+    job.save()
+    if getattr(settings, 'EXPORT_JOB_WORKERS', 2) == 0:
+        transaction.on_commit(lambda: run_job(job.pk))
+    else:
+        transaction.on_commit(lambda: _pool().submit(run_job, job.pk))
+    return job
+
+
+def run_job(job_id):
+    """Worker entry point: write the export file for one job."""
+    job = ExportJob.objects.get(pk=job_id)
+    ExportJob.objects.filter(pk=job.pk).update(status='running')
+    target = os.path.join(settings.MEDIA_ROOT, job.file)
+    tmp = f"{target}.{job.pk}.part"
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        chunks = iter_csv(EXPORTS[job.name], job.params.get('from'), job.params.get('to'))
+        if job.params.get('compress') == 'gzip':
+            chunks = gzip_chunks(chunks)
+        with open(tmp, 'wb') as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+        os.replace(tmp, target)  # readers never see a half-written file
+        ExportJob.objects.filter(pk=job.pk).update(status='done', finished_at=timezone.now())
+    except Exception as exc:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        ExportJob.objects.filter(pk=job.pk).update(status='failed', error=str(exc), finished_at=timezone.now())
+    finally:
+        if getattr(settings, 'EXPORT_JOB_WORKERS', 2) != 0:
+            connection.close()  # worker threads own their connection
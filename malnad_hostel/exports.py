@@ -0,0 +1,139 @@
+# malnad_hostel/exports.py
+"""
+Streaming CSV exports.
+
+Rows are pulled with values_list().iterator(chunk_size=...) and written
+straight into a StreamingHttpResponse, so memory stays flat no matter how
+big the table is and the first bytes go out before the query finishes.
+
+Query string options understood by every export:
+    ?from=YYYY-MM-DD&to=YYYY-MM-DD   inclusive date range (if the table has a date)
+    ?compress=gzip                   send students.csv.gz instead of plain CSV
+"""
+import csv
+import zlib
+
+from django.contrib.auth.models import User
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+
+from .models import Complaint, Room, Student
+
+CHUNK_SIZE = 2000     # rows fetched from the DB per round trip
+ROWS_PER_WRITE = 500  # rows joined into one chunk of the response
+
+
+class Echo:
+    """File-like object whose write() just hands the line back."""
+    def write(self, value):
+        return value
+
+
+class Export:
+    def __init__(self, name, header, columns, queryset, date_field=None, row=None, tables=()):
+        self.name = name
+        self.header = header
+        self.columns = columns
+        self.queryset = queryset
+        self.date_field = date_field
+        self.row = row or (lambda values: values)
+        self.tables = tables  # other models whose columns end up in the file
+
+    def rows(self, date_from=None, date_to=None):
+        qs = self.queryset()
+        if self.date_field and date_from:
+            qs = qs.filter(**{f'{self.date_field}__date__gte': date_from})
+        if self.date_field and date_to:
+            qs = qs.filter(**{f'{self.date_field}__date__lte': date_to})
+        for values in qs.values_list(*self.columns).iterator(chunk_size=CHUNK_SIZE):
+            yield self.row(values)
+
+
+def _student_row(values):
+    username, first, last, roll_no, contact, course, semester, room = values
+    full_name = f"{first} {last}".strip()
+    return [username, full_name, roll_no, contact, course, semester, room or '']
+
+
+EXPORTS = {
+    'students': Export(
+        'students',
+        ['username', 'full_name', 'roll_no', 'contact', 'course', 'semester', 'room'],
+        ['user__username', 'user__first_name', 'user__last_name', 'roll_no',
+         'contact', 'course', 'semester', 'room__number'],
+        lambda: Student.objects.order_by('pk'),
+        date_field='user__date_joined',
+        row=_student_row,
+        tables=(User, Room),
+    ),
+    'rooms': Export(
+        'rooms',
+        ['number', 'capacity', 'occupied'],
+        ['number', 'capacity', 'occupied'],
+        lambda: Room.objects.order_by('pk'),
+    ),
+    'complaints': Export(
+        'complaints',
+        ['title', 'student', 'category', 'status', 'created_at'],
+        ['title', 'student__user__username', 'category', 'status', 'created_at'],
+        lambda: Complaint.objects.order_by('pk'),
+        date_field='created_at',
+        tables=(Student, User),
+    ),
+}
+
+
+def iter_csv(export, date_from=None, date_to=None):
+    """Yield the CSV as encoded chunks of ROWS_PER_WRITE rows."""
+    writer = csv.writer(Echo())
+    buffer = [writer.writerow(export.header)]
+    for row in export.rows(date_from, date_to):
+        buffer.append(writer.writerow(row))
+        if len(buffer) >= ROWS_PER_WRITE:
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def parse_range(params):
+    """Return (date_from, date_to) or raise ValueError for a malformed date."""
+    bounds = []
+    for key in ('from', 'to'):
+        raw = params.get(key)
+        if not raw:
+            bounds.append(None)
+            continue
+        value = parse_date(raw)
+        if value is None:
+            raise ValueError(f"Invalid '{key}' date: {raw}")
+        bounds.append(value)
+    return tuple(bounds)
+
+
+def stream_export(request, name):
+    export = EXPORTS[name]
+    try:
+        date_from, date_to = parse_range(request.GET)
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    chunks = iter_csv(export, date_from, date_to)
+    filename = f"{export.name}.csv"
+    if request.GET.get('compress') == 'gzip':
+        chunks = gzip_chunks(chunks)
+        filename += '.gz'
+        response = StreamingHttpResponse(chunks, content_type='application/gzip')
+    else:
+        response = StreamingHttpResponse(chunks, content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -1,6 +1,8 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from django.db.models import Q
+from django.urls import reverse_lazy
 from .models import Complaint, Student, RoomRequest, ComplaintComment, Fee
 
 class UserRegisterForm(UserCreationForm):
@@ -10,11 +12,25 @@ class UserRegisterForm(UserCreationForm):
         fields = ['username','first_name','last_name','email','password1','password2']
 
 class AllocateStudentForm(forms.Form):
-    student = forms.ModelChoiceField(
-        queryset=Student.objects.filter(room__isnull=True),
-        label="Select Student to Allocate"
+    # typed with autocomplete (views.student_autocomplete) instead of a
+    # <select> listing every unassigned student
+    student = forms.CharField(
+        label="Student to Allocate (roll no or username)",
+        widget=forms.TextInput(attrs={
+            'list': 'student-options',
+            'autocomplete': 'off',
+            'data-autocomplete': reverse_lazy('malnad_hostel:student_autocomplete'),
+        }),
     )
 
+    def clean_student(self):
+        value = self.cleaned_data['student'].strip()
+        student = (Student.objects.select_related('user').filter(room__isnull=True)
+                   .filter(Q(roll_no=value) | Q(user__username=value)).first())
+        if student is None:
+            raise forms.ValidationError("No unassigned student with that roll number or username.")
+        return student
+
 class ProfileForm(forms.ModelForm):
     class Meta:
         model = Student
@@ -0,0 +1,99 @@
+# malnad_hostel/hashers.py
+"""
+Password hashing policy and the thread pool that runs it.
+
+settings.PASSWORD_HASHING picks the algorithm for new hashes and its cost:
+
+    PASSWORD_HASHING = {
+        'algorithm': 'scrypt',            # or 'argon2' (needs argon2-cffi) / 'pbkdf2'
+        'scrypt': {'work_factor': 2 ** 14, 'block_size': 8, 'parallelism': 1},
+        'argon2': {'time_cost': 2, 'memory_cost': 19456, 'parallelism': 1},
+        'workers': None,                  # concurrent hashes, default os.cpu_count(); 0 = inline
+    }
+
+password_hashers() puts the chosen hasher first and keeps the others for
+verifying old hashes. Django rehashes on a successful login whenever the
+stored hash uses another algorithm or other parameters, so changing the
+policy upgrades users as they sign in.
+
+offload() runs a hashing-heavy callable (login/registration form handling)
+in a bounded pool with sync_to_async, so an async view yields the event loop
+while at most `workers` hashes burn CPU and the rest queue.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections
+
+HASHERS = {
+    'scrypt': 'malnad_hostel.hashers.TunedScryptPasswordHasher',
+    'argon2': 'malnad_hostel.hashers.TunedArgon2PasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+LEGACY_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+
+def _params(name):
+    return getattr(settings, 'PASSWORD_HASHING', {}).get(name, {})
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    def __init__(self):
+        for attr, value in _params('scrypt').items():
+            setattr(self, attr, value)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    def __init__(self):
+        for attr, value in _params('argon2').items():
+            setattr(self, attr, value)
+
+
+def password_hashers(algorithm='scrypt'):
+    """Value for settings.PASSWORD_HASHERS with `algorithm` preferred."""
+    if algorithm not in HASHERS:
+        raise ImproperlyConfigured(f"Unknown password hasher {algorithm!r}; choose from {', '.join(HASHERS)}")
+    if algorithm == 'argon2':
+        try:
+            import argon2  # noqa: F401
+        except ImportError:
+            raise ImproperlyConfigured("PASSWORD_HASHING algorithm 'argon2' needs the argon2-cffi package")
+    preferred = HASHERS[algorithm]
+    others = [HASHERS[name] for name in ('scrypt', 'argon2') if name != algorithm]
+    return [preferred] + [h for h in others + LEGACY_HASHERS if h != preferred]
+
+
+# --- Bounded hashing pool ---
+_executor = None
+
+
+def _pool():
+    global _executor
+    workers = getattr(settings, 'PASSWORD_HASHING', {}).get('workers')
+    if workers == 0:
+        return None  # run on the request's own thread (tests, single-threaded servers)
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1, thread_name_prefix='hashing')
+    return _executor
+
+
+def _run(func, *args, **kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # pool threads outlive the request; treat each job like one
+        close_old_connections()
+
+
+async def offload(func, *args, **kwargs):
+    pool = _pool()
+    if pool is None:
+        return await sync_to_async(func)(*args, **kwargs)
+    return await sync_to_async(_run, thread_sensitive=False, executor=pool)(func, *args, **kwargs)
@@ -0,0 +1,301 @@
+# malnad_hostel/instrumentation.py
+"""
+Per-view performance instrumentation.
+
+QueryStatsMiddleware records, for every request that resolved to a named
+URL, the number of SQL queries, time spent in SQL, time spent rendering
+templates (via InstrumentedTemplates), total time and response size. The
+numbers are aggregated into per-view histograms that can be read from the
+`perf/stats/` endpoint or the `query_stats` command, and checked against
+the budgets in settings.QUERY_BUDGETS:
+
+    QUERY_BUDGETS = {
+        'malnad_hostel:management_dashboard': 6,                 # queries
+        'malnad_hostel:fees': {'queries': 3, 'total_ms': 200},
+    }
+
+The middleware works in both the sync and the async handler chain, so async
+views keep running on the event loop.
+
+Streaming responses are measured up to the point the view returns; SQL run
+while the body is streamed is not counted.
+"""
+import contextvars
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger('malnad_hostel.perf')
+
+STATS_CACHE_KEY = 'malnad_hostel:query_stats'
+FLUSH_EVERY = 20  # requests buffered per process before merging into the cache
+
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+MS_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000)
+
+_current = contextvars.ContextVar('malnad_request_stats', default=None)
+
+
+class RequestStats:
+    """Counters for one request; also usable as a connection.execute_wrapper."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.render_ms = 0.0
+        self.total_ms = 0.0
+        self.bytes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_ms += (time.perf_counter() - start) * 1000
+
+    def add(self, other):
+        """Count another RequestStats' queries (e.g. a worker thread's) as this request's."""
+        self.queries += other.queries
+        self.sql_ms += other.sql_ms
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'sql_ms': round(self.sql_ms, 3),
+            'render_ms': round(self.render_ms, 3),
+            'total_ms': round(self.total_ms, 3),
+            'bytes': self.bytes,
+        }
+
+
+def current_stats():
+    """RequestStats of the request being measured in this context, or None."""
+    return _current.get()
+
+
+# --- Template timing ---
+class _TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+        self.origin = template.origin
+
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            if stats is not None:
+                stats.render_ms += (time.perf_counter() - start) * 1000
+
+
+class InstrumentedTemplates(DjangoTemplates):
+    """DjangoTemplates backend that reports render time to QueryStatsMiddleware."""
+
+    def from_string(self, template_code):
+        return _TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name))
+
+
+# --- Budgets ---
+def get_budget(view_name):
+    """Return the budget dict for `view_name` (int shorthand means queries)."""
+    budget = getattr(settings, 'QUERY_BUDGETS', {}).get(view_name)
+    if budget is None:
+        return {}
+    if isinstance(budget, int):
+        return {'queries': budget}
+    return dict(budget)
+
+
+def budget_violations(view_name, stats):
+    values = stats.as_dict()
+    return [
+        f"{metric}={values[metric]} > {limit}"
+        for metric, limit in get_budget(view_name).items()
+        if values.get(metric, 0) > limit
+    ]
+
+
+# --- Aggregation ---
+def _bucket(value, bounds):
+    for bound in bounds:
+        if value <= bound:
+            return f"<={bound}"
+    return f">{bounds[-1]}"
+
+
+def _empty_entry():
+    return {
+        'requests': 0, 'over_budget': 0,
+        'queries': 0, 'max_queries': 0,
+        'sql_ms': 0.0, 'render_ms': 0.0, 'total_ms': 0.0, 'max_total_ms': 0.0,
+        'bytes': 0,
+        'queries_hist': {}, 'total_ms_hist': {},
+    }
+
+
+def _merge(into, entry):
+    for key in ('requests', 'over_budget', 'queries', 'sql_ms', 'render_ms', 'total_ms', 'bytes'):
+        into[key] += entry[key]
+    into['max_queries'] = max(into['max_queries'], entry['max_queries'])
+    into['max_total_ms'] = max(into['max_total_ms'], entry['max_total_ms'])
+    for hist in ('queries_hist', 'total_ms_hist'):
+        for bucket, n in entry[hist].items():
+            into[hist][bucket] = into[hist].get(bucket, 0) + n
+
+
+class StatsRegistry:
+    """
+    Buffers per-view numbers in the process and periodically merges them into
+    the cache so every worker's traffic shows up in one report. The merge is
+    a read-modify-write, so two workers flushing at the same instant can
+    lose one batch; fine for monitoring.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._buffered = 0
+
+    def record(self, view_name, stats, over_budget=False):
+        with self._lock:
+            entry = self._pending.setdefault(view_name, _empty_entry())
+            values = stats.as_dict()
+            entry['requests'] += 1
+            entry['over_budget'] += int(over_budget)
+            for key in ('queries', 'sql_ms', 'render_ms', 'total_ms', 'bytes'):
+                entry[key] += values[key]
+            entry['max_queries'] = max(entry['max_queries'], stats.queries)
+            entry['max_total_ms'] = max(entry['max_total_ms'], values['total_ms'])
+            for hist, value, bounds in (('queries_hist', stats.queries, QUERY_BUCKETS),
+                                        ('total_ms_hist', stats.total_ms, MS_BUCKETS)):
+                bucket = _bucket(value, bounds)
+                entry[hist][bucket] = entry[hist].get(bucket, 0) + 1
+            self._buffered += 1
+            if self._buffered < FLUSH_EVERY:
+                return
+            pending, self._pending, self._buffered = self._pending, {}, 0
+        self._write(pending)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending, self._buffered = self._pending, {}, 0
+        if pending:
+            self._write(pending)
+
+    def _write(self, pending):
+        merged = cache.get(STATS_CACHE_KEY) or {}
+        for view_name, entry in pending.items():
+            _merge(merged.setdefault(view_name, _empty_entry()), entry)
+        cache.set(STATS_CACHE_KEY, merged, None)
+
+    def snapshot(self):
+        self.flush()
+        return cache.get(STATS_CACHE_KEY) or {}
+
+    def reset(self):
+        with self._lock:
+            self._pending, self._buffered = {}, 0
+        cache.delete(STATS_CACHE_KEY)
+
+
+registry = StatsRegistry()
+
+
+# --- Middleware ---
+class QueryStatsMiddleware:
+    sync_capable = True
+    async_capable = True  # so async views are not forced back onto the sync path
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(stats):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, stats, start)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        # the async ORM runs queries on the request's thread-sensitive worker,
+        # so the wrapper goes on that thread's connection
+        await sync_to_async(self._hook)(stats)
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            await sync_to_async(self._unhook)(stats)
+            raise
+        finally:
+            _current.reset(token)
+        # one hop back to unhook and record; the registry may flush to a db/redis cache
+        return await sync_to_async(self._unhook_and_finish)(request, response, stats, start)
+
+    @staticmethod
+    def _hook(stats):
+        connection.execute_wrappers.append(stats)
+
+    @staticmethod
+    def _unhook(stats):
+        connection.execute_wrappers.remove(stats)
+
+    def _unhook_and_finish(self, request, response, stats, start):
+        self._unhook(stats)
+        return self._finish(request, response, stats, start)
+
+    def _finish(self, request, response, stats, start):
+        stats.total_ms = (time.perf_counter() - start) * 1000
+        if not response.streaming:
+            stats.bytes = len(response.content)
+        request.query_stats = stats
+
+        match = getattr(request, 'resolver_match', None)
+        if match is None or not match.view_name:
+            return response
+        violations = budget_violations(match.view_name, stats)
+        if violations:
+            logger.warning("%s over budget: %s", match.view_name, ", ".join(violations))
+        registry.record(match.view_name, stats, over_budget=bool(violations))
+        if settings.DEBUG:
+            response['X-Query-Count'] = str(stats.queries)
+            response['X-SQL-Time-Ms'] = f"{stats.sql_ms:.1f}"
+        return response
+
+
+# --- Test helper ---
+class QueryBudgetMixin:
+    """TestCase mixin: assertWithinBudget(response) fails if the view overran."""
+
+    def assertWithinBudget(self, response, view_name=None):
+        request = response.wsgi_request
+        stats = getattr(request, 'query_stats', None)
+        if stats is None:
+            self.fail("QueryStatsMiddleware is not installed")
+        view_name = view_name or request.resolver_match.view_name
+        if not get_budget(view_name):
+            self.fail(f"No QUERY_BUDGETS entry for {view_name}")
+        violations = budget_violations(view_name, stats)
+        if violations:
+            self.fail(f"{view_name} over budget: {', '.join(violations)}")
@@ -0,0 +1,34 @@
+"""
+Approve all pending room requests in one batch.
+
+    python manage.py approve_room_requests --by warden
+    python manage.py approve_room_requests --dry-run
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from malnad_hostel.allocation import approve_pending_requests
+
+
+class Command(BaseCommand):
+    help = "Approve every pending RoomRequest, honouring preferred rooms where possible."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--by', help="Username recorded as processed_by.")
+        parser.add_argument('--dry-run', action='store_true', help="Only show what would be approved.")
+        parser.add_argument('--list-unplaced', action='store_true', help="Print requests that got no room.")
+
+    def handle(self, *args, **opts):
+        processed_by = None
+        if opts['by']:
+            try:
+                processed_by = User.objects.get(username=opts['by'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {opts['by']!r}")
+
+        result = approve_pending_requests(processed_by=processed_by, dry_run=opts['dry_run'])
+        prefix = "[dry run] " if opts['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(f"{prefix}{result}"))
+        if opts['list_unplaced']:
+            for rr in result.unplaced:
+                self.stdout.write(f"  pending: request #{rr.pk} ({rr.student.roll_no})")
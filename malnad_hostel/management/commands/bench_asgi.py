@@ -0,0 +1,167 @@
+"""
+Compare throughput of the async read views served the ASGI way and the WSGI way.
+
+    python manage.py bench_asgi --students 500 --requests 400 --concurrency 16 --output asgi.json
+
+asgi  one event loop with --concurrency requests in flight, each an asyncio
+      task going through AsyncClient (Django's ASGI request path). Every
+      request runs in its own ThreadSensitiveContext and closes its
+      connections at the end, as ASGIHandler does under uvicorn/daphne.
+wsgi  --concurrency threads with a django.test.Client each, the way a
+      threaded WSGI server runs them; async views are driven with
+      async_to_sync on the request thread.
+
+No server process is started, so the numbers leave out sockets and server
+overhead and compare the Django side only. The database is a throw-away
+copy seeded like bench_load's. SQLite queries are short and CPU-bound
+under the GIL, so there the ASGI path mainly trades a little throughput
+(the extra thread hops per query) for flatter tail latency; the gap in
+favour of async grows when queries wait on a network database.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connection
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from malnad_hostel import seeding
+from malnad_hostel.models import Room
+
+from .bench_load import Command as BenchLoadCommand, percentile
+
+ENDPOINTS = {
+    'student_dashboard': lambda rooms, i: reverse('malnad_hostel:student_dashboard'),
+    'mess_week': lambda rooms, i: reverse('malnad_hostel:mess_week'),
+    'fees': lambda rooms, i: reverse('malnad_hostel:fees'),
+    'room_detail': lambda rooms, i: reverse('malnad_hostel:room_detail', args=[rooms[i % len(rooms)]]),
+}
+MODES = ('wsgi', 'asgi')
+
+
+def summarize(name, samples, wall):
+    latencies = sorted(s[0] for s in samples)
+    queries = [s[1] for s in samples if s[1] is not None]
+    return {
+        'scenario': name,
+        'requests': len(samples),
+        'errors': sum(1 for s in samples if not s[2]),
+        'rps': round(len(samples) / wall, 1) if wall else None,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'mean_ms': round(sum(latencies) / len(latencies), 2),
+        'avg_queries': round(sum(queries) / len(queries), 2) if queries else None,
+        'max_queries': max(queries) if queries else None,
+    }
+
+
+def _sample(response, request, start):
+    stats = getattr(request, 'query_stats', None)
+    return (time.perf_counter() - start) * 1000, stats.queries if stats else None, response.status_code < 400
+
+
+class Command(BenchLoadCommand):
+    help = "Benchmark the async read views through the ASGI and the WSGI request paths."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=100)
+        parser.add_argument('--students', type=int, default=300)
+        parser.add_argument('--fees', type=int, default=3, help="Fees per student.")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per endpoint and mode.")
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--endpoint', action='append', choices=list(ENDPOINTS),
+                            help="Only run these endpoints (repeatable).")
+        parser.add_argument('--mode', action='append', choices=MODES, help="Only run these modes (repeatable).")
+        parser.add_argument('--output', help="Write JSON results to this file.")
+
+    def handle(self, *args, **opts):
+        old_name, tmp_path = self.setup_database()
+        try:
+            started = time.perf_counter()
+            counts = seeding.seed(rooms=opts['rooms'], students=opts['students'],
+                                  fees_per_student=opts['fees'], complaints_per_student=0, prefix='bench')
+            self.stdout.write(f"seeded {counts} in {time.perf_counter() - started:.1f}s")
+            users = list(User.objects.filter(username__startswith='bench').order_by('pk')[:opts['concurrency']])
+            rooms = list(Room.objects.values_list('pk', flat=True))
+            results = []
+            # both test clients send Host: testserver
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                for name in opts['endpoint'] or list(ENDPOINTS):
+                    for mode in opts['mode'] or MODES:
+                        runner = self.run_asgi if mode == 'asgi' else self.run_wsgi
+                        results.append(runner(f"{name}/{mode}", ENDPOINTS[name], users, rooms, opts['requests']))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.print_table(results)
+        if opts['output']:
+            report = {
+                'generated_at': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'params': {k: opts[k] for k in ('rooms', 'students', 'fees', 'requests', 'concurrency')},
+                'seeded': counts,
+                'scenarios': results,
+            }
+            with open(opts['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {opts['output']}"))
+
+    def run_wsgi(self, name, url_for, users, rooms, total):
+        local = threading.local()
+        counter = iter(range(total))
+        lock = threading.Lock()
+        workers = iter(users)
+
+        def one(_):
+            if not hasattr(local, 'client'):
+                with lock:
+                    local.client = Client()
+                    local.client.force_login(next(workers))
+            with lock:
+                i = next(counter)
+            start = time.perf_counter()
+            response = local.client.get(url_for(rooms, i))
+            return _sample(response, response.wsgi_request, start)
+
+        wall = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(users), thread_name_prefix='bench') as pool:
+            samples = list(pool.map(one, range(total)))
+            list(pool.map(lambda _: connection.close(), range(len(users))))
+        return summarize(name, samples, time.perf_counter() - wall)
+
+    def run_asgi(self, name, url_for, users, rooms, total):
+        clients = []
+        for user in users:
+            client = AsyncClient()
+            client.force_login(user)
+            clients.append(client)
+        counter = iter(range(total))  # shared by the tasks; the loop is single-threaded
+
+        async def one(client, url):
+            async with ThreadSensitiveContext():
+                start = time.perf_counter()
+                response = await client.get(url)
+                sample = _sample(response, response.asgi_request, start)
+                await sync_to_async(close_old_connections)()  # what request_finished does under ASGIHandler
+            return sample
+
+        async def worker(client):
+            return [await one(client, url_for(rooms, i)) for i in counter]
+
+        async def run():
+            return await asyncio.gather(*(worker(c) for c in clients))
+
+        wall = time.perf_counter()
+        samples = [s for batch in asyncio.run(run()) for s in batch]
+        return summarize(name, samples, time.perf_counter() - wall)
@@ -0,0 +1,72 @@
+"""
+Benchmark the streaming CSV export against growing table sizes.
+
+    python manage.py bench_exports --rows 1000 10000 100000 [--gzip]
+
+Seeds complaints inside a transaction that is rolled back at the end, then
+consumes the complaints export at each size and reports time, output size,
+the Python heap peak (tracemalloc) and RSS growth. With streaming, the
+memory columns should stay roughly flat while time and bytes grow linearly.
+"""
+import os
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from malnad_hostel.exports import EXPORTS, gzip_chunks, iter_csv
+from malnad_hostel.models import Complaint, Student
+
+
+def current_rss_kb():
+    """Resident set size of this process in KiB (Linux only, else None)."""
+    try:
+        with open('/proc/self/statm') as fh:
+            pages = int(fh.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+class Command(BaseCommand):
+    help = "Measure memory and time of the streaming complaints export at several row counts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000])
+        parser.add_argument('--gzip', action='store_true', help="Benchmark the gzip-compressed stream.")
+
+    def handle(self, *args, **opts):
+        self.stdout.write(f"{'rows':>8} {'seconds':>8} {'bytes':>12} {'heap peak KiB':>14} {'RSS delta KiB':>14}")
+        with transaction.atomic():
+            user = User.objects.create(username='bench-export', password='!')
+            student = Student.objects.create(user=user, roll_no='BENCH-EXPORT')
+            seeded = 0
+            for target in sorted(opts['rows']):
+                batch = [
+                    Complaint(student=student, title=f"Complaint {i}", description='x' * 80)
+                    for i in range(seeded, target)
+                ]
+                Complaint.objects.bulk_create(batch, batch_size=2000)
+                seeded = target
+                del batch
+                self.report(target, opts['gzip'])
+            transaction.set_rollback(True)
+
+    def report(self, rows, use_gzip):
+        chunks = iter_csv(EXPORTS['complaints'])
+        if use_gzip:
+            chunks = gzip_chunks(chunks)
+
+        rss_before = current_rss_kb()
+        tracemalloc.start()
+        started = time.perf_counter()
+        total = sum(len(chunk) for chunk in chunks)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rss_after = current_rss_kb()
+
+        rss_delta = '-' if rss_before is None else rss_after - rss_before
+        self.stdout.write(f"{rows:>8} {elapsed:>8.3f} {total:>12} {peak // 1024:>14} {rss_delta:>14}")
@@ -0,0 +1,77 @@
+"""
+Measure password verifications (i.e. logins) per second per core.
+
+    python manage.py bench_hashing [--iterations 20] [--threads 4] [--output hashing.json]
+
+Each algorithm of malnad_hostel.hashers (argon2 only if argon2-cffi is
+installed) is run with the parameters in settings.PASSWORD_HASHING: first
+on one thread, which is the per-core rate, then on --threads threads at
+once, which shows how far the hashing pool scales on this machine. For the
+full request path, including the database, see `bench_load --scenario login`.
+"""
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from malnad_hostel.hashers import HASHERS
+
+PASSWORD = 'orientation-week-2025'
+
+
+def _available():
+    for name, path in HASHERS.items():
+        hasher = import_string(path)()
+        if name == 'argon2':
+            try:
+                hasher._load_library()
+            except ValueError:
+                continue
+        yield name, hasher
+
+
+class Command(BaseCommand):
+    help = "Benchmark password hashers: logins/sec on one core and across threads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help="Verifications per thread.")
+        parser.add_argument('--threads', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--output', help="Write JSON results to this file.")
+
+    def handle(self, *args, **opts):
+        n, threads = opts['iterations'], opts['threads']
+        results = []
+        for name, hasher in _available():
+            encoded = hasher.encode(PASSWORD, hasher.salt())
+            single = self.rate(hasher, encoded, n, 1)
+            parallel = self.rate(hasher, encoded, n, threads)
+            results.append({
+                'algorithm': name,
+                'summary': {str(k): str(v) for k, v in hasher.safe_summary(encoded).items()},
+                'per_core_per_sec': round(single, 1),
+                'ms_per_login': round(1000 / single, 2),
+                'threads': threads,
+                'parallel_per_sec': round(parallel, 1),
+            })
+
+        self.stdout.write(f"{'algorithm':<10} {'ms/login':>9} {'logins/s/core':>14} {'threads':>8} {'logins/s':>9}")
+        for r in results:
+            self.stdout.write(f"{r['algorithm']:<10} {r['ms_per_login']:>9} {r['per_core_per_sec']:>14} "
+                              f"{r['threads']:>8} {r['parallel_per_sec']:>9}")
+        if opts['output']:
+            with open(opts['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {opts['output']}"))
+
+    def rate(self, hasher, encoded, iterations, threads):
+        def work(_):
+            for _ in range(iterations):
+                hasher.verify(PASSWORD, encoded)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(work, range(threads)))
+        return iterations * threads / (time.perf_counter() - start)
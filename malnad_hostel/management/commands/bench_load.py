@@ -0,0 +1,195 @@
+"""
+Load-test the student-facing flows with a concurrent in-process client.
+
+    python manage.py bench_load --students 2000 --requests 400 --concurrency 8 --output bench.json
+
+Builds a throw-away database (a temporary SQLite file next to the real one,
+or the usual test database on other backends), seeds it with
+malnad_hostel.seeding, then drives each scenario with one django.test.Client
+per thread and reports p50/p95/p99 latency, requests/sec and SQL queries per
+request. Results are written as JSON so runs of different builds can be
+diffed. The real database and caches are never touched.
+"""
+import json
+import os
+import platform
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from malnad_hostel import seeding
+from malnad_hostel.instrumentation import registry
+
+
+def bench_caches():
+    """A separate, empty local-memory cache for every configured alias."""
+    return {alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'bench-{alias}'}
+            for alias in settings.CACHES}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Scenario:
+    def __init__(self, name, method, url_name, data=None, login=True):
+        self.name = name
+        self.method = method
+        self.url_name = url_name
+        self.data = data
+        self.login = login
+
+    def request(self, client, username, i):
+        url = reverse(self.url_name)
+        if self.method == 'get':
+            return client.get(url)
+        data = self.data(username, i) if callable(self.data) else self.data
+        return client.post(url, data)
+
+
+SCENARIOS = [
+    Scenario('login', 'post', 'login', login=False,
+             data=lambda username, i: {'username': username, 'password': seeding.DEFAULT_PASSWORD}),
+    Scenario('student_dashboard', 'get', 'malnad_hostel:student_dashboard'),
+    Scenario('mess_week', 'get', 'malnad_hostel:mess_week'),
+    Scenario('submit_fee_receipt', 'post', 'malnad_hostel:submit_fee_receipt',
+             data=lambda username, i: {'amount': '5000', 'receipt_text': f"bench {username} {i}"}),
+    Scenario('create_complaint', 'post', 'malnad_hostel:create_complaint',
+             data=lambda username, i: {'title': f"Bench {i}", 'category': 'other', 'description': 'load test'}),
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmark login, dashboards, mess menu, fee receipts and complaints under concurrency."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=200)
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--fees', type=int, default=3, help="Fees per student.")
+        parser.add_argument('--complaints', type=int, default=1, help="Complaints per student.")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per scenario.")
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--scenario', action='append', choices=[s.name for s in SCENARIOS],
+                            help="Only run these scenarios (repeatable).")
+        parser.add_argument('--output', help="Write JSON results to this file.")
+
+    def handle(self, *args, **opts):
+        old_name, tmp_path = self.setup_database()
+        try:
+            started = time.perf_counter()
+            counts = seeding.seed(rooms=opts['rooms'], students=opts['students'],
+                                  fees_per_student=opts['fees'], complaints_per_student=opts['complaints'],
+                                  prefix='bench')
+            self.stdout.write(f"seeded {counts} in {time.perf_counter() - started:.1f}s")
+            usernames = [f"bench{i:06d}" for i in range(opts['students'])]
+            wanted = opts['scenario'] or [s.name for s in SCENARIOS]
+            results = [
+                self.run_scenario(s, usernames, opts['requests'], opts['concurrency'])
+                for s in SCENARIOS if s.name in wanted
+            ]
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'params': {k: opts[k] for k in ('rooms', 'students', 'fees', 'complaints', 'requests', 'concurrency')},
+            'seeded': counts,
+            'scenarios': results,
+        }
+        self.print_table(results)
+        if opts['output']:
+            with open(opts['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {opts['output']}"))
+
+    def setup_database(self):
+        # SQLite test databases default to shared in-memory, which serialises
+        # threads on table locks; a temp file behaves like the real server.
+        tmp_path = None
+        if connection.vendor == 'sqlite':
+            fd, tmp_path = tempfile.mkstemp(prefix='bench_load_', suffix='.sqlite3')
+            os.close(fd)
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = tmp_path
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        # the configured caches (db, redis, the sessions alias) belong to the
+        # real deployment; run against fresh per-process ones under the same
+        # aliases instead of clearing them. Left in place until the command exits.
+        override_settings(CACHES=bench_caches()).enable()
+        registry.reset()
+        return old_name, tmp_path
+
+    def run_scenario(self, scenario, usernames, total, concurrency):
+        local = threading.local()
+        counter = iter(range(total))
+        lock = threading.Lock()
+
+        def client_for(worker_username):
+            if not hasattr(local, 'client'):
+                local.client = Client(HTTP_HOST='localhost')
+                local.username = worker_username
+                if scenario.login:
+                    local.client.post(reverse('login'), {'username': worker_username,
+                                                         'password': seeding.DEFAULT_PASSWORD})
+            return local.client
+
+        def one(_):
+            with lock:
+                i = next(counter)
+            username = usernames[i % len(usernames)]
+            client = client_for(username)
+            start = time.perf_counter()
+            response = scenario.request(client, local.username, i)
+            elapsed = (time.perf_counter() - start) * 1000
+            stats = getattr(response.wsgi_request, 'query_stats', None)
+            ok = response.status_code < 400
+            return elapsed, stats.queries if stats else None, ok
+
+        def worker_done(_):
+            connection.close()
+
+        wall = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='bench') as pool:
+            samples = list(pool.map(one, range(total)))
+            list(pool.map(worker_done, range(concurrency)))
+        wall = time.perf_counter() - wall
+
+        latencies = sorted(s[0] for s in samples)
+        queries = [s[1] for s in samples if s[1] is not None]
+        return {
+            'scenario': scenario.name,
+            'requests': total,
+            'errors': sum(1 for s in samples if not s[2]),
+            'rps': round(total / wall, 1) if wall else None,
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'mean_ms': round(sum(latencies) / len(latencies), 2),
+            'avg_queries': round(sum(queries) / len(queries), 2) if queries else None,
+            'max_queries': max(queries) if queries else None,
+        }
+
+    def print_table(self, results):
+        self.stdout.write(f"{'scenario':<20} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+                          f"{'avg q':>6} {'max q':>6} {'errors':>6}")
+        for r in results:
+            self.stdout.write(f"{r['scenario']:<20} {r['rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} "
+                              f"{r['p99_ms']:>8} {r['avg_queries']!s:>6} {r['max_queries']!s:>6} {r['errors']:>6}")
@@ -0,0 +1,39 @@
+"""
+Print hit/miss counts and hit ratio for every configured cache.
+
+    python manage.py cache_stats [--json] [--reset]
+
+Counts come from malnad_hostel.cache_backends; caches configured with another
+backend are listed without numbers. With locmem only this process is seen,
+so the numbers are only meaningful for shared backends (file, db, redis).
+"""
+import json
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Show hit ratios of the configured caches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help="Dump the numbers as JSON.")
+        parser.add_argument('--reset', action='store_true', help="Clear the counters afterwards.")
+
+    def handle(self, *args, **opts):
+        report = {}
+        for alias in caches:
+            cache = caches[alias]
+            stats = cache.stats() if hasattr(cache, 'stats') else {}
+            report[alias] = {'backend': type(cache).__name__, 'version': cache.version, **stats}
+            if opts['reset'] and hasattr(cache, 'reset_stats'):
+                cache.reset_stats()
+
+        if opts['json']:
+            self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
+            return
+        self.stdout.write(f"{'cache':<12} {'backend':<16} {'ver':>4} {'hits':>10} {'misses':>10} {'ratio':>7}")
+        for alias, r in report.items():
+            ratio = f"{r['ratio']:.1%}" if r.get('ratio') is not None else '-'
+            self.stdout.write(f"{alias:<12} {r['backend']:<16} {r['version']:>4} {r.get('hits', '-'):>10} "
+                              f"{r.get('misses', '-'):>10} {ratio:>7}")
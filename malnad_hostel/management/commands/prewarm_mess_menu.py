@@ -0,0 +1,33 @@
+"""
+Build the cached weekly mess menu ahead of the first request of the day.
+
+    python manage.py prewarm_mess_menu [--date YYYY-MM-DD]
+
+Meant to run from cron just after midnight (or just before, with --date set
+to tomorrow). MessMenu edits during the day invalidate the week on their own,
+see malnad_hostel/mess.py.
+"""
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from malnad_hostel import mess
+
+
+class Command(BaseCommand):
+    help = "Rebuild and cache the 7-day mess menu starting today (or --date)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="First day of the week to build (default: today).")
+
+    def handle(self, *args, **opts):
+        start = None
+        if opts['date']:
+            try:
+                start = datetime.date.fromisoformat(opts['date'])
+            except ValueError:
+                raise CommandError(f"Invalid --date {opts['date']!r}, expected YYYY-MM-DD")
+        week = mess.get_week(start, refresh=True)
+        self.stdout.write(self.style.SUCCESS(
+            f"Cached week from {week['start']}: {len(week['menus'])} day(s) with a menu, etag {week['etag'][:12]}"
+        ))
@@ -0,0 +1,41 @@
+"""
+Print the per-view query/latency histograms collected by QueryStatsMiddleware.
+
+    python manage.py query_stats [--json] [--reset]
+"""
+import json
+
+from django.core.management.base import BaseCommand
+
+from malnad_hostel.instrumentation import get_budget, registry
+
+
+class Command(BaseCommand):
+    help = "Show aggregated per-view SQL query counts, timings and response sizes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help="Dump the raw aggregate as JSON.")
+        parser.add_argument('--reset', action='store_true', help="Clear the collected numbers afterwards.")
+
+    def handle(self, *args, **opts):
+        stats = registry.snapshot()
+        if opts['json']:
+            self.stdout.write(json.dumps(stats, indent=2, sort_keys=True))
+        elif not stats:
+            self.stdout.write("No requests recorded yet.")
+        else:
+            self.stdout.write(
+                f"{'view':<45} {'reqs':>6} {'avg q':>6} {'max q':>6} {'budget':>6} "
+                f"{'avg sql ms':>10} {'avg tpl ms':>10} {'avg ms':>8} {'avg KiB':>8} {'over':>5}"
+            )
+            for name, e in sorted(stats.items()):
+                n = e['requests'] or 1
+                budget = get_budget(name).get('queries', '-')
+                self.stdout.write(
+                    f"{name:<45} {e['requests']:>6} {e['queries'] / n:>6.1f} {e['max_queries']:>6} {budget:>6} "
+                    f"{e['sql_ms'] / n:>10.2f} {e['render_ms'] / n:>10.2f} {e['total_ms'] / n:>8.2f} "
+                    f"{e['bytes'] / n / 1024:>8.1f} {e['over_budget']:>5}"
+                )
+                self.stdout.write(f"{'':<45} queries {e['queries_hist']}  ms {e['total_ms_hist']}")
+        if opts['reset']:
+            registry.reset()
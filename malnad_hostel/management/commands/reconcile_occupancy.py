@@ -0,0 +1,35 @@
+"""
+Recompute Room.occupied from the students actually assigned to each room.
+
+    python manage.py reconcile_occupancy [--dry-run]
+
+Uses one grouped COUNT over students, fixes drifted rooms with bulk_update
+and prints every change. Rooms whose real headcount exceeds capacity are
+flagged so a warden can move someone out.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from malnad_hostel.dashboard import invalidate_summary
+from malnad_hostel.export_jobs import bump_table_version
+from malnad_hostel.models import Room
+
+
+class Command(BaseCommand):
+    help = "Fix drift between Room.occupied and the students assigned to each room."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without fixing it.")
+
+    def handle(self, *args, **opts):
+        with transaction.atomic():
+            fixes = Room.objects.reconcile(dry_run=opts['dry_run'])
+            if fixes and not opts['dry_run']:
+                transaction.on_commit(invalidate_summary)
+                transaction.on_commit(lambda: bump_table_version(Room))
+
+        for room, old, new in fixes:
+            flag = '  OVER CAPACITY' if new > room.capacity else ''
+            self.stdout.write(f"Room {room.number}: {old} -> {new}{flag}")
+        verb = "would fix" if opts['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"{len(fixes)} room(s) {verb}."))
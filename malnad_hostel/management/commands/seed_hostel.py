@@ -0,0 +1,52 @@
+"""
+Fill the database with deterministic synthetic hostel data.
+
+    python manage.py seed_hostel --students 10000 --rooms 3000 --fees 3 --complaints 2
+
+All users share the password printed at the end (hashed once). Use a new
+--prefix for each additional batch on the same database.
+"""
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from malnad_hostel import seeding
+
+
+class Command(BaseCommand):
+    help = "Bulk-insert synthetic rooms, students, fees, complaints, comments, room requests and menus."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=500)
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--fees', type=int, default=2, help="Fees per student.")
+        parser.add_argument('--complaints', type=int, default=1, help="Complaints per student.")
+        parser.add_argument('--requests-ratio', type=float, default=0.2,
+                            help="Share of housed students who also file a room request.")
+        parser.add_argument('--menu-days', type=int, default=14, help="Menus for this many days either side of today.")
+        parser.add_argument('--prefix', default='seed', help="Namespace for usernames, roll numbers and rooms.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed.")
+        parser.add_argument('--batch-size', type=int, default=seeding.BATCH_SIZE)
+
+    def handle(self, *args, **opts):
+        prefix = opts['prefix']
+        if User.objects.filter(username=f"{prefix}-warden").exists():
+            raise CommandError(f"Data with prefix {prefix!r} already exists; pick another --prefix.")
+
+        started = time.perf_counter()
+        counts = seeding.seed(
+            rooms=opts['rooms'], students=opts['students'], fees_per_student=opts['fees'],
+            complaints_per_student=opts['complaints'], requests_ratio=opts['requests_ratio'],
+            menu_days=opts['menu_days'], prefix=prefix, random_seed=opts['seed'],
+            batch_size=opts['batch_size'],
+        )
+        elapsed = time.perf_counter() - started
+
+        total = sum(counts.values())
+        for model, n in counts.items():
+            self.stdout.write(f"{model:>14}: {n}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s). "
+            f"Log in as {prefix}000000 or {prefix}-warden with password {seeding.DEFAULT_PASSWORD!r}."
+        ))
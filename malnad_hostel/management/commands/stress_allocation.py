@@ -0,0 +1,111 @@
+"""
+Hammer the allocation service from many threads and check nothing overbooks.
+
+    python manage.py stress_allocation --rooms 20 --capacity 3 --students 400 --workers 32
+
+Runs against a throw-away database set up like bench_load's (a temporary
+SQLite file, or the usual test database on other backends), never the
+configured one. Creates STRESS-* rooms and students there, lets every
+student race for a random room, then verifies that no room is over
+capacity and that each room's counter equals the number of students
+actually in it.
+"""
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import CommandError
+from django.db import OperationalError, connection
+from django.db.models import Count
+
+from malnad_hostel import allocation
+from malnad_hostel.models import Room, Student
+
+from .bench_load import Command as BenchLoadCommand
+
+PREFIX = 'STRESS-'
+MAX_TRIES = 50
+
+
+def run_stress(rooms=20, capacity=3, students=400, workers=32, seed=0):
+    """Run one stress round and return a report dict."""
+    rng = random.Random(seed)
+    room_objs = Room.objects.bulk_create(
+        Room(number=f"{PREFIX}{i}", capacity=capacity) for i in range(rooms)
+    )
+    users = User.objects.bulk_create(
+        User(username=f"{PREFIX}{i}".lower(), password='!') for i in range(students)
+    )
+    student_objs = Student.objects.bulk_create(
+        Student(user=u, roll_no=u.username.upper()) for u in users
+    )
+    targets = [rng.choice(room_objs) for _ in student_objs]
+
+    def attempt(job):
+        # SQLite answers lock contention with "database/table is locked";
+        # back off and retry like a client would, so every attempt resolves.
+        student, room = job
+        try:
+            for tries in range(MAX_TRIES):
+                try:
+                    allocation.allocate(student, room)
+                    return 'allocated'
+                except allocation.RoomFull:
+                    return 'full'
+                except OperationalError:
+                    time.sleep(0.002 * (tries + 1))
+            return 'db_error'
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        outcomes = list(pool.map(attempt, zip(student_objs, targets)))
+
+    actual = dict(
+        Student.objects.filter(room__number__startswith=PREFIX)
+        .values_list('room_id').annotate(n=Count('pk'))
+    )
+    overbooked, drifted = [], []
+    for room in Room.objects.filter(number__startswith=PREFIX):
+        if room.occupied > room.capacity:
+            overbooked.append(room.number)
+        if room.occupied != actual.get(room.pk, 0):
+            drifted.append(room.number)
+
+    return {
+        'attempts': len(outcomes),
+        'allocated': outcomes.count('allocated'),
+        'full': outcomes.count('full'),
+        'db_errors': outcomes.count('db_error'),
+        'beds': rooms * capacity,
+        'overbooked_rooms': overbooked,
+        'drifted_rooms': drifted,
+    }
+
+
+class Command(BenchLoadCommand):
+    help = "Run parallel room allocations on a throw-away database and verify there is no overbooking."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=20)
+        parser.add_argument('--capacity', type=int, default=3)
+        parser.add_argument('--students', type=int, default=400)
+        parser.add_argument('--workers', type=int, default=32)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **opts):
+        old_name, tmp_path = self.setup_database()
+        try:
+            report = run_stress(opts['rooms'], opts['capacity'], opts['students'], opts['workers'], opts['seed'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        for key, value in report.items():
+            self.stdout.write(f"{key:>17}: {value}")
+        if report['overbooked_rooms'] or report['drifted_rooms']:
+            raise CommandError("Allocation invariant violated.")
+        self.stdout.write(self.style.SUCCESS("No overbooking."))
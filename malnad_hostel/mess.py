@@ -0,0 +1,99 @@
+# malnad_hostel/mess.py
+"""
+Cached weekly mess menu.
+
+The 7-day week starting today is built once (one query plus a template
+render) and kept in the cache under the date and the current menu version.
+A new day or any MessMenu write (signals.py bumps the version) makes the
+next request rebuild it; `prewarm_mess_menu` can be run at midnight so no
+student pays for the rebuild. Each built week carries an ETag and a
+Last-Modified time for conditional GETs.
+
+A bump only reaches the workers that share the cache. Without
+settings.SHARED_CACHE the version is re-minted every MENU_VERSION_TTL
+seconds instead, so another worker's week (and the student dashboards
+built from it) is at most that stale.
+"""
+import datetime
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import MessMenu
+
+CACHE_ALIAS = 'fragments'
+MENU_VERSION_KEY = 'malnad_hostel:menu_version'
+WEEK_CACHE_TIMEOUT = 2 * 24 * 60 * 60  # keys are per date, this only bounds stale entries
+MENU_VERSION_TTL = 60  # seconds; only when the cache isn't shared
+DAYS = 7
+
+
+def _version_timeout():
+    return None if settings.SHARED_CACHE else MENU_VERSION_TTL
+
+
+def menu_version():
+    return caches[CACHE_ALIAS].get_or_set(MENU_VERSION_KEY, lambda: uuid.uuid4().hex, _version_timeout())
+
+
+async def amenu_version():
+    return await caches[CACHE_ALIAS].aget_or_set(MENU_VERSION_KEY, lambda: uuid.uuid4().hex, _version_timeout())
+
+
+def bump_menu_version():
+    caches[CACHE_ALIAS].delete(MENU_VERSION_KEY)
+
+
+def menu_token(version, day=None):
+    """Identifies the menu data shown on `day`; changes daily and on every edit."""
+    return f"{(day or timezone.localdate()).isoformat()}:{version}"
+
+
+def _week_key(token):
+    return f'malnad_hostel:mess_week:{token}'
+
+
+def _days(start):
+    return [start + datetime.timedelta(days=i) for i in range(DAYS)]
+
+
+def _week(start, menus):
+    ordered = [(d, menus.get(d)) for d in _days(start)]
+    html = render_to_string('malnad_hostel/mess_week_body.html', {'ordered': ordered})
+    return {
+        'start': start,
+        'menus': [m for _, m in ordered if m is not None],
+        'html': html,
+        'etag': hashlib.sha1(html.encode()).hexdigest(),
+        'last_modified': timezone.now().replace(microsecond=0),
+    }
+
+
+def build_week(start):
+    return _week(start, {m.date: m for m in MessMenu.objects.filter(date__in=_days(start))})
+
+
+def get_week(start=None, refresh=False):
+    """Return the cached week starting at `start` (default today), building it if needed."""
+    start = start or timezone.localdate()
+    key = _week_key(menu_token(menu_version(), start))
+    week = None if refresh else caches[CACHE_ALIAS].get(key)
+    if week is None:
+        week = build_week(start)
+        caches[CACHE_ALIAS].set(key, week, WEEK_CACHE_TIMEOUT)
+    return week
+
+
+async def aget_week(start=None):
+    """get_week() for async views."""
+    start = start or timezone.localdate()
+    key = _week_key(menu_token(await amenu_version(), start))
+    week = await caches[CACHE_ALIAS].aget(key)
+    if week is None:
+        week = _week(start, {m.date: m async for m in MessMenu.objects.filter(date__in=_days(start))})
+        await caches[CACHE_ALIAS].aset(key, week, WEEK_CACHE_TIMEOUT)
+    return week
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def drop_duplicate_menus(apps, schema_editor):
+    # MessMenu.date becomes unique; keep the newest menu for each day
+    MessMenu = apps.get_model('malnad_hostel', 'MessMenu')
+    seen = set()
+    for menu in MessMenu.objects.order_by('date', '-pk'):
+        if menu.date in seen:
+            menu.delete()
+        else:
+            seen.add(menu.date)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('malnad_hostel', '0003_exportjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_menus, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='messmenu',
+            name='date',
+            field=models.DateField(unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['status', '-created_at'], name='complaint_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fee',
+            index=models.Index(condition=models.Q(('paid', False)), fields=['timestamp'], name='fee_unpaid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(condition=models.Q(('occupied__lt', models.F('capacity'))), fields=['number'], name='room_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='roomrequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['created_at'], name='roomrequest_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:26
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('malnad_hostel', '0004_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(django.db.models.functions.text.Upper('roll_no'), condition=models.Q(('room__isnull', True)), name='student_roll_upper_idx'),
+        ),
+    ]
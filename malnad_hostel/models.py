@@ -1,11 +1,52 @@
 from django.db import models
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Upper
 from django.contrib.auth.models import User
 
+class RoomManager(models.Manager):
+    """Keeps the denormalised Room.occupied counter in line with Student.room."""
+
+    def _student_counts(self):
+        return Student.objects.filter(room__isnull=False).values('room').annotate(n=Count('pk'))
+
+    def recount(self, *room_ids):
+        """Recompute `occupied` for the given rooms in one UPDATE."""
+        ids = [pk for pk in room_ids if pk]
+        if not ids:
+            return 0
+        live = self._student_counts().filter(room=OuterRef('pk')).values('n')
+        return self.filter(pk__in=ids).update(occupied=Coalesce(Subquery(live), 0))
+
+    def reconcile(self, dry_run=False):
+        """
+        Compare every room's counter with one grouped COUNT over students and
+        fix the ones that drifted. Returns [(room, old, new), ...].
+        """
+        actual = {row['room']: row['n'] for row in self._student_counts()}
+        fixes = []
+        for room in self.only('pk', 'number', 'capacity', 'occupied').iterator():
+            count = actual.get(room.pk, 0)
+            if room.occupied != count:
+                fixes.append((room, room.occupied, count))
+                room.occupied = count
+        if fixes and not dry_run:
+            self.bulk_update([room for room, _, _ in fixes], ['occupied'], batch_size=500)
+        return fixes
+
+
 class Room(models.Model):
     number = models.CharField(max_length=10, unique=True)
     capacity = models.PositiveIntegerField(default=1)
     occupied = models.PositiveIntegerField(default=0)
 
+    objects = RoomManager()
+
+    class Meta:
+        indexes = [
+            # "rooms with a free bed" (allocation fallback, dashboard)
+            models.Index(fields=['number'], condition=Q(occupied__lt=F('capacity')), name='room_open_idx'),
+        ]
+
     def __str__(self):
         return f"Room {self.number}"
 
@@ -25,6 +66,19 @@ class Student(models.Model):
     room = models.ForeignKey(Room, null=True, blank=True, on_delete=models.SET_NULL)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='student')
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembered so the occupancy signal can tell when the room changed
+        instance._loaded_room_id = instance.__dict__.get('room_id')
+        return instance
+
+    class Meta:
+        indexes = [
+            # USN prefix search over unassigned students, in any case (student_autocomplete)
+            models.Index(Upper('roll_no'), condition=Q(room__isnull=True), name='student_roll_upper_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.get_full_name() or self.user.username} ({self.roll_no})"
 
@@ -38,6 +92,11 @@ class RoomRequest(models.Model):
     processed_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='processed_requests')
     processed_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], condition=Q(status='pending'), name='roomrequest_pending_idx'),
+        ]
+
     def __str__(self):
         return f"RoomRequest({self.student}, {self.status})"
 
@@ -50,6 +109,11 @@ class Fee(models.Model):
     receipt_text = models.TextField(blank=True)
     verified = models.BooleanField(default=False)  # staff can verify
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['timestamp'], condition=Q(paid=False), name='fee_unpaid_idx'),
+        ]
+
     def __str__(self):
         return f"{self.student} - {self.amount} - {'Paid' if self.paid else 'Pending'}"
 
@@ -70,6 +134,11 @@ class Complaint(models.Model):
     resolved = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-created_at'], name='complaint_status_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} - {self.student}"
 
@@ -80,10 +149,26 @@ class ComplaintComment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
 class MessMenu(models.Model):
-    date = models.DateField()
+    date = models.DateField(unique=True)  # one menu per day
     breakfast = models.TextField(blank=True)
     lunch = models.TextField(blank=True)
     dinner = models.TextField(blank=True)
 
     def __str__(self):
         return f"Menu for {self.date}"
+
+class ExportJob(models.Model):
+    STATUS_CHOICES = [('pending','Pending'), ('running','Running'), ('done','Done'), ('failed','Failed')]
+    name = models.CharField(max_length=30)            # key in exports.EXPORTS
+    params = models.JSONField(default=dict, blank=True)  # from / to / compress
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    cache_key = models.CharField(max_length=64, blank=True)
+    file = models.CharField(max_length=255, blank=True)  # path relative to MEDIA_ROOT
+    cached = models.BooleanField(default=False)  # served from an earlier identical export
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"ExportJob({self.name}, {self.status})"
@@ -0,0 +1,83 @@
+# malnad_hostel/pagination.py
+"""
+Keyset (seek) pagination.
+
+Instead of OFFSET, each page remembers the sort value + pk of its last row and
+the next page asks for rows strictly after it, so deep pages cost the same as
+the first one.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+PAGE_SIZE = 20
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+def encode_cursor(value, pk):
+    raw = json.dumps([str(value), pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, field=None):
+    """
+    Return (value, pk) or None for a missing / tampered cursor. With a model
+    `field` the value is converted by it, and one it rejects counts as tampered.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if field is not None:
+            value = field.to_python(value)
+        return value, int(pk)
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def keyset_page(queryset, ordering, cursor=None, size=PAGE_SIZE):
+    """
+    Return one KeysetPage of `queryset` sorted by `ordering` ('number',
+    '-created_at', ...). Ties are broken on pk so the order is total.
+    """
+    descending = ordering.startswith('-')
+    field = ordering.lstrip('-')
+    op = 'lt' if descending else 'gt'
+    pk_order = '-pk' if descending else 'pk'
+
+    qs = queryset.order_by(ordering, pk_order)
+    position = decode_cursor(cursor, queryset.model._meta.get_field(field))
+    if position:
+        value, pk = position
+        qs = qs.filter(
+            Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'pk__{op}': pk})
+        )
+
+    rows = list(qs[:size + 1])
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return KeysetPage(rows, next_cursor)
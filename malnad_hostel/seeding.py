@@ -0,0 +1,115 @@
+# malnad_hostel/seeding.py
+"""
+Deterministic synthetic data for benchmarks and large-scale testing.
+
+Everything is inserted with bulk_create in batches and every user shares one
+precomputed password hash, so tens of thousands of rows take seconds instead
+of one PBKDF2 run per user.
+"""
+import datetime
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .dashboard import invalidate_summary
+from .mess import bump_menu_version
+from .export_jobs import bump_table_version
+from .models import Complaint, ComplaintComment, Fee, MessMenu, Room, RoomRequest, Student
+
+DEFAULT_PASSWORD = 'hostel-seed-pass'
+BATCH_SIZE = 1000
+
+MEALS = ['Idli, sambar', 'Poha', 'Dosa, chutney', 'Upma', 'Chapati, dal', 'Rice, rasam',
+         'Veg pulao', 'Curd rice', 'Paneer curry', 'Egg curry']
+
+
+def seed(rooms=50, students=500, fees_per_student=2, complaints_per_student=1,
+         requests_ratio=0.2, menu_days=14, prefix='seed', password=DEFAULT_PASSWORD,
+         random_seed=0, batch_size=BATCH_SIZE):
+    """
+    Insert a synthetic hostel and return a dict of row counts per model.
+    Same arguments always produce the same data. `prefix` namespaces room
+    numbers, usernames and roll numbers so repeated runs don't collide.
+    """
+    rng = random.Random(random_seed)
+    password_hash = make_password(password)  # hashed once, shared by every user
+    today = timezone.localdate()
+    counts = {}
+
+    with transaction.atomic():
+        room_objs = Room.objects.bulk_create(
+            [Room(number=f"{prefix}-{i:05d}", capacity=rng.choice((2, 3, 4))) for i in range(rooms)],
+            batch_size=batch_size,
+        )
+        counts['rooms'] = len(room_objs)
+
+        users = User.objects.bulk_create(
+            [User(username=f"{prefix}{i:06d}", first_name=f"Student{i}", last_name=prefix.title(),
+                  email=f"{prefix}{i:06d}@example.com", password=password_hash)
+             for i in range(students)],
+            batch_size=batch_size,
+        )
+        warden = User.objects.create(username=f"{prefix}-warden", is_staff=True, password=password_hash)
+        counts['users'] = len(users) + 1
+
+        # fill rooms in order until beds run out; the rest stay unassigned
+        beds = [room for room in room_objs for _ in range(room.capacity)]
+        student_objs = []
+        for i, user in enumerate(users):
+            room = beds[i] if i < len(beds) else None
+            if room is not None:
+                room.occupied += 1
+            student_objs.append(Student(user=user, roll_no=f"{prefix.upper()}{i:06d}", room=room,
+                                        course=rng.choice(('CSE', 'ISE', 'ECE', 'ME')),
+                                        semester=str(rng.randint(1, 8))))
+        student_objs = Student.objects.bulk_create(student_objs, batch_size=batch_size)
+        Room.objects.bulk_update(room_objs, ['occupied'], batch_size=batch_size)
+        counts['students'] = len(student_objs)
+
+        fees = [Fee(student=s, amount=rng.choice((5000, 7500, 10000)), paid=rng.random() < 0.7,
+                    receipt_text=f"UTR{rng.randint(10**9, 10**10)}")
+                for s in student_objs for _ in range(fees_per_student)]
+        counts['fees'] = len(Fee.objects.bulk_create(fees, batch_size=batch_size))
+
+        complaints = []
+        for s in student_objs:
+            for _ in range(complaints_per_student):
+                status = rng.choice(('pending', 'in_progress', 'resolved'))
+                complaints.append(Complaint(
+                    student=s, title=f"{rng.choice(('Fan', 'Tap', 'Light', 'Door'))} issue",
+                    category=rng.choice(('cleaning', 'electricity', 'water', 'other')),
+                    description="Synthetic complaint", status=status, resolved=status == 'resolved',
+                ))
+        complaints = Complaint.objects.bulk_create(complaints, batch_size=batch_size)
+        counts['complaints'] = len(complaints)
+
+        comments = [ComplaintComment(complaint=c, author=warden, comment="Looking into it")
+                    for c in complaints if c.status != 'pending']
+        counts['comments'] = len(ComplaintComment.objects.bulk_create(comments, batch_size=batch_size))
+
+        unassigned = [s for s in student_objs if s.room_id is None]
+        wanting = unassigned + rng.sample(student_objs, int(len(student_objs) * requests_ratio))
+        requests = [RoomRequest(student=s, preferred_room=rng.choice(room_objs) if room_objs else None,
+                                reason="Synthetic request") for s in wanting]
+        counts['room_requests'] = len(RoomRequest.objects.bulk_create(requests, batch_size=batch_size))
+
+        existing = set(MessMenu.objects.filter(
+            date__range=(today - datetime.timedelta(days=menu_days), today + datetime.timedelta(days=menu_days))
+        ).values_list('date', flat=True))
+        menus = []
+        for offset in range(-menu_days, menu_days):
+            day = today + datetime.timedelta(days=offset)
+            if day not in existing:
+                menus.append(MessMenu(date=day, breakfast=rng.choice(MEALS), lunch=rng.choice(MEALS),
+                                      dinner=rng.choice(MEALS)))
+        counts['menus'] = len(MessMenu.objects.bulk_create(menus, batch_size=batch_size))
+
+        # bulk_create sends no signals, so drop the caches they would have
+        transaction.on_commit(invalidate_summary)
+        transaction.on_commit(bump_menu_version)
+        transaction.on_commit(lambda: bump_table_version(Room, Student, Complaint, Fee, User))
+
+    return counts
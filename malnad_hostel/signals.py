@@ -0,0 +1,84 @@
+# malnad_hostel/signals.py
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import mess, student_cache
+from .dashboard import invalidate_summary
+from .export_jobs import bump_table_version
+from .models import Complaint, Fee, MessMenu, Room, RoomRequest, Student
+
+
+# --- Dashboard summary cache ---
+# Note: queryset.update() does not send these signals; code that bulk-updates
+# these tables must call invalidate_summary() itself.
+@receiver([post_save, post_delete], sender=Room)
+@receiver([post_save, post_delete], sender=Student)
+@receiver([post_save, post_delete], sender=Fee)
+@receiver([post_save, post_delete], sender=Complaint)
+@receiver([post_save, post_delete], sender=RoomRequest)
+def dashboard_tables_changed(sender, **kwargs):
+    invalidate_summary()
+
+
+# --- Table versions (export high-water marks, page ETags) ---
+@receiver([post_save, post_delete], sender=Room)
+@receiver([post_save, post_delete], sender=Student)
+@receiver([post_save, post_delete], sender=Complaint)
+@receiver([post_save, post_delete], sender=Fee)
+def exported_table_changed(sender, **kwargs):
+    bump_table_version(sender)
+
+
+# --- Student dashboard fragments and mess menu ---
+@receiver([post_save, post_delete], sender=Fee)
+@receiver([post_save, post_delete], sender=RoomRequest)
+def student_rows_changed(sender, instance, **kwargs):
+    if instance._meta.get_field('student').is_cached(instance):
+        user_id = instance.student.user_id
+    else:
+        user_id = Student.objects.filter(pk=instance.student_id).values_list('user_id', flat=True).first()
+    student_cache.invalidate_students(user_id)
+
+
+@receiver([post_save, post_delete], sender=Student)
+def student_profile_changed(sender, instance, **kwargs):
+    student_cache.invalidate_students(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # login() saves last_login on every sign-in; that isn't on the dashboard
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    student_cache.invalidate_students(instance.pk)
+    bump_table_version(User)
+
+
+@receiver(post_save, sender=Room)
+def room_changed(sender, instance, created, **kwargs):
+    if not created:
+        student_cache.invalidate_students(*instance.student_set.values_list('user_id', flat=True))
+
+
+@receiver([post_save, post_delete], sender=MessMenu)
+def menu_changed(sender, **kwargs):
+    mess.bump_menu_version()
+
+
+# --- Occupancy counters ---
+# Saves that change Student.room outside the allocation service (admin edits,
+# shell, deletes) recount the affected rooms from the Student table.
+@receiver(post_save, sender=Student)
+def student_room_saved(sender, instance, created, **kwargs):
+    old_room_id = getattr(instance, '_loaded_room_id', None)
+    if old_room_id != instance.room_id:
+        if Room.objects.recount(old_room_id, instance.room_id):
+            bump_table_version(Room)
+    instance._loaded_room_id = instance.room_id
+
+
+@receiver(post_delete, sender=Student)
+def student_deleted(sender, instance, **kwargs):
+    if instance.room_id and Room.objects.recount(instance.room_id):
+        bump_table_version(Room)
@@ -0,0 +1,51 @@
+# malnad_hostel/student_cache.py
+"""
+Per-student cache of the rendered student dashboard body.
+
+The fragment is stored under the user's id together with the mess-menu
+token it was built from, so a repeat visit is one cache round trip
+(get_many of fragment + menu version) and no queries. Signals in signals.py
+drop a student's fragment when their profile, room, fees or room requests
+change; MessMenu writes bump the menu version (see mess.py).
+"""
+from django.core.cache import caches
+
+from .mess import CACHE_ALIAS, MENU_VERSION_KEY, amenu_version, menu_token, menu_version  # same cache as the menu version
+
+FRAGMENT_TIMEOUT = 60 * 60  # seconds; invalidation normally comes first
+
+
+def _fragment_key(user_id):
+    return f'malnad_hostel:student_dashboard:{user_id}'
+
+
+def _current(key, found):
+    entry, version = found.get(key), found.get(MENU_VERSION_KEY)
+    if entry is None or version is None:
+        return None
+    token, html = entry
+    return html if token == menu_token(version) else None
+
+
+def get_dashboard(user_id):
+    """Return the cached fragment for this user, or None."""
+    key = _fragment_key(user_id)
+    return _current(key, caches[CACHE_ALIAS].get_many([key, MENU_VERSION_KEY]))
+
+
+async def aget_dashboard(user_id):
+    key = _fragment_key(user_id)
+    return _current(key, await caches[CACHE_ALIAS].aget_many([key, MENU_VERSION_KEY]))
+
+
+def set_dashboard(user_id, html):
+    caches[CACHE_ALIAS].set(_fragment_key(user_id), (menu_token(menu_version()), html), FRAGMENT_TIMEOUT)
+
+
+async def aset_dashboard(user_id, html):
+    entry = (menu_token(await amenu_version()), html)
+    await caches[CACHE_ALIAS].aset(_fragment_key(user_id), entry, FRAGMENT_TIMEOUT)
+
+
+def invalidate_students(*user_ids):
+    caches[CACHE_ALIAS].delete_many([_fragment_key(uid) for uid in user_ids if uid])
@@ -1,3 +1,741 @@
-from django.test import TestCase
+import datetime
+import gzip
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import allocation, cache_config, dashboard, hashers, instrumentation, mess, seeding, student_cache, views
+from .allocation import plan_batch
+from .admin import estimated_row_count
+from .dashboard import get_summary, open_complaints, pending_fees, run_concurrently
+from .instrumentation import QueryBudgetMixin
+from .management.commands.stress_allocation import run_stress
+from .models import Complaint, ExportJob, Fee, MessMenu, Room, RoomRequest, Student
+from .pagination import encode_cursor, keyset_page
+
+
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
+def make_student(username, room=None):
+    user = User.objects.create_user(username=username, password='pass12345')
+    return Student.objects.create(user=user, roll_no=f"R-{username}", room=room)
+
+
+class DashboardSummaryTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.room = Room.objects.create(number='101', capacity=1)
+        Room.objects.create(number='102', capacity=2)
+        self.student = make_student('alice', room=self.room)
+        Fee.objects.create(student=self.student, amount=100)
+        Fee.objects.create(student=self.student, amount=50, paid=True)
+        Complaint.objects.create(student=self.student, title='Fan', description='broken')
+        RoomRequest.objects.create(student=self.student)
+
+    def test_summary_is_one_query(self):
+        with self.assertNumQueries(1):
+            summary = get_summary()
+        self.assertEqual(summary, {
+            'room_count': 2,
+            'available_rooms': 1,
+            'student_count': 1,
+            'pending_requests': 1,
+            'pending_fees_count': 1,
+            'open_complaints': 1,
+        })
+
+    def test_summary_cached_until_tables_change(self):
+        get_summary()
+        with self.assertNumQueries(0):
+            get_summary()
+        Fee.objects.create(student=self.student, amount=10)
+        self.assertEqual(get_summary()['pending_fees_count'], 2)
+
+    def test_summary_expires_soon_without_shared_cache(self):
+        stale = dashboard.compute_summary()
+        Fee.objects.create(student=self.student, amount=10)  # its invalidation went to "another worker"
+        for shared, timeout in ((True, dashboard.SUMMARY_CACHE_TIMEOUT), (False, dashboard.UNSHARED_SUMMARY_TIMEOUT)):
+            clear_caches()
+            with override_settings(SHARED_CACHE=shared), mock.patch.object(dashboard, 'compute_summary', return_value=stale):
+                get_summary()
+            later = time.time() + timeout - 1
+            with mock.patch('django.core.cache.backends.locmem.time.time', return_value=later), self.assertNumQueries(0):
+                get_summary()
+            with mock.patch('django.core.cache.backends.locmem.time.time', return_value=later + 2):
+                self.assertEqual(get_summary()['pending_fees_count'], 2)
+
+    def test_dashboard_view(self):
+        User.objects.create_user(username='warden', password='pass12345', is_staff=True)
+        self.client.login(username='warden', password='pass12345')
+        response = self.client.get(reverse('malnad_hostel:management_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['summary']['room_count'], 2)
+
+
+class StudentDashboardCacheTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.room = Room.objects.create(number='101', capacity=2)
+        self.student = make_student('alice', room=self.room)
+        self.today = timezone.localdate()
+        MessMenu.objects.create(date=self.today, breakfast='Idli')
+        self.client.login(username='alice', password='pass12345')
+        self.url = reverse('malnad_hostel:student_dashboard')
+
+    def test_repeat_hit_skips_queries(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(2):  # session + user only
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Idli')
+        self.assertContains(response, 'Room 101')
+
+    def test_menu_edit_invalidates(self):
+        self.client.get(self.url)
+        MessMenu.objects.create(date=self.today + datetime.timedelta(days=1), breakfast='Poha')
+        self.assertContains(self.client.get(self.url), 'Poha')
+
+    def test_invalidation_is_per_student(self):
+        bob = make_student('bob')
+        self.client.get(self.url)
+        Fee.objects.create(student=bob, amount=100)
+        self.assertIsNotNone(student_cache.get_dashboard(self.student.user_id))
+        Fee.objects.create(student=self.student, amount=100)
+        self.assertIsNone(student_cache.get_dashboard(self.student.user_id))
+
+    def test_allocation_invalidates(self):
+        self.client.get(self.url)
+        other = Room.objects.create(number='202', capacity=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            allocation.allocate(self.student, other)
+        self.assertContains(self.client.get(self.url), 'Room 202')
+
+
+class MessWeekCacheTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.today = timezone.localdate()
+        MessMenu.objects.create(date=self.today, breakfast='Idli', lunch='Rice', dinner='Chapati')
+        make_student('alice')
+        self.client.login(username='alice', password='pass12345')
+        self.url = reverse('malnad_hostel:mess_week')
+
+    def test_week_built_once(self):
+        with self.assertNumQueries(1):
+            mess.get_week()
+        with self.assertNumQueries(0):
+            self.assertEqual(len(mess.get_week()['menus']), 1)
+
+    def test_conditional_get(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Idli')
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_menu_save_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        MessMenu.objects.create(date=self.today + datetime.timedelta(days=2), breakfast='Dosa')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Dosa')
+
+    def test_version_expires_without_shared_cache(self):
+        week = mess.get_week()
+        later = time.time() + mess.MENU_VERSION_TTL + 1
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=later):
+            with self.assertNumQueries(1):  # another worker's bump may have been missed
+                self.assertEqual(mess.get_week()['menus'], week['menus'])
+
+    def test_prewarm_command(self):
+        out = StringIO()
+        call_command('prewarm_mess_menu', stdout=out)
+        self.assertIn('1 day(s) with a menu', out.getvalue())
+        with self.assertNumQueries(0):
+            mess.get_week()
+
+
+@override_settings(SHARED_CACHE=True)  # one process, so locmem is shared enough
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.room = Room.objects.create(number='101', capacity=2)
+        self.student = make_student('alice', room=self.room)
+        Fee.objects.create(student=self.student, amount=100)
+        self.client.login(username='alice', password='pass12345')
+
+    def revalidate(self, url):
+        etag = self.client.get(url)['ETag']
+        return etag, self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_fees_304_skips_rows(self):
+        url = reverse('malnad_hostel:fees')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(3):  # session, user, aggregate
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        fee = Fee.objects.get(student=self.student)
+        fee.paid = True
+        fee.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_room_detail_304_until_allocation(self):
+        url = reverse('malnad_hostel:room_detail', args=[self.room.pk])
+        etag, response = self.revalidate(url)
+        self.assertEqual(response.status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            allocation.allocate(make_student('bob'), self.room)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_no_304_without_shared_cache(self):
+        url = reverse('malnad_hostel:room_detail', args=[self.room.pk])
+        with override_settings(SHARED_CACHE=False):
+            etag, response = self.revalidate(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_is_per_user(self):
+        url = reverse('malnad_hostel:room_detail', args=[self.room.pk])
+        etag = self.client.get(url)['ETag']
+        make_student('bob')
+        self.client.login(username='bob', password='pass12345')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class AsyncViewTests(TestCase):
+    """The read-heavy views are async; drive them through the ASGI handler."""
+
+    def setUp(self):
+        clear_caches()
+        self.room = Room.objects.create(number='101', capacity=2)
+        self.student = make_student('alice', room=self.room)
+        make_student('bob', room=self.room)
+        Fee.objects.create(student=self.student, amount=100)
+        MessMenu.objects.create(date=timezone.localdate(), breakfast='Idli')
+
+    async def test_pages_render(self):
+        await self.async_client.aforce_login(self.student.user)
+        response = await self.async_client.get(reverse('malnad_hostel:student_dashboard'))
+        self.assertContains(response, 'Room 101')
+        self.assertContains(response, 'Idli')
+        response = await self.async_client.get(reverse('malnad_hostel:room_detail', args=[self.room.pk]))
+        self.assertContains(response, 'bob')
+        self.assertContains(await self.async_client.get(reverse('malnad_hostel:mess_week')), 'Idli')
+        response = await self.async_client.get(reverse('malnad_hostel:room_detail', args=[self.room.pk + 99]))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(SHARED_CACHE=True)
+    async def test_fees_revalidate_and_query_stats(self):
+        await self.async_client.aforce_login(self.student.user)
+        url = reverse('malnad_hostel:fees')
+        response = await self.async_client.get(url)
+        self.assertContains(response, '100')
+        self.assertEqual(response.asgi_request.query_stats.queries, 4)  # session, user, aggregate, fees
+        response = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.asgi_request.query_stats.queries, 3)
+
+    async def test_login_required(self):
+        response = await self.async_client.get(reverse('malnad_hostel:fees'))
+        self.assertEqual(response.status_code, 302)
+
+
+class CacheConfigTests(TestCase):
+    def test_named_aliases_and_versioning(self):
+        config = cache_config.build_caches('db', version=3)
+        self.assertEqual(set(config), {'default', 'sessions', 'fragments', 'exports'})
+        self.assertEqual({c['LOCATION'] for c in config.values()}, {'hostel_cache'})
+        self.assertEqual(config['fragments']['KEY_PREFIX'], 'hostel:fragments')
+        self.assertEqual(config['exports']['VERSION'], 3)
+        with self.assertRaises(ImproperlyConfigured):
+            cache_config.build_caches('memcached')
+
+    def test_fake_redis_round_trip_and_stats(self):
+        with override_settings(CACHES=cache_config.build_caches('fakeredis', location='redis://fake/1')):
+            cache = caches['fragments']
+            cache.clear()
+            cache.set('a', {'x': 1})
+            cache.set('n', 1)
+            self.assertEqual(cache.get('a'), {'x': 1})
+            self.assertEqual(cache.incr('n'), 2)
+            self.assertIsNone(cache.get('missing'))
+            self.assertEqual(cache.get_many(['a', 'missing']), {'a': {'x': 1}})
+            cache.set('gone', 1, timeout=0)
+            self.assertFalse(cache.has_key('gone'))
+            self.assertEqual(cache.stats(), {'hits': 2, 'misses': 2, 'ratio': 0.5})
+            out = StringIO()
+            call_command('cache_stats', '--reset', stdout=out)
+            self.assertIn('FakeRedisCache', out.getvalue())
+            self.assertEqual(cache.stats()['hits'], 0)
+
+    def test_version_bump_orphans_keys(self):
+        caches['default'].set('k', 'old')
+        with override_settings(CACHES=cache_config.build_caches('locmem', version=2)):
+            self.assertIsNone(caches['default'].get('k'))
+
+
+@override_settings(PASSWORD_HASHING={**settings.PASSWORD_HASHING, 'workers': 0})
+class PasswordHashingTests(TestCase):
+    def test_login_rehashes_legacy_password(self):
+        user = User.objects.create(username='old', password=make_password('pass12345', hasher='pbkdf2_sha256'))
+        response = self.client.post(reverse('login'), {'username': 'old', 'password': 'pass12345'})
+        self.assertEqual(response.status_code, 302)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('scrypt$'))
+
+    def test_register_hashes_with_policy(self):
+        response = self.client.post(reverse('malnad_hostel:register'), {
+            'username': 'newbie', 'first_name': 'New', 'last_name': 'Bie', 'email': 'n@example.com',
+            'password1': 'Orientation#2025', 'password2': 'Orientation#2025',
+        })
+        self.assertRedirects(response, reverse('malnad_hostel:student_dashboard'))
+        self.assertTrue(User.objects.get(username='newbie').password.startswith('scrypt$'))
+
+    def test_hasher_order(self):
+        self.assertEqual(hashers.password_hashers('pbkdf2')[0], 'django.contrib.auth.hashers.PBKDF2PasswordHasher')
+        self.assertIn('django.contrib.auth.hashers.PBKDF2PasswordHasher', hashers.password_hashers('scrypt'))
+        with self.assertRaises(ImproperlyConfigured):
+            hashers.password_hashers('md5')
+
+    @override_settings(PASSWORD_HASHING={**settings.PASSWORD_HASHING, 'workers': 2})
+    def test_offload_uses_pool(self):
+        name = async_to_sync(hashers.offload)(lambda: threading.current_thread().name)
+        self.assertTrue(name.startswith('hashing'))
+
+
+class KeysetPaginationTests(TestCase):
+    def test_pages_follow_cursor(self):
+        for i in range(25):
+            Room.objects.create(number=f"{i:03d}")
+        first = keyset_page(Room.objects.all(), 'number', size=20)
+        self.assertEqual(len(first), 20)
+        self.assertTrue(first.has_next)
+        second = keyset_page(Room.objects.all(), 'number', first.next_cursor, size=20)
+        self.assertEqual([r.number for r in second], [f"{i:03d}" for i in range(20, 25)])
+        self.assertFalse(second.has_next)
+
+    def test_bad_cursor_starts_from_top(self):
+        Room.objects.create(number='A1')
+        self.assertEqual(len(keyset_page(Room.objects.all(), 'number', 'not-a-cursor')), 1)
+
+    def test_cursor_value_the_field_rejects_starts_from_top(self):
+        Complaint.objects.create(student=make_student('bob'), title='c0', description='x')
+        cursor = encode_cursor('garbage', 1)  # well-formed, but not a datetime
+        self.assertEqual(len(keyset_page(Complaint.objects.all(), '-created_at', cursor)), 1)
+
+    def test_descending_datetime_cursor(self):
+        student = make_student('bob')
+        for i in range(5):
+            Complaint.objects.create(student=student, title=f"c{i}", description='x')
+        first = keyset_page(Complaint.objects.all(), '-created_at', size=3)
+        second = keyset_page(Complaint.objects.all(), '-created_at', first.next_cursor, size=3)
+        self.assertEqual([c.title for c in first] + [c.title for c in second], ['c4', 'c3', 'c2', 'c1', 'c0'])
+
+
+class AllocateFormTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.room = Room.objects.create(number='201', capacity=2)
+        self.student = make_student('alice')
+        make_student('bob', room=self.room)
+        User.objects.create_user(username='warden', password='pass12345', is_staff=True)
+        self.client.login(username='warden', password='pass12345')
+
+    def test_autocomplete_lists_only_unassigned(self):
+        url = reverse('malnad_hostel:student_autocomplete')
+        self.assertEqual(self.client.get(url, {'q': 'R-'}).json()['results'],
+                         [{'value': 'R-alice', 'label': 'R-alice - alice'}])
+        self.assertEqual(self.client.get(url, {'q': 'bob'}).json()['results'], [])
+        self.assertEqual([r['value'] for r in self.client.get(url, {'q': 'r-AL'}).json()['results']], ['R-alice'])
+        self.assertEqual([r['value'] for r in self.client.get(url, {'q': 'ali'}).json()['results']], ['R-alice'])
+
+    def test_form_page_loads_no_students_and_allocates_by_username(self):
+        url = reverse('malnad_hostel:allocate_to_room', args=[self.room.pk])
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        self.assertFalse([q for q in ctx.captured_queries if 'malnad_hostel_student' in q['sql']])
+        self.client.post(url, {'student': 'alice'})
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.room, self.room)
+        response = self.client.post(url, {'student': 'bob'})
+        self.assertContains(response, 'No unassigned student')
+
+
+class AllocationTests(TestCase):
+    def setUp(self):
+        self.room = Room.objects.create(number='201', capacity=1)
+        self.other = Room.objects.create(number='202', capacity=2)
+
+    def test_allocate_and_move(self):
+        student = make_student('carol')
+        allocation.allocate(student, self.room)
+        allocation.allocate(student, self.other)
+        self.room.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.room.occupied, self.other.occupied), (0, 1))
+
+    def test_full_room_rejected(self):
+        allocation.allocate(make_student('dave'), self.room)
+        with self.assertRaises(allocation.RoomFull):
+            allocation.allocate(make_student('erin'), self.room)
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.occupied, 1)
+
+    def test_release(self):
+        student = make_student('frank', room=None)
+        allocation.allocate(student, self.room)
+        left = allocation.release(student)
+        self.assertEqual(left, self.room)
+        self.assertEqual(left.occupied, 0)
+        self.assertIsNone(allocation.release(student))
+
+
+class AllocationStressTests(TransactionTestCase):
+    def test_parallel_allocations_never_overbook(self):
+        report = run_stress(rooms=10, capacity=3, students=200, workers=16)
+        self.assertEqual(report['allocated'], 30)
+        self.assertEqual(report['overbooked_rooms'], [])
+        self.assertEqual(report['drifted_rooms'], [])
+
+
+class DashboardListsTests(TransactionTestCase):
+    def test_lists_fetched_in_parallel_and_counted(self):
+        clear_caches()
+        Room.objects.create(number='101', capacity=2)
+        Fee.objects.create(student=make_student('alice'), amount=100)
+        User.objects.create_user(username='warden', password='pass12345', is_staff=True)
+        self.client.login(username='warden', password='pass12345')
+        response = self.client.get(reverse('malnad_hostel:management_dashboard'))
+        self.assertEqual(len(response.context['fees']), 1)
+        # session, user, summary + three lists, the lists from worker threads
+        self.assertEqual(response.wsgi_request.query_stats.queries, 6)
+        threads = run_concurrently(lambda: threading.current_thread().name, lambda: threading.current_thread().name)
+        self.assertTrue(all(name.startswith('dashboard') for name in threads))
+
+    def test_worker_connections_kept_until_shutdown(self):
+        closed = []
+        wrapper = type(connections['default'])
+        with mock.patch.object(wrapper, 'close', autospec=True, side_effect=lambda conn: closed.append(conn)):
+            for _ in range(3):
+                run_concurrently(Room.objects.count, Room.objects.count)
+            self.assertEqual(closed, [])  # no reconnect per job
+            opened = dashboard._connections[:]
+            dashboard.shutdown()
+        self.assertEqual(closed, opened)
+        self.assertEqual(dashboard._connections, [])
+
+
+class BatchApprovalTests(TestCase):
+    def test_preferred_then_best_fit(self):
+        big = Room.objects.create(number='301', capacity=3)
+        half = Room.objects.create(number='302', capacity=2, occupied=1)
+        wanted = Room.objects.create(number='303', capacity=1)
+        first = make_student('gita')
+        RoomRequest.objects.create(student=first, preferred_room=wanted)
+        for name in ('hari', 'indu', 'jai'):
+            RoomRequest.objects.create(student=make_student(name), preferred_room=wanted)
+
+        with self.assertNumQueries(9):  # savepoint, lock, 2 loads, 3 bulk updates, capacity check, release
+            result = allocation.approve_pending_requests()
+
+        self.assertEqual(len(result.approved), 4)
+        self.assertEqual(result.preferred, 1)
+        first.refresh_from_db()
+        self.assertEqual(first.room, wanted)
+        # best fit: the half-full room is topped up before the empty one
+        occupied = dict(Room.objects.values_list('number', 'occupied'))
+        self.assertEqual(occupied, {'301': 2, '302': 2, '303': 1})
+        self.assertFalse(RoomRequest.objects.filter(status='pending').exists())
+
+    @skipUnless(connection.vendor == 'sqlite', "row locks cover this elsewhere")
+    def test_write_lock_taken_before_reading(self):
+        RoomRequest.objects.create(student=make_student('nina'))
+        Room.objects.create(number='501', capacity=1)
+        with CaptureQueriesContext(connection) as ctx:
+            allocation.approve_pending_requests()
+        statements = [q['sql'] for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertTrue(statements[0].startswith('UPDATE'), statements[0])
+
+    def test_counter_over_capacity_rolls_back(self):
+        room = Room.objects.create(number='501', capacity=1)
+        RoomRequest.objects.create(student=make_student('omar'), preferred_room=room)
+
+        def stale_plan(requests, rooms):
+            result = plan_batch(requests, rooms)
+            Room.objects.filter(pk=room.pk).update(occupied=1)  # a bed taken behind the plan's back
+            return result
+
+        with mock.patch.object(allocation, 'plan_batch', stale_plan):
+            with self.assertRaises(allocation.AllocationError):
+                allocation.approve_pending_requests()
+        room.refresh_from_db()
+        self.assertEqual(room.occupied, 0)
+        self.assertTrue(RoomRequest.objects.filter(status='pending').exists())
+
+    def test_unplaced_stay_pending(self):
+        Room.objects.create(number='401', capacity=1)
+        for name in ('kiran', 'lata'):
+            RoomRequest.objects.create(student=make_student(name))
+        result = allocation.approve_pending_requests()
+        self.assertEqual((len(result.approved), len(result.unplaced)), (1, 1))
+        self.assertEqual(RoomRequest.objects.filter(status='pending').count(), 1)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        User.objects.create_user(username='warden', password='pass12345', is_staff=True)
+        self.client.login(username='warden', password='pass12345')
+        student = make_student('mira')
+        Complaint.objects.create(student=student, title='Leak', description='tap')
+        old = Complaint.objects.create(student=student, title='Old', description='door')
+        Complaint.objects.filter(pk=old.pk).update(created_at='2020-01-05T10:00:00Z')
+
+    def test_complaints_stream(self):
+        response = self.client.get(reverse('malnad_hostel:export_complaints_csv'))
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'title,student,category,status,created_at')
+        self.assertEqual(len(lines), 3)
+
+    def test_date_range_and_gzip(self):
+        response = self.client.get(
+            reverse('malnad_hostel:export_complaints_csv'),
+            {'from': '2020-01-01', 'to': '2020-01-31', 'compress': 'gzip'},
+        )
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        body = gzip.decompress(b''.join(response.streaming_content)).decode()
+        self.assertIn('Old', body)
+        self.assertNotIn('Leak', body)
+
+    def test_bad_date(self):
+        response = self.client.get(reverse('malnad_hostel:export_students_csv'), {'from': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(EXPORT_JOB_WORKERS=0, MEDIA_ROOT=tempfile.mkdtemp(), SHARED_CACHE=True)
+class ExportJobTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        User.objects.create_user(username='warden', password='pass12345', is_staff=True)
+        self.client.login(username='warden', password='pass12345')
+        Room.objects.create(number='501', capacity=2)
+
+    def start(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.get(reverse('malnad_hostel:export_rooms_csv'), {'background': 1}).json()
+
+    def test_job_runs_and_downloads(self):
+        job = self.start()
+        status = self.client.get(job['status_url']).json()
+        self.assertEqual(status['status'], 'done')
+        download = self.client.get(status['download_url'])
+        self.assertIn(b'501,2,0', b''.join(download.streaming_content))
+
+    def test_unchanged_table_served_from_disk(self):
+        first = self.start()
+        again = self.start()
+        self.assertTrue(again['cached'])
+        self.assertEqual(ExportJob.objects.get(pk=again['id']).file, ExportJob.objects.get(pk=first['id']).file)
+        Room.objects.filter(number='501').first().save()  # any write bumps the table version
+        self.assertFalse(self.start()['cached'])
+
+    def test_not_reused_without_shared_cache(self):
+        self.start()
+        with override_settings(SHARED_CACHE=False):
+            self.assertFalse(self.start()['cached'])
+
+    def test_joined_table_write_invalidates(self):
+        room = Room.objects.get(number='501')
+        make_student('alice', room=room)
+        start = lambda: self.client.get(reverse('malnad_hostel:export_students_csv'), {'background': 1}).json()
+        with self.captureOnCommitCallbacks(execute=True):
+            start()
+        self.assertTrue(start()['cached'])
+        room.number = '502'
+        room.save()  # the students file prints Room.number
+        self.assertFalse(start()['cached'])
+        with self.captureOnCommitCallbacks(execute=True):
+            start()
+        user = User.objects.get(username='alice')
+        user.username = 'alicia'
+        user.save()  # ... and User.username
+        self.assertFalse(start()['cached'])
+
+
+@skipUnless(connection.vendor == 'sqlite', "reads SQLite's sqlite_stat1")
+class RowEstimateTests(TestCase):
+    def test_partial_index_does_not_shrink_estimate(self):
+        student = make_student('alice')
+        Fee.objects.bulk_create([Fee(student=student, amount=1, paid=i >= 5) for i in range(50)])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        # fee_unpaid_idx only holds the 5 unpaid fees
+        self.assertEqual(estimated_row_count(Fee), 50)
+
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite specific")
+class QueryPlanTests(TestCase):
+    """The hot dashboard/list filters must be answered from an index, not a table scan."""
+
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.explain()
+        table = queryset.model._meta.db_table
+        self.assertIn(f"USING INDEX {index}", plan)
+        self.assertNotRegex(plan, rf"SCAN {table}\s*$")
+
+    def test_open_complaints(self):
+        self.assertUsesIndex(open_complaints().order_by('-created_at'), 'complaint_status_created_idx')
+
+    def test_pending_fees(self):
+        self.assertUsesIndex(pending_fees().order_by('timestamp'), 'fee_unpaid_idx')
+
+    def test_pending_room_requests(self):
+        self.assertUsesIndex(RoomRequest.objects.filter(status='pending').order_by('created_at'), 'roomrequest_pending_idx')
+
+    def test_open_rooms(self):
+        self.assertUsesIndex(Room.objects.filter(occupied__lt=F('capacity')).order_by('number'), 'room_open_idx')
+
+    def test_student_autocomplete(self):
+        # most students housed: "room IS NULL" must not look like the cheap way in
+        rooms = Room.objects.bulk_create([Room(number=str(i), capacity=40) for i in range(2)])
+        users = User.objects.bulk_create([User(username=f'u{i}') for i in range(100)])
+        Student.objects.bulk_create([Student(user=u, roll_no=f'4MC{i:03d}', room=rooms[i % 3] if i % 3 < 2 else None)
+                                     for i, u in enumerate(users)])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        plan = views.unassigned_students_matching('4mc01').explain()
+        self.assertIn('USING INDEX student_roll_upper_idx', plan)
+        self.assertRegex(plan, r'SEARCH auth_user USING (COVERING )?INDEX \w+ \(username>\? AND username<\?\)')
+        self.assertNotIn('room_id=?', plan)
+
+    def test_menu_by_date(self):
+        plan = MessMenu.objects.filter(date=datetime.date(2025, 1, 1)).explain()
+        self.assertIn("USING INDEX", plan)
+
+
+class OccupancyCounterTests(TestCase):
+    def setUp(self):
+        self.a = Room.objects.create(number='601', capacity=3)
+        self.b = Room.objects.create(number='602', capacity=3)
+
+    def occupied(self):
+        return dict(Room.objects.values_list('number', 'occupied'))
+
+    def test_direct_saves_and_deletes_recount(self):
+        student = make_student('nina', room=self.a)
+        self.assertEqual(self.occupied(), {'601': 1, '602': 0})
+        student = Student.objects.get(pk=student.pk)
+        student.room = self.b
+        student.save()
+        self.assertEqual(self.occupied(), {'601': 0, '602': 1})
+        student.user.delete()
+        self.assertEqual(self.occupied(), {'601': 0, '602': 0})
+
+    def test_unrelated_save_does_not_touch_rooms(self):
+        student = Student.objects.get(pk=make_student('omar', room=self.a).pk)
+        student.contact = '12345'
+        with self.assertNumQueries(1):  # just the UPDATE, no recount
+            student.save()
+
+    def test_reconcile_fixes_drift(self):
+        make_student('pia', room=self.a)
+        Room.objects.filter(pk=self.a.pk).update(occupied=3)
+        Room.objects.filter(pk=self.b.pk).update(occupied=2)
+        out = StringIO()
+        call_command('reconcile_occupancy', stdout=out)
+        self.assertEqual(self.occupied(), {'601': 1, '602': 0})
+        self.assertIn('601: 3 -> 1', out.getvalue())
+        self.assertEqual(Room.objects.reconcile(), [])
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        clear_caches()
+        instrumentation.registry.reset()
+        room = Room.objects.create(number='701', capacity=4)
+        self.student = make_student('quinn', room=room)
+        make_student('rita', room=room)
+        make_student('sam', room=room)  # room_detail must not query per student
+        for i in range(5):
+            Fee.objects.create(student=self.student, amount=10 + i)
+            Complaint.objects.create(student=self.student, title=f"c{i}", description='x')
+        User.objects.create_user(username='warden', password='pass12345', is_staff=True)
+
+    def test_pages_within_budget(self):
+        self.client.login(username='warden', password='pass12345')
+        self.assertWithinBudget(self.client.get(reverse('malnad_hostel:management_dashboard')))
+        self.client.login(username='quinn', password='pass12345')
+        for name in ('student_dashboard', 'fees', 'mess_week'):
+            self.assertWithinBudget(self.client.get(reverse(f'malnad_hostel:{name}')))
+        self.assertWithinBudget(self.client.get(reverse('malnad_hostel:room_detail', args=[self.student.room_id])))
+
+    @override_settings(QUERY_BUDGETS={'malnad_hostel:fees': 1})
+    def test_exceeded_budget_fails(self):
+        self.client.login(username='quinn', password='pass12345')
+        response = self.client.get(reverse('malnad_hostel:fees'))
+        with self.assertRaises(AssertionError):
+            self.assertWithinBudget(response)
+
+    def test_stats_are_aggregated(self):
+        self.client.login(username='quinn', password='pass12345')
+        self.client.get(reverse('malnad_hostel:fees'))
+        self.client.get(reverse('malnad_hostel:fees'))
+        entry = instrumentation.registry.snapshot()['malnad_hostel:fees']
+        self.assertEqual(entry['requests'], 2)
+        self.assertGreater(entry['render_ms'], 0)
+
+
+class AdminQueryCountTests(TestCase):
+    def setUp(self):
+        User.objects.create_superuser(username='admin', password='pass12345')
+        self.client.login(username='admin', password='pass12345')
+
+    def add_rows(self, n, offset):
+        for i in range(offset, offset + n):
+            room = Room.objects.create(number=f"A{i}", capacity=2)
+            student = make_student(f"adm{i}", room=room)
+            Fee.objects.create(student=student, amount=i)
+            Complaint.objects.create(student=student, title=f"c{i}", description='x')
+            RoomRequest.objects.create(student=student, preferred_room=room)
+
+    def changelist_queries(self, model):
+        url = reverse(f'admin:malnad_hostel_{model}_changelist')
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_changelists_do_not_grow_with_rows(self):
+        models = ('student', 'room', 'fee', 'complaint', 'roomrequest')
+        self.add_rows(2, 0)
+        small = {m: self.changelist_queries(m) for m in models}
+        self.add_rows(20, 2)
+        large = {m: self.changelist_queries(m) for m in models}
+        self.assertEqual(small, large)
+
+
+class SeedingTests(TestCase):
+    def test_seed_is_consistent(self):
+        counts = seeding.seed(rooms=3, students=12, fees_per_student=2, menu_days=3, prefix='t')
+        self.assertEqual(counts['students'], 12)
+        self.assertEqual(Fee.objects.count(), 24)
+        self.assertEqual(Room.objects.reconcile(dry_run=True), [])
+        self.assertTrue(self.client.login(username='t000000', password=seeding.DEFAULT_PASSWORD))
@@ -19,11 +19,13 @@ urlpatterns = [
     # Rooms
     path('room/<int:pk>/', views.room_detail, name='room_detail'),
     path('room/<int:pk>/allocate/', views.allocate_to_room, name='allocate_to_room'),
+    path('students/autocomplete/', views.student_autocomplete, name='student_autocomplete'),
     path('student/<int:student_pk>/unassign/', views.unassign_student, name='unassign_student'),
 
     # Room requests
     path('request-room/', views.request_room, name='request_room'),
     path('process-room-request/<int:pk>/<str:action>/', views.process_room_request, name='process_room_request'),
+    path('process-room-requests/approve-all/', views.approve_all_room_requests, name='approve_all_room_requests'),
 
     # Complaints
     path('complaint/new/', views.create_complaint, name='create_complaint'),
@@ -39,8 +41,13 @@ urlpatterns = [
     # Mess menu
     path('mess-week/', views.mess_week_view, name='mess_week'),
 
+    # Performance stats (per-view query counts / timings)
+    path('perf/stats/', views.query_stats_view, name='query_stats'),
+
     # CSV exports
     path('export/students/', views.export_students_csv, name='export_students_csv'),
     path('export/rooms/', views.export_rooms_csv, name='export_rooms_csv'),
     path('export/complaints/', views.export_complaints_csv, name='export_complaints_csv'),
+    path('export/jobs/<int:pk>/', views.export_job_status, name='export_job_status'),
+    path('export/jobs/<int:pk>/download/', views.export_job_download, name='export_job_download'),
 ]
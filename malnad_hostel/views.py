@@ -1,22 +1,34 @@
 # malnad_hostel/views.py
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.contrib.auth.views import LoginView
 from django.contrib import messages
-from django.http import HttpResponse, HttpResponseRedirect
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponseRedirect, JsonResponse
+from django.template.loader import render_to_string
+from django.db.models import Count, Max
+from django.db.models.functions import Upper
 from django.urls import reverse
 from django.utils import timezone
-from django.db.models import F
-import csv
+from django.utils.safestring import mark_safe
+import asyncio
+import os
 
 from .forms import (
     UserRegisterForm, ComplaintForm, ComplaintCommentForm, ProfileForm,
     RoomRequestForm, AllocateStudentForm, FeeReceiptForm
 )
 from .models import (
-    Student, Room, Fee, Complaint, MessMenu,
-    RoomRequest, ComplaintComment
+    Student, Room, Fee, Complaint,
+    RoomRequest, ComplaintComment, ExportJob
 )
+from . import allocation, export_jobs, exports, hashers, instrumentation, mess, student_cache
+from .conditional import conditional_page
+from .dashboard import get_summary, open_complaints, pending_fees, run_concurrently
+from .export_jobs import atable_version
+from .pagination import keyset_page
 from django.contrib.auth.models import User
 
 
@@ -25,12 +37,34 @@ def is_management(user):
     return user.is_staff
 
 
+# Async views: resolve the user once and pin it on the request, so templates
+# and context processors never trigger a synchronous lookup; context must hold
+# evaluated rows, not lazy querysets.
+async def _auser(request):
+    request.user = await request.auser()
+    return request.user
+
+
+async def _aget_or_404(queryset, **lookup):
+    try:
+        return await queryset.aget(**lookup)
+    except queryset.model.DoesNotExist:
+        raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+
+
+async def _alist(queryset):
+    return [obj async for obj in queryset]
+
+
 # --- Basic pages ---
 def home(request):
     return render(request, 'malnad_hostel/home.html')
 
 
-def register(request):
+# --- Registration & login ---
+# Both hash a password; POSTs run in the bounded hashing pool (hashers.offload)
+# so an ASGI worker keeps serving other requests meanwhile.
+def _register(request):
     if request.method == 'POST':
         form = UserRegisterForm(request.POST)
         if form.is_valid():
@@ -45,20 +79,36 @@ def register(request):
     return render(request, 'malnad_hostel/register.html', {'form': form})
 
 
+async def register(request):
+    if request.method == 'POST':
+        return await hashers.offload(_register, request)
+    return await sync_to_async(_register)(request)
+
+
+_login = LoginView.as_view()
+
+
+async def login_view(request):
+    if request.method == 'POST':
+        return await hashers.offload(_login, request)
+    return await sync_to_async(_login)(request)
+
+
 # --- Student dashboard & profile ---
 @login_required
-def student_dashboard(request):
-    student = get_object_or_404(Student, user=request.user)
-    upcoming_menu = MessMenu.objects.order_by('-date')[:7]
-    fees = Fee.objects.filter(student=student)
-    room_requests = RoomRequest.objects.filter(student=student)
-    context = {
-        'student': student,
-        'upcoming_menu': upcoming_menu,
-        'fees': fees,
-        'room_requests': room_requests,
-    }
-    return render(request, 'malnad_hostel/student_dashboard.html', context)
+async def student_dashboard(request):
+    user = await _auser(request)
+    # the body is cached per student; see student_cache for invalidation
+    body = await student_cache.aget_dashboard(user.id)
+    if body is None:
+        student, week = await asyncio.gather(
+            _aget_or_404(Student.objects.select_related('user', 'room'), user=user),
+            mess.aget_week(),
+        )
+        context = {'student': student, 'upcoming_menu': week['menus']}
+        body = render_to_string('malnad_hostel/student_dashboard_body.html', context, request)
+        await student_cache.aset_dashboard(user.id, body)
+    return render(request, 'malnad_hostel/student_dashboard.html', {'dashboard_body': mark_safe(body)})
 
 
 @login_required
@@ -79,31 +129,46 @@ def profile_view(request):
 @login_required
 @user_passes_test(is_management)
 def management_dashboard(request):
-    rooms = Room.objects.all()
-    complaints = Complaint.objects.filter(status__in=['pending','in_progress']).order_by('-created_at')
-    fees = Fee.objects.filter(paid=False)
-    room_count = rooms.count()
-    student_count = Student.objects.count()
-    pending_requests = RoomRequest.objects.filter(status='pending').count()
-    pending_fees_count = fees.count()
+    # the cards are one cached statement; the three lists are independent
+    # and fetched side by side on separate connections
+    summary, rooms, complaints, fees = run_concurrently(
+        get_summary,
+        lambda: keyset_page(Room.objects.all(), 'number', request.GET.get('rooms')),
+        lambda: keyset_page(
+            open_complaints().select_related('student__user'),
+            '-created_at', request.GET.get('complaints'),
+        ),
+        lambda: keyset_page(pending_fees().select_related('student__user'), 'timestamp', request.GET.get('fees')),
+    )
     context = {
+        'summary': summary,
         'rooms': rooms,
         'complaints': complaints,
         'fees': fees,
-        'room_count': room_count,
-        'student_count': student_count,
-        'pending_requests': pending_requests,
-        'pending_fees_count': pending_fees_count,
+        'room_count': summary['room_count'],
+        'student_count': summary['student_count'],
+        'pending_requests': summary['pending_requests'],
+        'pending_fees_count': summary['pending_fees_count'],
     }
     return render(request, 'malnad_hostel/management_dashboard.html', context)
 
 
 # --- Room detail / allocation ---
+async def _room_detail_state(request, pk):
+    # every write path for these tables bumps its version (signals, allocation,
+    # seeding, reconcile), so no query is needed here
+    versions = await asyncio.gather(atable_version(Room), atable_version(Student), atable_version(User))
+    return (pk, *versions), None
+
+
 @login_required
-def room_detail(request, pk):
-    room = get_object_or_404(Room, pk=pk)
-    # students assigned to this room
-    assigned_students = Student.objects.filter(room=room)
+@conditional_page(_room_detail_state)
+async def room_detail(request, pk):
+    await _auser(request)
+    room, assigned_students = await asyncio.gather(
+        _aget_or_404(Room.objects.all(), pk=pk),
+        _alist(Student.objects.filter(room_id=pk).select_related('user')),
+    )
     return render(request, 'malnad_hostel/room_detail.html', {'room': room, 'assigned_students': assigned_students})
 
 
@@ -115,37 +180,58 @@ def allocate_to_room(request, pk):
         form = AllocateStudentForm(request.POST)
         if form.is_valid():
             student = form.cleaned_data['student']
-            if room.is_available():
-                student.room = room
-                student.save()
-                room.occupied = F('occupied') + 1
-                room.save()
-                # refresh room from DB to update F() expression value
-                room.refresh_from_db()
+            try:
+                allocation.allocate(student, room)
                 messages.success(request, f"{student.user.username} allocated to {room.number}")
-            else:
-                messages.error(request, "Room is full")
+            except allocation.AllocationError as exc:
+                messages.error(request, str(exc))
             return redirect('malnad_hostel:room_detail', pk=room.pk)
     else:
         form = AllocateStudentForm()
     return render(request, 'malnad_hostel/allocate_to_room.html', {'room': room, 'form': form})
 
 
+AUTOCOMPLETE_LIMIT = 10
+
+
+def unassigned_students_matching(term):
+    """(roll_no, username, first_name, last_name) of unassigned students whose roll no (any case) or username starts with `term`."""
+    # ranges rather than __startswith: SQLite's LIKE can't use the BINARY
+    # indexes. One query per index, UNIONed: an OR across the join leaves
+    # SQLite reading every unassigned student instead of seeking either one.
+    key = term.upper()  # student_roll_upper_idx holds UPPER(roll_no)
+    unassigned = Student.objects.filter(room__isnull=True).values_list(
+        'roll_no', 'user__username', 'user__first_name', 'user__last_name')
+    by_roll_no = unassigned.alias(roll_key=Upper('roll_no')).filter(roll_key__gte=key, roll_key__lt=key + '\U0010ffff')
+    by_username = unassigned.filter(user__username__gte=term, user__username__lt=term + '\U0010ffff')
+    return by_roll_no.union(by_username).order_by('roll_no')
+
+
+@login_required
+@user_passes_test(is_management)
+def student_autocomplete(request):
+    """Unassigned students whose roll no or username starts with ?q=."""
+    term = request.GET.get('q', '').strip()
+    rows = unassigned_students_matching(term)[:AUTOCOMPLETE_LIMIT] if term else []
+    return JsonResponse({'results': [
+        {'value': roll_no, 'label': f"{roll_no} - {f'{first} {last}'.strip() or username}"}
+        for roll_no, username, first, last in rows
+    ]})
+
+
 @login_required
 @user_passes_test(is_management)
 def unassign_student(request, student_pk):
     student = get_object_or_404(Student, pk=student_pk)
-    room = student.room
-    if room:
-        student.room = None
-        student.save()
-        if room.occupied > 0:
-            room.occupied = F('occupied') - 1
-            room.save()
-            room.refresh_from_db()
-        messages.success(request, f"{student.user.username} removed from {room.number}")
+    try:
+        room = allocation.release(student)
+    except allocation.AllocationError as exc:
+        messages.error(request, str(exc))
     else:
-        messages.warning(request, "Student has no room")
+        if room:
+            messages.success(request, f"{student.user.username} removed from {room.number}")
+        else:
+            messages.warning(request, "Student has no room")
     return HttpResponseRedirect(request.META.get('HTTP_REFERER', reverse('malnad_hostel:management_dashboard')))
 
 
@@ -197,10 +283,22 @@ def resolve_complaint(request, pk):
 
 
 # --- Fees ---
+async def _fees_state(request):
+    stats, version = await asyncio.gather(
+        Fee.objects.filter(student__user=request.user).aaggregate(
+            n=Count('pk'), last_id=Max('pk'), last=Max('timestamp')),
+        atable_version(Fee),
+    )
+    return (stats['n'], stats['last_id'], stats['last'], version), None
+
+
 @login_required
-def fees_view(request):
-    student = get_object_or_404(Student, user=request.user)
-    fees = Fee.objects.filter(student=student)
+@conditional_page(_fees_state)
+async def fees_view(request):
+    user = await _auser(request)
+    fees = await _alist(Fee.objects.filter(student__user=user))
+    if not fees and not await Student.objects.filter(user=user).aexists():
+        raise Http404("No Student matches the given query.")
     return render(request, 'malnad_hostel/fees.html', {'fees': fees})
 
 
@@ -265,16 +363,17 @@ def request_room(request):
 @user_passes_test(is_management)
 def process_room_request(request, pk, action):
     rr = get_object_or_404(RoomRequest, pk=pk)
+    if rr.status != 'pending':
+        messages.warning(request, "Request was already processed")
+        return redirect('malnad_hostel:management_dashboard')
     if action == 'approve':
         # try preferred room then fallback to first available
-        room = rr.preferred_room if rr.preferred_room and rr.preferred_room.is_available() else Room.objects.filter(occupied__lt=F('capacity')).first()
+        try:
+            room = allocation.allocate_any(rr.student, preferred=rr.preferred_room)
+        except allocation.AllocationError as exc:
+            messages.error(request, str(exc))
+            return redirect('malnad_hostel:management_dashboard')
         if room:
-            st = rr.student
-            st.room = room
-            st.save()
-            room.occupied = F('occupied') + 1
-            room.save()
-            room.refresh_from_db()
             rr.status = 'approved'
             rr.processed_by = request.user
             rr.processed_at = timezone.now()
@@ -291,48 +390,109 @@ def process_room_request(request, pk, action):
     return redirect('malnad_hostel:management_dashboard')
 
 
+@login_required
+@user_passes_test(is_management)
+def approve_all_room_requests(request):
+    if request.method != 'POST':
+        return redirect('malnad_hostel:management_dashboard')
+    result = allocation.approve_pending_requests(processed_by=request.user)
+    if result.approved:
+        messages.success(request, f"Batch approval: {result}")
+    else:
+        messages.warning(request, f"Nothing approved: {result}")
+    return redirect('malnad_hostel:management_dashboard')
+
+
 # --- Mess menu ---
+async def _mess_week_state(request):
+    week = await mess.aget_week()
+    return week['etag'], week['last_modified']
+
+
+@login_required
+@conditional_page(_mess_week_state)
+async def mess_week_view(request):
+    await _auser(request)
+    week = await mess.aget_week()
+    return render(request, 'malnad_hostel/mess_week.html', {'week_body': mark_safe(week['html'])})
+
+
+# --- Performance stats ---
 @login_required
-def mess_week_view(request):
-    today = timezone.localdate()
-    days = [today + timezone.timedelta(days=i) for i in range(7)]
-    menus = {m.date: m for m in MessMenu.objects.filter(date__in=days)}
-    ordered = [(d, menus.get(d)) for d in days]
-    return render(request, 'malnad_hostel/mess_week.html', {'ordered': ordered})
+@user_passes_test(is_management)
+def query_stats_view(request):
+    if request.GET.get('reset'):
+        instrumentation.registry.reset()
+    return JsonResponse(instrumentation.registry.snapshot())
 
 
 # --- CSV exports ---
+# Add ?background=1 to run the export as a job and poll export_job_status.
+def _export(request, name):
+    if request.GET.get('background'):
+        return _start_export_job(request, name)
+    return exports.stream_export(request, name)
+
+
 @login_required
 @user_passes_test(is_management)
 def export_students_csv(request):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="students.csv"'
-    writer = csv.writer(response)
-    writer.writerow(['username','full_name','roll_no','contact','course','semester','room'])
-    for s in Student.objects.select_related('user','room').all():
-        writer.writerow([s.user.username, s.user.get_full_name(), s.roll_no, s.contact, s.course, s.semester, s.room.number if s.room else ''])
-    return response
+    return _export(request, 'students')
 
 
 @login_required
 @user_passes_test(is_management)
 def export_rooms_csv(request):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="rooms.csv"'
-    writer = csv.writer(response)
-    writer.writerow(['number','capacity','occupied'])
-    for r in Room.objects.all():
-        writer.writerow([r.number, r.capacity, r.occupied])
-    return response
+    return _export(request, 'rooms')
 
 
 @login_required
 @user_passes_test(is_management)
 def export_complaints_csv(request):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="complaints.csv"'
-    writer = csv.writer(response)
-    writer.writerow(['title','student','category','status','created_at'])
-    for c in Complaint.objects.select_related('student__user').all():
-        writer.writerow([c.title, c.student.user.username, c.category, c.status, c.created_at])
-    return response
+    return _export(request, 'complaints')
+
+
+def _job_payload(job):
+    payload = {
+        'id': job.pk,
+        'export': job.name,
+        'status': job.status,
+        'cached': job.cached,
+        'status_url': reverse('malnad_hostel:export_job_status', args=[job.pk]),
+    }
+    if job.status == 'done':
+        payload['download_url'] = reverse('malnad_hostel:export_job_download', args=[job.pk])
+    if job.status == 'failed':
+        payload['error'] = job.error
+    return payload
+
+
+def _start_export_job(request, name):
+    try:
+        date_from, date_to = exports.parse_range(request.GET)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    params = {
+        'from': date_from.isoformat() if date_from else None,
+        'to': date_to.isoformat() if date_to else None,
+        'compress': request.GET.get('compress') or None,
+    }
+    job = export_jobs.enqueue(name, params, user=request.user)
+    return JsonResponse(_job_payload(job), status=200 if job.status == 'done' else 202)
+
+
+@login_required
+@user_passes_test(is_management)
+def export_job_status(request, pk):
+    job = get_object_or_404(ExportJob, pk=pk)
+    return JsonResponse(_job_payload(job))
+
+
+@login_required
+@user_passes_test(is_management)
+def export_job_download(request, pk):
+    job = get_object_or_404(ExportJob, pk=pk, status='done')
+    path = os.path.join(settings.MEDIA_ROOT, job.file)
+    if not os.path.exists(path):
+        raise Http404("Export file is gone, please start a new export")
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=os.path.basename(path))